@@ -2,7 +2,8 @@
 Enhanced Climate API Routes for all 47 Kenya Counties
 Supports data visualization and weather predictions
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from datetime import datetime, timedelta
@@ -10,98 +11,88 @@ import json
 
 from ...utils.database import get_db
 from ...services.enhanced_climate_service import enhanced_climate_service
-from ...data.kenya_counties import KENYA_COUNTIES, CLIMATE_ZONES, get_county_by_name, get_counties_by_climate_zone
+from ...services.export_service import STREAMING_FORMATS, arrow_available, export_filename, stream_export
+from ...services.national_mosaic import NATIONAL_MAX_DATES, national_mosaic_service
+from ...services.county_metadata import county_metadata
+from ...data.kenya_counties import KENYA_COUNTIES, get_counties_by_climate_zone
+from ...data.county_geometry import fallback_counties
+from ...data.county_index import get_county_index
 from ...utils.cache import get_cache, set_cache
+from ...utils.http_cache import static_response
+from ...utils.serialization import CachedPayload, FastJSONResponse
 
 router = APIRouter()
 
+# Metrics available in historical time series
+TREND_METRICS = ("temperature", "rainfall", "humidity", "ndvi")
+
+# NASA GIBS layers available as national mosaics
+SATELLITE_LAYERS = ("ndvi", "temperature", "precipitation")
+
 @router.get("/counties")
-async def get_all_counties():
+async def get_all_counties(request: Request):
     """Get list of all 47 Kenya counties with basic info"""
-    return {
-        "total_counties": len(KENYA_COUNTIES),
-        "counties": [
-            {
-                "id": county_id,
-                "name": county_data["name"],
-                "capital": county_data["capital"],
-                "climate_zone": county_data["climate_zone"],
-                "population": county_data["population"],
-                "area_km2": county_data["area_km2"],
-                "elevation_m": county_data["elevation_m"]
-            }
-            for county_id, county_data in KENYA_COUNTIES.items()
-        ],
-        "climate_zones": list(CLIMATE_ZONES.keys())
-    }
+    return static_response(request, county_metadata.counties)
 
 @router.get("/counties/search")
 async def search_counties(
+    request: Request,
     name: Optional[str] = Query(None, description="County name to search for"),
     climate_zone: Optional[str] = Query(None, description="Filter by climate zone")
 ):
     """Search counties by name or climate zone"""
     try:
-        results = []
-        
-        if name:
-            county_id, county_data = get_county_by_name(name)
-            if county_data:
-                results.append({
-                    "id": county_id,
-                    "name": county_data["name"],
-                    "climate_zone": county_data["climate_zone"],
-                    "capital": county_data["capital"]
-                })
-        
-        if climate_zone:
-            counties_in_zone = get_counties_by_climate_zone(climate_zone)
-            for county_id, county_data in counties_in_zone:
-                results.append({
-                    "id": county_id,
-                    "name": county_data["name"],
-                    "climate_zone": county_data["climate_zone"],
-                    "capital": county_data["capital"]
-                })
-        
-        return {
-            "search_criteria": {"name": name, "climate_zone": climate_zone},
-            "results_count": len(results),
-            "results": results
-        }
-        
+        return static_response(request, county_metadata.search(name, climate_zone))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@router.get("/counties/locate")
+async def locate_county(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    k: int = Query(3, ge=1, le=47, description="Number of nearest counties to return")
+):
+    """Find the county containing a coordinate and the nearest counties to it"""
+    # Bounding boxes overlap, so point lookups are only served from real county boundaries
+    if fallback_counties():
+        raise HTTPException(status_code=503, detail="County boundaries are not loaded")
+    index = get_county_index()
+    county_id = index.locate(lat, lon)
+    
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "county": {
+            "id": county_id,
+            "name": KENYA_COUNTIES[county_id]["name"]
+        } if county_id is not None else None,
+        "nearest": [
+            {
+                "id": nearest_id,
+                "name": KENYA_COUNTIES[nearest_id]["name"],
+                "distance_deg": round(distance, 4)
+            }
+            for nearest_id, distance in index.nearest(lat, lon, k)
+        ]
+    }
+
 @router.get("/overview/current")
 async def get_current_overview():
     """Get current climate overview for all counties"""
     try:
         data = await enhanced_climate_service.get_all_counties_current_data()
-        return data
+        return FastJSONResponse(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Overview failed: {str(e)}")
 
 @router.get("/counties/{county_id}")
-async def get_county_details(county_id: int):
+async def get_county_details(county_id: int, request: Request):
     """Get detailed information about a specific county"""
-    if county_id not in KENYA_COUNTIES:
+    payload = county_metadata.county(county_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="County not found")
     
-    county_data = KENYA_COUNTIES[county_id]
-    climate_zone_info = CLIMATE_ZONES.get(county_data["climate_zone"], {})
-    
-    return {
-        "county": county_data,
-        "climate_zone_details": climate_zone_info,
-        "coordinates": {
-            "center": {
-                "latitude": (county_data["bounds"]["north"] + county_data["bounds"]["south"]) / 2,
-                "longitude": (county_data["bounds"]["east"] + county_data["bounds"]["west"]) / 2
-            },
-            "bounds": county_data["bounds"]
-        }
-    }
+    return static_response(request, payload)
 
 @router.get("/counties/{county_id}/historical")
 async def get_county_historical_data(
@@ -114,7 +105,7 @@ async def get_county_historical_data(
     
     try:
         data = await enhanced_climate_service.get_county_historical_data(county_id, months)
-        return data
+        return FastJSONResponse(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Historical data failed: {str(e)}")
 
@@ -129,7 +120,7 @@ async def get_county_predictions(
     
     try:
         data = await enhanced_climate_service.get_county_predictions(county_id, months)
-        return data
+        return FastJSONResponse(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Predictions failed: {str(e)}")
 
@@ -167,11 +158,18 @@ async def get_county_visualization_data(
         }
         
         # Add predictions if requested
+        sources = [historical]
         if include_predictions and prediction_months > 0:
             predictions = await enhanced_climate_service.get_county_predictions(county_id, prediction_months)
             result["predictions"] = predictions
+            sources.append(predictions)
         
-        return result
+        # Age the response from its most recently computed source so client caching follows the service cache;
+        # a source that did not come from the cache (e.g. an error) makes the response uncacheable
+        headers = None
+        if all(isinstance(source, CachedPayload) for source in sources):
+            headers = {"Last-Modified": max(sources, key=lambda source: source.created_at).last_modified}
+        return FastJSONResponse(result, headers=headers)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Visualization data failed: {str(e)}")
@@ -195,7 +193,7 @@ async def compare_counties(
             raise HTTPException(status_code=400, detail="Maximum 10 counties can be compared")
         
         data = await enhanced_climate_service.get_climate_comparison(county_list, months)
-        return data
+        return FastJSONResponse(data)
         
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid county IDs format")
@@ -209,32 +207,25 @@ async def get_drought_risk_assessment(
     """Get drought risk assessment for all counties"""
     try:
         data = await enhanced_climate_service.get_drought_risk_assessment(months_ahead)
-        return data
+        return FastJSONResponse(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Drought assessment failed: {str(e)}")
 
 @router.get("/climate-zones")
-async def get_climate_zones():
+async def get_climate_zones(request: Request):
     """Get information about Kenya's climate zones"""
-    return {
-        "total_zones": len(CLIMATE_ZONES),
-        "climate_zones": CLIMATE_ZONES,
-        "counties_by_zone": {
-            zone: [
-                {"id": county_id, "name": county_data["name"]}
-                for county_id, county_data in get_counties_by_climate_zone(zone)
-            ]
-            for zone in CLIMATE_ZONES.keys()
-        }
-    }
+    return static_response(request, county_metadata.climate_zones)
 
 @router.get("/analytics/trends")
 async def get_climate_trends(
-    metric: str = Query("temperature", description="Metric: temperature, rainfall, ndvi"),
+    metric: str = Query("temperature", description="Metric: temperature, rainfall, humidity, ndvi"),
     region: Optional[str] = Query(None, description="Climate zone or 'all' for nationwide"),
     period: str = Query("12_months", description="Period: 6_months, 12_months, 24_months")
 ):
     """Get climate trends analysis"""
+    if metric not in TREND_METRICS:
+        raise HTTPException(status_code=400, detail=f"Invalid metric, expected one of {list(TREND_METRICS)}")
+    
     try:
         # Parse period
         period_map = {"6_months": 6, "12_months": 12, "24_months": 24}
@@ -247,57 +238,91 @@ async def get_climate_trends(
         else:
             county_ids = list(KENYA_COUNTIES.keys())
         
-        # Sample analysis for first 10 counties to avoid timeout
-        sample_counties = county_ids[:10]
-        trends_data = {}
-        
-        for county_id in sample_counties:
-            historical = await enhanced_climate_service.get_county_historical_data(county_id, months)
-            if "error" not in historical:
-                county_name = KENYA_COUNTIES[county_id]["name"]
-                time_series = historical["time_series"]
-                
-                if metric in time_series:
-                    values = time_series[metric]
-                    if len(values) >= 2:
-                        # Simple trend calculation
-                        trend_slope = (values[-1] - values[0]) / len(values)
-                        trend_direction = "increasing" if trend_slope > 0.1 else "decreasing" if trend_slope < -0.1 else "stable"
-                        
-                        trends_data[county_id] = {
-                            "name": county_name,
-                            "trend_direction": trend_direction,
-                            "trend_slope": round(trend_slope, 3),
-                            "current_value": values[-1],
-                            "period_average": round(sum(values) / len(values), 2)
-                        }
+        # All selected counties are analyzed together in one vectorized pass
+        analysis = await enhanced_climate_service.get_climate_trends(metric, county_ids, months)
+        if "error" in analysis:
+            raise HTTPException(status_code=500, detail=analysis["error"])
         
         return {
             "metric": metric,
             "region": region or "all",
             "period": period,
-            "counties_analyzed": len(trends_data),
-            "trends": trends_data,
+            "counties_analyzed": analysis["counties_analyzed"],
+            "trends": analysis["trends"],
+            "failed_counties": analysis["failed_counties"],
             "analysis_date": datetime.utcnow().isoformat() + "Z"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Trends analysis failed: {str(e)}")
 
+@router.get("/satellite/national/{layer_type}")
+async def get_national_satellite_statistics(
+    layer_type: str,
+    start_date: Optional[str] = Query(None, description=f"Window start (YYYY-MM-DD), defaults to 7 days before end_date; at most {NATIONAL_MAX_DATES} product dates"),
+    end_date: Optional[str] = Query(None, description="Window end (YYYY-MM-DD), defaults to yesterday")
+):
+    """Get satellite statistics for all 47 counties from one national raster per date"""
+    if layer_type not in SATELLITE_LAYERS:
+        raise HTTPException(status_code=400, detail=f"Invalid layer, expected one of {list(SATELLITE_LAYERS)}")
+    try:
+        national_mosaic_service.window(layer_type, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    data = await national_mosaic_service.get_county_statistics(layer_type, start_date, end_date)
+    if "error" in data:
+        raise HTTPException(status_code=502, detail=data["error"])
+    return FastJSONResponse(data)
+
 @router.get("/export/county-data")
 async def export_county_data(
-    county_id: int,
-    format: str = Query("json", description="Export format: json, csv"),
+    county_id: Optional[int] = Query(None, description="Single county to export"),
+    county_ids: Optional[str] = Query(None, description="Comma-separated county IDs, or 'all'"),
+    format: str = Query("json", description="Export format: json, csv, ndjson, parquet, arrow"),
+    months: int = Query(12, ge=1, le=60, description="Months of historical data"),
     include_predictions: bool = Query(True, description="Include predictions in export")
 ):
     """Export comprehensive county data for external use"""
-    if county_id not in KENYA_COUNTIES:
-        raise HTTPException(status_code=404, detail="County not found")
+    if county_ids == "all":
+        export_ids = list(KENYA_COUNTIES.keys())
+    elif county_ids:
+        try:
+            export_ids = [int(id.strip()) for id in county_ids.split(",")]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid county IDs format")
+    elif county_id is not None:
+        export_ids = [county_id]
+    else:
+        raise HTTPException(status_code=400, detail="county_id or county_ids is required")
+    
+    invalid_counties = [id for id in export_ids if id not in KENYA_COUNTIES]
+    if invalid_counties:
+        raise HTTPException(status_code=404, detail=f"Counties not found: {invalid_counties}")
+    
+    if format != "json" and format not in STREAMING_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    if format in ("parquet", "arrow") and not arrow_available():
+        raise HTTPException(status_code=400, detail=f"{format} export requires pyarrow")
     
     try:
+        if format != "json":
+            # Rows are streamed county by county, so bulk exports never sit in memory
+            return StreamingResponse(
+                stream_export(export_ids, format, months, include_predictions),
+                media_type=STREAMING_FORMATS[format],
+                headers={"Content-Disposition": f'attachment; filename="{export_filename(export_ids, format)}"'}
+            )
+        
+        if len(export_ids) > 1:
+            raise HTTPException(status_code=400, detail="Multi-county exports require csv, ndjson, parquet or arrow")
+        
         # Get comprehensive data
+        county_id = export_ids[0]
         county_info = KENYA_COUNTIES[county_id]
-        historical = await enhanced_climate_service.get_county_historical_data(county_id, 12)
+        historical = await enhanced_climate_service.get_county_historical_data(county_id, months)
         
         export_data = {
             "county_info": county_info,
@@ -313,9 +338,10 @@ async def export_county_data(
             predictions = await enhanced_climate_service.get_county_predictions(county_id, 6)
             export_data["predictions"] = predictions
         
-        # For now, return JSON (CSV conversion would require additional logic)
         return export_data
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
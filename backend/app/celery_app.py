@@ -0,0 +1,64 @@
+"""
+Celery application for scheduled background jobs
+Run `celery -A app.celery_app worker --beat` with CELERY_BROKER_URL set to replace the in-process scheduler
+"""
+import os
+import asyncio
+from typing import Optional
+from dotenv import load_dotenv
+
+from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_shutdown, worker_shutdown
+
+from .services.daily_prefetch import PREFETCH_HOUR_UTC, prefetch_daily
+from .utils.cache import init_cache, close_cache
+from .utils.database import async_engine
+from .utils.http import close_http_session
+
+load_dotenv()
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL") or "redis://localhost:6379/1"
+
+celery_app = Celery("uzimasmart", broker=CELERY_BROKER_URL)
+celery_app.conf.timezone = "UTC"
+celery_app.conf.beat_schedule = {
+    "prefetch-daily-gibs-layers": {
+        "task": "app.celery_app.prefetch_daily_task",
+        "schedule": crontab(hour=PREFETCH_HOUR_UTC, minute=0)
+    }
+}
+
+# One event loop per worker process, kept across runs: the shared HTTP session, the upstream and
+# colormap locks and the database pool all bind to the loop they were first used on
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    """The worker's event loop, connecting the shared cache on first use"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        _loop.run_until_complete(init_cache())
+    return _loop
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _close_worker_loop(**kwargs):
+    """Release the worker's connections and close its event loop"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    _loop.run_until_complete(close_http_session())
+    _loop.run_until_complete(close_cache())
+    _loop.run_until_complete(async_engine.dispose())
+    _loop.close()
+    _loop = None
+
+
+@celery_app.task
+def prefetch_daily_task():
+    """Fetch yesterday's national GIBS layers and store them in the shared cache and database"""
+    return _worker_loop().run_until_complete(prefetch_daily())
@@ -0,0 +1,122 @@
+"""
+Precomputed county climate profiles
+Seasonal baselines for all 47 counties, resolved once at import
+"""
+import numpy as np
+from typing import Dict
+
+from .county_table import KENYA_COUNTIES
+from .county_registry import county_registry
+
+# Seasonal patterns for different climate zones
+SEASONAL_PATTERNS = {
+    "Arid": {
+        "rainfall": [5, 8, 15, 25, 35, 45, 30, 20, 15, 10, 8, 5],  # mm
+        "temperature": [32, 33, 34, 35, 36, 35, 34, 33, 33, 33, 32, 31],  # °C
+        "humidity": [30, 32, 35, 40, 45, 50, 48, 42, 38, 35, 32, 30],  # %
+        "ndvi": [0.15, 0.18, 0.25, 0.35, 0.45, 0.50, 0.40, 0.30, 0.25, 0.20, 0.18, 0.15]
+    },
+    "Semi-Arid": {
+        "rainfall": [25, 35, 60, 80, 90, 75, 45, 35, 30, 25, 20, 20],
+        "temperature": [26, 27, 28, 27, 25, 24, 24, 25, 26, 27, 27, 26],
+        "humidity": [45, 48, 55, 65, 70, 68, 60, 55, 50, 48, 45, 44],
+        "ndvi": [0.25, 0.30, 0.45, 0.60, 0.70, 0.65, 0.50, 0.40, 0.35, 0.30, 0.28, 0.25]
+    },
+    "Highland Agricultural": {
+        "rainfall": [45, 55, 120, 180, 150, 100, 80, 70, 85, 110, 90, 60],
+        "temperature": [18, 19, 20, 19, 18, 17, 16, 17, 18, 19, 19, 18],
+        "humidity": [65, 68, 75, 80, 82, 78, 70, 68, 70, 75, 72, 68],
+        "ndvi": [0.45, 0.50, 0.70, 0.85, 0.90, 0.80, 0.70, 0.65, 0.70, 0.75, 0.65, 0.50]
+    },
+    "Highland Tropical": {
+        "rainfall": [80, 90, 160, 220, 200, 140, 120, 110, 130, 150, 120, 95],
+        "temperature": [20, 21, 22, 21, 20, 19, 18, 19, 20, 21, 21, 20],
+        "humidity": [75, 78, 82, 85, 88, 85, 80, 78, 80, 83, 80, 77],
+        "ndvi": [0.60, 0.65, 0.80, 0.90, 0.95, 0.85, 0.80, 0.75, 0.80, 0.85, 0.75, 0.65]
+    },
+    "Coastal": {
+        "rainfall": [35, 45, 80, 120, 180, 90, 70, 60, 50, 60, 80, 50],
+        "temperature": [27, 28, 28, 27, 26, 25, 25, 26, 27, 28, 28, 27],
+        "humidity": [70, 72, 75, 78, 82, 80, 75, 72, 70, 72, 75, 72],
+        "ndvi": [0.40, 0.45, 0.60, 0.75, 0.80, 0.65, 0.55, 0.50, 0.45, 0.50, 0.60, 0.45]
+    },
+    "Tropical": {
+        "rainfall": [60, 70, 140, 180, 160, 120, 100, 90, 100, 120, 100, 80],
+        "temperature": [23, 24, 25, 24, 23, 22, 21, 22, 23, 24, 24, 23],
+        "humidity": [70, 73, 78, 82, 85, 82, 78, 75, 73, 75, 78, 73],
+        "ndvi": [0.50, 0.55, 0.75, 0.85, 0.90, 0.80, 0.70, 0.65, 0.70, 0.75, 0.70, 0.60]
+    }
+}
+
+# Metric axis order of the baseline index
+METRICS = ("temperature", "rainfall", "humidity", "ndvi")
+METRIC_INDEX = {metric: i for i, metric in enumerate(METRICS)}
+
+
+def get_base_zone(climate_zone: str) -> str:
+    """Map a county climate zone to the seasonal pattern it follows"""
+    if "Highland" in climate_zone:
+        if "Tropical" in climate_zone:
+            return "Highland Tropical"
+        return "Highland Agricultural"
+    elif "Coastal" in climate_zone:
+        return "Coastal"
+    elif "Tropical" in climate_zone:
+        return "Tropical"
+    elif "Semi-Arid" in climate_zone:
+        return "Semi-Arid"
+    elif "Arid" in climate_zone:
+        return "Arid"
+    return "Semi-Arid"  # Default
+
+
+def get_drought_thresholds(climate_zone: str):
+    """Rainfall (mm) and NDVI levels below which a county is considered drought-stressed"""
+    if "Arid" in climate_zone:
+        return 20, 0.2
+    elif "Semi-Arid" in climate_zone:
+        return 40, 0.3
+    elif "Highland" in climate_zone:
+        return 80, 0.5
+    return 50, 0.3  # Default
+
+
+def _build_baseline_index():
+    """Build the (counties, 12 months, metrics) baseline array with elevation corrections applied"""
+    # Rows follow the registry, so registry positions index the baselines directly
+    county_ids = tuple(county_registry.ids.tolist())
+    baselines = np.empty((len(county_ids), 12, len(METRICS)), dtype=np.float64)
+    thresholds = np.empty((len(county_ids), 2), dtype=np.float64)
+
+    for row, county_id in enumerate(county_ids):
+        county = KENYA_COUNTIES[county_id]
+        pattern = SEASONAL_PATTERNS[get_base_zone(county["climate_zone"])]
+        for metric, column in METRIC_INDEX.items():
+            baselines[row, :, column] = pattern[metric]
+        thresholds[row] = get_drought_thresholds(county["climate_zone"])
+
+    # Temperature decreases ~2 °C per 1000 m above 1000 m
+    elevation = county_registry.column("elevation_m")
+    baselines[:, :, METRIC_INDEX["temperature"]] -= ((elevation - 1000) / 1000.0 * 2.0)[:, None]
+
+    baselines.flags.writeable = False
+    thresholds.flags.writeable = False
+    return county_ids, baselines, thresholds
+
+
+COUNTY_IDS, COUNTY_BASELINES, COUNTY_DROUGHT_THRESHOLDS = _build_baseline_index()
+COUNTY_ROWS = {county_id: row for row, county_id in enumerate(COUNTY_IDS)}
+
+
+def get_seasonal_baseline(county_id: int, month: int, metric: str) -> float:
+    """Seasonal baseline for a county, month (1-12) and metric"""
+    return float(COUNTY_BASELINES[COUNTY_ROWS[county_id], (month - 1) % 12, METRIC_INDEX[metric]])
+
+
+def get_county_normals(county_id: int, month: int) -> Dict[str, float]:
+    """Seasonal NDVI, monthly rainfall (mm) and temperature normals used as drought baselines"""
+    return {
+        "ndvi_normal": get_seasonal_baseline(county_id, month, "ndvi"),
+        "rainfall_normal": get_seasonal_baseline(county_id, month, "rainfall"),
+        "temp_normal": get_seasonal_baseline(county_id, month, "temperature")
+    }
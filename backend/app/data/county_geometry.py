@@ -0,0 +1,205 @@
+"""
+Kenya county geometries and raster masks
+County polygons rasterized once per grid and cached as packed bit arrays for zonal statistics
+"""
+import os
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import shapely
+from shapely.geometry import box, shape
+from dotenv import load_dotenv
+
+from .county_table import KENYA_COUNTIES
+from .county_registry import normalize_name
+
+load_dotenv()
+
+# GeoJSON FeatureCollection of county boundaries, shipped next to this module
+# (refresh it with backend/fetch_county_boundaries.py); counties missing from it fall back to bounding boxes
+KENYA_COUNTIES_GEOJSON = os.getenv("KENYA_COUNTIES_GEOJSON") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "kenya_counties.geojson"
+)
+COUNTY_MASK_CACHE_SIZE = int(os.getenv("COUNTY_MASK_CACHE_SIZE", "1024"))
+LABEL_CACHE_SIZE = 8
+
+# Feature properties that commonly carry the county name in published boundary files
+NAME_PROPERTIES = ("COUNTY_NAM", "COUNTY", "county", "NAME_1", "shapeName", "name")
+
+# Kenya national extent
+KENYA_BOUNDS = {"north": 5.0, "south": -4.7, "east": 41.9, "west": 33.9}
+
+# Name and bounding box of every county keyed by KENYA_COUNTIES id, shared by all GIBS services
+COUNTY_BOUNDS = {
+    county_id: {"name": county["name"], **county["bounds"]}
+    for county_id, county in KENYA_COUNTIES.items()
+}
+
+_geometries: Optional[Dict[int, object]] = None
+_fallbacks: List[int] = []
+_mask_cache: "OrderedDict[Tuple, Tuple[np.ndarray, Tuple[int, int]]]" = OrderedDict()
+_label_cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+
+
+# Suffixes some boundary files add to county names ("Nairobi City", "Kisumu County")
+NAME_SUFFIXES = ("county", "city")
+# Published misspellings, by normalized name
+NAME_ALIASES = {"elegeyomarakwet": "elgeyomarakwet"}
+
+_ids_by_name = {normalize_name(county["name"]): county_id for county_id, county in KENYA_COUNTIES.items()}
+
+
+def match_county_name(name: str) -> Optional[int]:
+    """KENYA_COUNTIES id for a county name as written in a boundary file, or None"""
+    key = normalize_name(name)
+    key = NAME_ALIASES.get(key, key)
+    for suffix in NAME_SUFFIXES:
+        if key not in _ids_by_name and key.endswith(suffix):
+            key = key[:-len(suffix)]
+    return _ids_by_name.get(key)
+
+
+def _load_geojson(path: str) -> Dict[int, object]:
+    """County polygons from a GeoJSON file, matched to KENYA_COUNTIES by name"""
+    with open(path, encoding="utf-8") as handle:
+        features = json.load(handle).get("features", [])
+
+    geometries = {}
+    for feature in features:
+        properties = feature.get("properties") or {}
+        name = next((properties[key] for key in NAME_PROPERTIES if properties.get(key)), None)
+        county_id = match_county_name(str(name)) if name else None
+        if county_id is not None and feature.get("geometry"):
+            geometry = shape(feature["geometry"])
+            # Simplified boundary files can contain self-intersections that break point-in-polygon tests
+            geometries[county_id] = geometry if geometry.is_valid else shapely.make_valid(geometry)
+    return geometries
+
+
+def _build_geometries() -> Dict[int, object]:
+    geometries = {}
+    try:
+        geometries = _load_geojson(KENYA_COUNTIES_GEOJSON)
+    except (OSError, ValueError) as e:
+        print(f"County boundary load error: {e}")
+
+    # Bounding boxes overlap their neighbours, so masks, labels and adjacency are approximate for these
+    missing = [county_id for county_id in KENYA_COUNTIES if county_id not in geometries]
+    if missing:
+        print(
+            f"Warning: no boundary polygon in {KENYA_COUNTIES_GEOJSON} for {len(missing)} counties, "
+            f"using bounding boxes: {', '.join(KENYA_COUNTIES[county_id]['name'] for county_id in missing)}"
+        )
+    for county_id in missing:
+        bounds = KENYA_COUNTIES[county_id]["bounds"]
+        geometries[county_id] = box(bounds["west"], bounds["south"], bounds["east"], bounds["north"])
+    _fallbacks[:] = missing
+
+    for geometry in geometries.values():
+        shapely.prepare(geometry)
+    return geometries
+
+
+def get_county_geometries() -> Dict[int, object]:
+    """Shapely geometry for every county, loaded once"""
+    global _geometries
+    if _geometries is None:
+        _geometries = _build_geometries()
+    return _geometries
+
+
+def fallback_counties() -> List[int]:
+    """Ids of counties using their bounding box because no boundary polygon was loaded"""
+    get_county_geometries()
+    return list(_fallbacks)
+
+
+def get_county_bounds(county_id: int) -> Optional[Dict]:
+    """Name and bounding box of a county, or None if the county is unknown"""
+    return COUNTY_BOUNDS.get(county_id)
+
+
+def get_county_geometry(county_id: int):
+    """Polygon of a county, or None if the county is unknown"""
+    return get_county_geometries().get(county_id)
+
+
+def pixel_centers(bbox: Sequence[float], size: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Lon/lat of each pixel center for a (south, west, north, east) grid of (width, height); row 0 is north"""
+    south, west, north, east = bbox
+    width, height = size
+    lons = west + (np.arange(width) + 0.5) * (east - west) / width
+    lats = north - (np.arange(height) + 0.5) * (north - south) / height
+    return np.meshgrid(lons, lats)
+
+
+def rasterize_geometry(geometry, bbox: Sequence[float], size: Sequence[int]) -> np.ndarray:
+    """Boolean (height, width) mask of pixels whose centers fall inside the geometry"""
+    south, west, north, east = bbox
+    width, height = size
+    mask = np.zeros((height, width), dtype=bool)
+
+    # Only test pixels inside the geometry's own bounding box
+    min_x, min_y, max_x, max_y = geometry.bounds
+    col0 = max(int(np.floor((min_x - west) / (east - west) * width)), 0)
+    col1 = min(int(np.ceil((max_x - west) / (east - west) * width)), width)
+    row0 = max(int(np.floor((north - max_y) / (north - south) * height)), 0)
+    row1 = min(int(np.ceil((north - min_y) / (north - south) * height)), height)
+    if col0 >= col1 or row0 >= row1:
+        return mask
+
+    lon_grid, lat_grid = pixel_centers(bbox, size)
+    window = (slice(row0, row1), slice(col0, col1))
+    mask[window] = shapely.contains_xy(geometry, lon_grid[window], lat_grid[window])
+
+    if not mask.any():
+        # Geometry smaller than a pixel: keep the pixel under its representative point
+        point = geometry.representative_point()
+        col = int((point.x - west) / (east - west) * width)
+        row = int((north - point.y) / (north - south) * height)
+        if 0 <= row < height and 0 <= col < width:
+            mask[row, col] = True
+    return mask
+
+
+def county_mask(county_id: int, bbox: Sequence[float], size: Sequence[int]) -> Optional[np.ndarray]:
+    """Cached boolean mask of a county on a grid, or None if the county is unknown"""
+    geometry = get_county_geometry(county_id)
+    if geometry is None:
+        return None
+
+    key = (county_id, tuple(round(float(v), 6) for v in bbox), tuple(int(v) for v in size))
+    cached = _mask_cache.get(key)
+    if cached is not None:
+        _mask_cache.move_to_end(key)
+        packed, shape_hw = cached
+        return np.unpackbits(packed, count=shape_hw[0] * shape_hw[1]).reshape(shape_hw).view(bool)
+
+    mask = rasterize_geometry(geometry, bbox, size)
+    _mask_cache[key] = (np.packbits(mask), mask.shape)
+    while len(_mask_cache) > COUNTY_MASK_CACHE_SIZE:
+        _mask_cache.popitem(last=False)
+    return mask
+
+
+def county_label_raster(bbox: Sequence[float], size: Sequence[int]) -> np.ndarray:
+    """Read-only (height, width) int16 raster of county ids on a grid, 0 outside every county"""
+    key = (tuple(round(float(v), 6) for v in bbox), tuple(int(v) for v in size))
+    labels = _label_cache.get(key)
+    if labels is not None:
+        _label_cache.move_to_end(key)
+        return labels
+
+    width, height = size
+    labels = np.zeros((height, width), dtype=np.int16)
+    geometries = get_county_geometries()
+    # Paint large counties first so smaller ones win where fallback boxes overlap
+    for county_id in sorted(geometries, key=lambda cid: geometries[cid].area, reverse=True):
+        labels[rasterize_geometry(geometries[county_id], bbox, size)] = county_id
+    labels.setflags(write=False)
+
+    _label_cache[key] = labels
+    while len(_label_cache) > LABEL_CACHE_SIZE:
+        _label_cache.popitem(last=False)
+    return labels
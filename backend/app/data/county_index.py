@@ -0,0 +1,103 @@
+"""
+Spatial index over Kenya county polygons
+STR-tree point/bbox lookups with precomputed centroids, distances and adjacency
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import shapely
+from shapely.geometry import Point, box
+from shapely.strtree import STRtree
+
+from .county_geometry import get_county_geometries
+
+# Points this close (degrees, ~5.5 km) outside every polygon still resolve to the nearest county,
+# since simplified boundaries clip islands and towns on the coast or border (e.g. Lamu, Mandera)
+LOCATE_TOLERANCE_DEG = 0.05
+
+# First search radius (degrees) for k > 1 nearest queries, doubled until k counties fall inside
+NEAREST_START_RADIUS_DEG = 0.5
+
+
+class CountySpatialIndex:
+    """Point-in-county, bbox and nearest-county queries over all county polygons"""
+
+    def __init__(self, geometries: Dict[int, object]):
+        self.ids = np.array(sorted(geometries), dtype=np.int64)
+        self.geometries = np.array([geometries[county_id] for county_id in self.ids], dtype=object)
+        self.tree = STRtree(self.geometries)
+        self._positions = {int(county_id): i for i, county_id in enumerate(self.ids)}
+
+        # (n, 2) lon/lat centroids and the pairwise centroid distances in degrees
+        self.centroids = shapely.get_coordinates(shapely.centroid(self.geometries))
+        delta = self.centroids[:, None, :] - self.centroids[None, :, :]
+        self.distances = np.sqrt((delta ** 2).sum(axis=-1))
+        self.areas = shapely.area(self.geometries)
+
+        # Counties whose polygons touch or overlap
+        left, right = self.tree.query(self.geometries, predicate="intersects")
+        self.adjacency = np.zeros((len(self.ids), len(self.ids)), dtype=bool)
+        self.adjacency[left, right] = True
+        np.fill_diagonal(self.adjacency, False)
+
+    def locate(self, lat: float, lon: float) -> Optional[int]:
+        """Id of the county containing the point, or None outside Kenya"""
+        candidates = self.tree.query(Point(lon, lat), predicate="intersects")
+        if len(candidates) == 0:
+            nearest_id, distance = self.nearest(lat, lon)[0]
+            return nearest_id if distance <= LOCATE_TOLERANCE_DEG else None
+        # Where boundaries overlap, the smaller county wins (as in the county label raster)
+        return int(self.ids[candidates[np.argmin(self.areas[candidates])]])
+
+    def intersecting(self, south: float, west: float, north: float, east: float) -> List[int]:
+        """Ids of counties intersecting a bbox"""
+        candidates = self.tree.query(box(west, south, east, north), predicate="intersects")
+        return sorted(int(county_id) for county_id in self.ids[candidates])
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[int, float]]:
+        """The k counties closest to a point as (id, distance in degrees), 0 for the containing county"""
+        point = Point(lon, lat)
+        k = max(1, min(k, len(self.ids)))
+        candidates, distances = self.tree.query_nearest(point, return_distance=True)
+
+        if k > 1:
+            # Every county closer than the k-th candidate within a radius lies inside that radius
+            radius = max(2 * float(distances.min()), NEAREST_START_RADIUS_DEG)
+            while True:
+                candidates = self.tree.query(point, predicate="dwithin", distance=radius)
+                if len(candidates) >= k:
+                    break
+                radius *= 2
+            distances = shapely.distance(self.geometries[candidates], point)
+
+        # Closest first; ties go to the lower position, which is the lower county id
+        order = np.lexsort((candidates, distances))[:k]
+        return [(int(self.ids[candidates[i]]), float(distances[i])) for i in order]
+
+    def neighbors(self, county_id: int, distance_threshold: float) -> List[Tuple[int, float]]:
+        """Other counties with centroids within distance_threshold degrees, closest first"""
+        position = self._positions.get(county_id)
+        if position is None:
+            return []
+        row = self.distances[position]
+        within = np.flatnonzero(row <= distance_threshold)
+        within = within[within != position]
+        within = within[np.argsort(row[within], kind="stable")]
+        return [(int(self.ids[i]), float(row[i])) for i in within]
+
+    def adjacent(self, county_id: int) -> List[int]:
+        """Ids of counties sharing a boundary with the county"""
+        position = self._positions.get(county_id)
+        if position is None:
+            return []
+        return [int(county_id) for county_id in self.ids[self.adjacency[position]]]
+
+
+_index: Optional[CountySpatialIndex] = None
+
+
+def get_county_index() -> CountySpatialIndex:
+    """Spatial index over the county polygons, built once"""
+    global _index
+    if _index is None:
+        _index = CountySpatialIndex(get_county_geometries())
+    return _index
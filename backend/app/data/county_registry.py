@@ -0,0 +1,106 @@
+"""
+Indexed, read-only registry of Kenya counties
+Normalized name/capital/zone indexes, prefix and fuzzy search, and NumPy attribute columns
+"""
+import difflib
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+from .county_table import KENYA_COUNTIES
+
+# Numeric county attributes exposed as aligned arrays
+NUMERIC_COLUMNS = ("population", "area_km2", "elevation_m", "annual_rainfall_mm", "avg_temp_c")
+
+FUZZY_CUTOFF = 0.75
+
+
+def normalize_name(name: str) -> str:
+    """Case-, accent- and punctuation-insensitive form of a name ("Murang'a" -> "muranga")"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(ch for ch in decomposed.casefold() if ch.isalnum())
+
+
+class CountyRegistry:
+    """Counties indexed once for constant-time lookups; all indexes and columns are read-only"""
+
+    def __init__(self, counties: Dict[int, Dict]):
+        self.counties: Mapping[int, Dict] = MappingProxyType(counties)
+        self.ids = np.array(sorted(counties), dtype=np.int64)
+
+        by_name, by_capital, by_zone = {}, {}, {}
+        for county_id in self.ids.tolist():
+            county = counties[county_id]
+            by_name[normalize_name(county["name"])] = county_id
+            by_capital.setdefault(normalize_name(county["capital"]), county_id)
+            by_zone.setdefault(normalize_name(county["climate_zone"]), []).append(county_id)
+        self._by_name: Mapping[str, int] = MappingProxyType(by_name)
+        self._by_capital: Mapping[str, int] = MappingProxyType(by_capital)
+        self._by_zone: Mapping[str, Tuple[int, ...]] = MappingProxyType(
+            {zone: tuple(ids) for zone, ids in by_zone.items()}
+        )
+        self._names = sorted(by_name)
+
+        columns = {
+            column: np.array([counties[county_id][column] for county_id in self.ids.tolist()], dtype=np.float64)
+            for column in NUMERIC_COLUMNS
+        }
+        # (n, 4) bounds as south, west, north, east
+        columns["bounds"] = np.array([
+            [counties[county_id]["bounds"][side] for side in ("south", "west", "north", "east")]
+            for county_id in self.ids.tolist()
+        ], dtype=np.float64)
+        for values in columns.values():
+            values.setflags(write=False)
+        self.ids.setflags(write=False)
+        self._columns: Mapping[str, np.ndarray] = MappingProxyType(columns)
+
+    def by_name(self, name: str) -> Optional[int]:
+        """County id for a name, ignoring case, accents and punctuation"""
+        return self._by_name.get(normalize_name(name))
+
+    def by_capital(self, capital: str) -> Optional[int]:
+        """County id for its capital town"""
+        return self._by_capital.get(normalize_name(capital))
+
+    def in_zone(self, zone: str) -> Tuple[int, ...]:
+        """Ids of the counties in a climate zone"""
+        return self._by_zone.get(normalize_name(zone), ())
+
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        """Ids matching a name or capital: exact first, then prefix, substring and fuzzy matches"""
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        matches: List[int] = []
+        for county_id in (self._by_name.get(key), self._by_capital.get(key)):
+            if county_id is not None and county_id not in matches:
+                matches.append(county_id)
+
+        prefix = [name for name in self._names if name.startswith(key)]
+        substring = [name for name in self._names if key in name and not name.startswith(key)]
+        fuzzy = difflib.get_close_matches(key, self._names, n=limit, cutoff=FUZZY_CUTOFF)
+        for name in prefix + substring + fuzzy:
+            county_id = self._by_name[name]
+            if county_id not in matches:
+                matches.append(county_id)
+        return matches[:limit]
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only attribute array aligned with self.ids"""
+        return self._columns[name]
+
+    def positions(self, county_ids: Sequence[int]) -> np.ndarray:
+        """Row positions of county ids in the columns; raises KeyError for unknown ids"""
+        county_ids = np.asarray(county_ids, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.ids, county_ids), len(self.ids) - 1)
+        unknown = county_ids[self.ids[positions] != county_ids]
+        if len(unknown):
+            raise KeyError(int(unknown[0]))
+        return positions
+
+
+# Global county registry, built once at import
+county_registry = CountyRegistry(KENYA_COUNTIES)
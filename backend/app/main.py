@@ -10,7 +10,20 @@ from dotenv import load_dotenv
 
 from .api.routes import climate, community
 from .utils.database import init_db
-from .utils.cache import init_cache
+from .utils.cache import init_cache, close_cache, get_cache_stats
+from .utils.tile_store import tile_store
+from .utils.raster_executor import raster_executor
+from .utils.upstream import upstream_client
+from .services.gibs_wmts import gibs_wmts_client
+from .utils.http import get_http_session, close_http_session
+from .utils.serialization import FastJSONResponse
+from .utils.http_cache import HTTPCacheMiddleware
+from .services.nasa_gibs_service import nasa_gibs_service
+from .services.enhanced_nasa_gibs import enhanced_nasa_gibs_service
+from .services.production_nasa_gibs import production_nasa_gibs_service
+from .services.daily_prefetch import prefetch_scheduler
+from .services.enhanced_climate_service import CURRENT_DATA_TTL, HISTORICAL_TTL, PREDICTIONS_TTL, DROUGHT_RISK_TTL
+from .services.national_mosaic import NATIONAL_TTL
 
 load_dotenv()
 
@@ -23,16 +36,32 @@ async def lifespan(app: FastAPI):
     # Initialize cache
     await init_cache()
     
+    # One pooled HTTP session shared by all GIBS services
+    http_session = await get_http_session()
+    for service in (nasa_gibs_service, enhanced_nasa_gibs_service, production_nasa_gibs_service):
+        service.attach_session(http_session)
+    
+    # Daily GIBS prefetch runs in-process unless Celery beat owns the schedule;
+    # workers share it through a Redis lock, or it needs a single worker without Redis
+    if not os.getenv("CELERY_BROKER_URL"):
+        prefetch_scheduler.start()
+    
     yield
     
     # Cleanup on shutdown
-    pass
+    await prefetch_scheduler.stop()
+    for service in (nasa_gibs_service, enhanced_nasa_gibs_service, production_nasa_gibs_service):
+        await service.close()
+    await close_http_session()
+    await close_cache()
+    raster_executor.shutdown()
 
 app = FastAPI(
     title="Kenya Climate Change API",
     description="Progressive Web Application for Climate Change Monitoring in Kenya",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -44,6 +73,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Client caching aligned with the service-side cache lifetimes
+app.add_middleware(HTTPCacheMiddleware, rules={
+    r"^/api/v1/climate/overview/current$": CURRENT_DATA_TTL,
+    r"^/api/v1/climate/counties/\d+/historical$": HISTORICAL_TTL,
+    r"^/api/v1/climate/counties/\d+/predictions$": PREDICTIONS_TTL,
+    r"^/api/v1/climate/counties/\d+/visualization-data$": HISTORICAL_TTL,
+    r"^/api/v1/climate/drought-risk/assessment$": DROUGHT_RISK_TTL,
+    r"^/api/v1/climate/satellite/national/\w+$": NATIONAL_TTL
+})
+
 # Include API routes
 app.include_router(climate.router, prefix="/api/v1/climate", tags=["Climate Data"])
 app.include_router(community.router, prefix="/api/v1/community", tags=["Community Reports"])
@@ -62,7 +101,12 @@ async def health_check():
         "environment": os.getenv("ENVIRONMENT", "development"),
         "services": {
             "database": "connected",
-            "cache": "active"
+            "cache": get_cache_stats(),
+            "tile_store": await raster_executor.run_io(tile_store.stats),
+            "raster_executor": raster_executor.stats(),
+            "upstream": upstream_client.stats(),
+            "wmts": gibs_wmts_client.stats(),
+            "prefetch": prefetch_scheduler.stats()
         }
     }
 
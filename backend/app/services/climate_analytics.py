@@ -0,0 +1,28 @@
+"""
+Batched climate analytics
+Trend statistics for many counties at once over a stacked NumPy matrix
+"""
+import numpy as np
+from typing import Dict
+
+
+def linear_trends(series: np.ndarray) -> Dict[str, np.ndarray]:
+    """Least-squares slope, mean and current value for each row of a (counties, months) matrix"""
+    series = np.asarray(series, dtype=np.float64)
+    months = series.shape[1]
+
+    # Centered time axis: sum(t) == 0, so the OLS slope reduces to (y . t) / (t . t)
+    t = np.arange(months, dtype=np.float64) - (months - 1) / 2.0
+    denominator = t @ t
+    slope = series @ t / denominator if denominator > 0 else np.zeros(series.shape[0])
+
+    return {
+        "slope": slope,
+        "mean": series.mean(axis=1),
+        "current": series[:, -1]
+    }
+
+
+def classify_trends(slope: np.ndarray, threshold: float = 0.1) -> np.ndarray:
+    """Label each slope as increasing, decreasing or stable"""
+    return np.where(slope > threshold, "increasing", np.where(slope < -threshold, "decreasing", "stable"))
@@ -0,0 +1,131 @@
+"""
+GIBS colormap registry
+Parses each layer's colormap XML once into an RGB lookup table for pixel-to-value conversion
+"""
+import os
+import time
+import asyncio
+import math
+import xml.etree.ElementTree as ET
+import numpy as np
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+from ..utils.http import get_http_session
+
+load_dotenv()
+
+GIBS_COLORMAP_URL = os.getenv("GIBS_COLORMAP_URL", "https://gibs.earthdata.nasa.gov/colormaps/v1.3/{layer}.xml")
+# Retry interval for layers whose colormap could not be fetched
+COLORMAP_RETRY_SECONDS = 3600
+
+KELVIN_UNITS = ("k", "kelvin")
+
+
+def _interval_value(value: str) -> float:
+    """Representative value of a GIBS entry: "[a,b)" -> midpoint, "a" -> a"""
+    value = value.strip()
+    if value[:1] not in "[(":
+        return float(value)
+    low, high = (float(bound.replace("INF", "inf")) for bound in value[1:-1].split(","))
+    if math.isinf(low):
+        return high
+    if math.isinf(high):
+        return low
+    return (low + high) / 2.0
+
+
+def parse_colormap(xml_text: str) -> Optional[Dict]:
+    """RGB-hash lookup table from a GIBS v1.3 colormap document"""
+    root = ET.fromstring(xml_text)
+    rgb_keys = []
+    values = []
+    units = ""
+
+    for colormap in root.iter("ColorMap"):
+        units = units or colormap.get("units", "")
+        for entry in colormap.iter("ColorMapEntry"):
+            rgb = entry.get("rgb")
+            if not rgb:
+                continue
+            r, g, b = (int(c) for c in rgb.split(","))
+            no_data = entry.get("transparent") == "true" or entry.get("nodata") == "true"
+            try:
+                value = np.nan if no_data or entry.get("value") is None else _interval_value(entry.get("value"))
+            except ValueError:
+                value = np.nan
+            rgb_keys.append((r << 16) | (g << 8) | b)
+            values.append(value)
+
+    if not rgb_keys:
+        return None
+
+    # Sorted unique keys so a pixel hash resolves with one searchsorted; first entry wins on duplicates
+    keys, first = np.unique(np.array(rgb_keys, dtype=np.uint32), return_index=True)
+    return {
+        "keys": keys,
+        "values": np.array(values, dtype=np.float64)[first],
+        "units": units
+    }
+
+
+def apply_colormap(image_array: np.ndarray, lut: Dict) -> np.ndarray:
+    """Map RGBA pixels to physical values, with NaN for transparent or unknown colours"""
+    rgb = image_array[..., :3].astype(np.uint32)
+    pixel_keys = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+    keys = lut["keys"]
+    index = np.searchsorted(keys, pixel_keys)
+    np.minimum(index, len(keys) - 1, out=index)
+    values = np.take(lut["values"], index)
+
+    unknown = keys[index] != pixel_keys
+    if image_array.shape[-1] == 4:
+        unknown |= image_array[..., 3] == 0
+    values[unknown] = np.nan
+
+    if lut.get("units", "").lower() in KELVIN_UNITS:
+        values -= 273.15
+    return values
+
+
+class ColormapRegistry:
+    """Fetches and parses each layer's colormap once per process"""
+
+    def __init__(self):
+        self._luts: Dict[str, Dict] = {}
+        self._failed: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, layer_name: str) -> Optional[Dict]:
+        """Lookup table for a layer, or None to fall back to linear scaling"""
+        if layer_name in self._luts:
+            return self._luts[layer_name]
+
+        async with self._lock:
+            if layer_name in self._luts:
+                return self._luts[layer_name]
+            if time.time() - self._failed.get(layer_name, 0) < COLORMAP_RETRY_SECONDS:
+                return None
+            return await self._load(layer_name)
+
+    async def _load(self, layer_name: str) -> Optional[Dict]:
+        try:
+            session = await get_http_session()
+            async with session.get(GIBS_COLORMAP_URL.format(layer=layer_name)) as response:
+                if response.status != 200:
+                    raise ValueError(f"HTTP error {response.status}")
+                lut = parse_colormap(await response.text())
+            if lut is None:
+                raise ValueError("no colormap entries")
+        except Exception as e:
+            print(f"Colormap load error for {layer_name}: {e}")
+            self._failed[layer_name] = time.time()
+            return None
+
+        self._luts[layer_name] = lut
+        return lut
+
+
+# Global colormap registry instance
+colormap_registry = ColormapRegistry()
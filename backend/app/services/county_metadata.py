@@ -0,0 +1,117 @@
+"""
+Static county metadata responses
+Rendered and encoded once per process, since county and climate zone data only change on deploy
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..data.kenya_counties import KENYA_COUNTIES, CLIMATE_ZONES, get_counties_by_climate_zone
+from ..data.county_registry import county_registry
+from ..utils.http_cache import StaticPayload
+
+# Distinct search queries kept encoded
+SEARCH_CACHE_SIZE = 512
+
+
+def counties_content() -> Dict:
+    return {
+        "total_counties": len(KENYA_COUNTIES),
+        "counties": [
+            {
+                "id": county_id,
+                "name": county_data["name"],
+                "capital": county_data["capital"],
+                "climate_zone": county_data["climate_zone"],
+                "population": county_data["population"],
+                "area_km2": county_data["area_km2"],
+                "elevation_m": county_data["elevation_m"]
+            }
+            for county_id, county_data in KENYA_COUNTIES.items()
+        ],
+        "climate_zones": list(CLIMATE_ZONES.keys())
+    }
+
+
+def county_content(county_id: int) -> Dict:
+    county_data = KENYA_COUNTIES[county_id]
+    return {
+        "county": county_data,
+        "climate_zone_details": CLIMATE_ZONES.get(county_data["climate_zone"], {}),
+        "coordinates": {
+            "center": {
+                "latitude": (county_data["bounds"]["north"] + county_data["bounds"]["south"]) / 2,
+                "longitude": (county_data["bounds"]["east"] + county_data["bounds"]["west"]) / 2
+            },
+            "bounds": county_data["bounds"]
+        }
+    }
+
+
+def climate_zones_content() -> Dict:
+    return {
+        "total_zones": len(CLIMATE_ZONES),
+        "climate_zones": CLIMATE_ZONES,
+        "counties_by_zone": {
+            zone: [
+                {"id": county_id, "name": county_data["name"]}
+                for county_id, county_data in get_counties_by_climate_zone(zone)
+            ]
+            for zone in CLIMATE_ZONES.keys()
+        }
+    }
+
+
+def search_content(name: Optional[str], climate_zone: Optional[str]) -> Dict:
+    county_ids = []
+    if name:
+        # Exact, prefix, substring and fuzzy matches on county names and capitals
+        county_ids.extend(county_registry.search(name))
+    if climate_zone:
+        county_ids.extend(county_registry.in_zone(climate_zone))
+
+    results = [
+        {
+            "id": county_id,
+            "name": KENYA_COUNTIES[county_id]["name"],
+            "climate_zone": KENYA_COUNTIES[county_id]["climate_zone"],
+            "capital": KENYA_COUNTIES[county_id]["capital"]
+        }
+        for county_id in county_ids
+    ]
+    return {
+        "search_criteria": {"name": name, "climate_zone": climate_zone},
+        "results_count": len(results),
+        "results": results
+    }
+
+
+class CountyMetadata:
+    """Pre-encoded county metadata payloads"""
+
+    def __init__(self):
+        self.counties = StaticPayload(counties_content())
+        self.climate_zones = StaticPayload(climate_zones_content())
+        self._county: Dict[int, StaticPayload] = {
+            county_id: StaticPayload(county_content(county_id)) for county_id in KENYA_COUNTIES
+        }
+        self._search: "OrderedDict[Tuple, StaticPayload]" = OrderedDict()
+
+    def county(self, county_id: int) -> Optional[StaticPayload]:
+        return self._county.get(county_id)
+
+    def search(self, name: Optional[str], climate_zone: Optional[str]) -> StaticPayload:
+        key = (name, climate_zone)
+        payload = self._search.get(key)
+        if payload is not None:
+            self._search.move_to_end(key)
+            return payload
+
+        payload = StaticPayload(search_content(name, climate_zone))
+        self._search[key] = payload
+        while len(self._search) > SEARCH_CACHE_SIZE:
+            self._search.popitem(last=False)
+        return payload
+
+
+# Global county metadata instance, rendered at import
+county_metadata = CountyMetadata()
@@ -0,0 +1,224 @@
+"""
+Scheduled prefetch of daily NASA GIBS layers for every county
+Warms the national statistics cache and the climate_data table after GIBS publishes a new day
+
+Every API worker starts the in-process scheduler, so each run first claims a Redis lock keyed
+on the run date and only one worker fetches a given day. Without Redis there is no shared lock,
+and the scheduler only runs when the server has a single worker (WEB_CONCURRENCY=1).
+"""
+import os
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from ..data.kenya_counties import KENYA_COUNTIES
+from ..utils.cache import acquire_lock, cache, release_lock
+from ..utils.database import AsyncSessionLocal
+from .national_mosaic import national_mosaic_service
+
+load_dotenv()
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+# GIBS publishes the previous day's MODIS/IMERG imagery within a few hours of midnight UTC
+PREFETCH_HOUR_UTC = int(os.getenv("PREFETCH_HOUR_UTC", "6"))
+PREFETCH_ON_STARTUP = os.getenv("PREFETCH_ON_STARTUP", "false").lower() == "true"
+PREFETCH_DATA_SOURCE = "NASA_GIBS"
+# A day's lock outlives its run so workers starting later that day do not repeat it
+PREFETCH_LOCK_TTL = int(os.getenv("PREFETCH_LOCK_TTL", "43200"))
+# Server worker count as read by uvicorn and gunicorn
+WEB_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+# A failed run releases its lock and is retried after this delay (seconds), up to PREFETCH_MAX_RETRIES times
+PREFETCH_RETRY_DELAY = int(os.getenv("PREFETCH_RETRY_DELAY", "1800"))
+PREFETCH_MAX_RETRIES = int(os.getenv("PREFETCH_MAX_RETRIES", "6"))
+
+PREFETCH_LAYERS = ("ndvi", "temperature", "precipitation")
+
+CLIMATE_DATA_UPSERT = text("""
+    INSERT INTO climate_data (county_id, date, ndvi_mean, ndvi_std, temperature_mean,
+                              temperature_max, temperature_min, rainfall, data_source)
+    VALUES (:county_id, :date, :ndvi_mean, :ndvi_std, :temperature_mean,
+            :temperature_max, :temperature_min, :rainfall, :data_source)
+    ON CONFLICT (county_id, date, data_source) DO UPDATE SET
+        ndvi_mean = EXCLUDED.ndvi_mean,
+        ndvi_std = EXCLUDED.ndvi_std,
+        temperature_mean = EXCLUDED.temperature_mean,
+        temperature_max = EXCLUDED.temperature_max,
+        temperature_min = EXCLUDED.temperature_min,
+        rainfall = EXCLUDED.rainfall
+""")
+
+
+def climate_data_rows(day: date, layer_results: Dict[str, Dict]) -> List[Dict]:
+    """One climate_data row per county from the national statistics of each layer"""
+    by_layer = {
+        layer: {county["county_id"]: county for county in result.get("counties", []) if county["count"] > 0}
+        for layer, result in layer_results.items()
+    }
+    rows = []
+    for county_id in KENYA_COUNTIES:
+        ndvi = by_layer.get("ndvi", {}).get(county_id)
+        temperature = by_layer.get("temperature", {}).get(county_id)
+        precipitation = by_layer.get("precipitation", {}).get(county_id)
+        if not (ndvi or temperature or precipitation):
+            continue
+        rows.append({
+            "county_id": county_id,
+            "date": day,
+            "ndvi_mean": ndvi["mean"] if ndvi else None,
+            "ndvi_std": ndvi["std"] if ndvi else None,
+            "temperature_mean": temperature["mean"] if temperature else None,
+            "temperature_max": temperature["max"] if temperature else None,
+            "temperature_min": temperature["min"] if temperature else None,
+            # IMERG rates are mm/hr; a day's accumulation is the mean rate over 24 hours
+            "rainfall": round(precipitation["mean"] * 24, 2) if precipitation else None,
+            "data_source": PREFETCH_DATA_SOURCE
+        })
+    return rows
+
+
+async def store_climate_data(rows: List[Dict]) -> int:
+    """Upsert climate_data rows, returning the number written"""
+    if not rows:
+        return 0
+    async with AsyncSessionLocal() as session:
+        await session.execute(CLIMATE_DATA_UPSERT, rows)
+        await session.commit()
+    return len(rows)
+
+
+async def prefetch_daily(day: Optional[date] = None) -> Dict:
+    """Fetch one day's layers for all counties, warm the national endpoint and store the day's rows"""
+    day = day or (datetime.utcnow() - timedelta(days=1)).date()
+    started = datetime.utcnow()
+    summary = {"date": day.isoformat(), "layers": {}, "rows_written": 0}
+
+    # Single-day national statistics feed the table; the default window warms the national endpoint
+    layer_results = {}
+    for layer_type in PREFETCH_LAYERS:
+        result = await national_mosaic_service.get_county_statistics(layer_type, day.isoformat(), day.isoformat())
+        await national_mosaic_service.get_county_statistics(layer_type)
+        if "error" in result:
+            summary["layers"][layer_type] = result["error"]
+            summary.setdefault("failed_layers", []).append(layer_type)
+        else:
+            layer_results[layer_type] = result
+            summary["layers"][layer_type] = f"{len(result['image_dates'])} image dates"
+
+    try:
+        summary["rows_written"] = await store_climate_data(climate_data_rows(day, layer_results))
+    except Exception as e:
+        summary["database_error"] = str(e)
+
+    summary["duration_s"] = round((datetime.utcnow() - started).total_seconds(), 2)
+    return summary
+
+
+def next_run_after(now: datetime, hour: int = PREFETCH_HOUR_UTC) -> datetime:
+    """Next daily run time (UTC) strictly after now"""
+    run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    return run if run > now else run + timedelta(days=1)
+
+
+class PrefetchScheduler:
+    """In-process daily prefetch loop, used when no Celery beat is configured"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[Dict] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @staticmethod
+    def lock_key(day: date) -> str:
+        return f"prefetch_lock_{day.isoformat()}"
+
+    @staticmethod
+    def failed(summary: Dict) -> bool:
+        """Whether a run should be retried: it raised, a layer failed or the rows were not stored"""
+        return any(key in summary for key in ("error", "failed_layers", "database_error"))
+
+    async def claim(self, day: date) -> bool:
+        """Whether this worker runs the given day's prefetch"""
+        claimed = await acquire_lock(self.lock_key(day), PREFETCH_LOCK_TTL)
+        if claimed is None:
+            # No shared lock: only a single-worker server may run the prefetch
+            return WEB_WORKERS <= 1
+        return claimed
+
+    async def run_once(self, day: Optional[date] = None) -> Dict:
+        day = day or (datetime.utcnow() - timedelta(days=1)).date()
+        if not await self.claim(day):
+            self.skipped += 1
+            return {"date": day.isoformat(), "skipped": "prefetch claimed by another worker"}
+        try:
+            summary = await prefetch_daily(day)
+        except Exception as e:
+            summary = {"date": day.isoformat(), "error": f"Prefetch failed: {str(e)}"}
+            print(f"Daily prefetch error: {e}")
+
+        if self.failed(summary):
+            self.failures += 1
+            # Free the day for the retry, here or on another worker
+            await release_lock(self.lock_key(day))
+        else:
+            self.runs += 1
+        self.last_run = summary
+        return summary
+
+    async def _loop(self):
+        retry_day, retries = None, 0
+        run_now = PREFETCH_ON_STARTUP
+        while True:
+            if not run_now:
+                now = datetime.utcnow()
+                self.next_run = now + timedelta(seconds=PREFETCH_RETRY_DELAY) if retry_day else next_run_after(now)
+                await asyncio.sleep((self.next_run - datetime.utcnow()).total_seconds())
+            run_now = False
+
+            # A failed day is retried soon after, instead of waiting for the next daily run
+            summary = await self.run_once(retry_day)
+            if self.failed(summary) and retries < PREFETCH_MAX_RETRIES:
+                retry_day, retries = date.fromisoformat(summary["date"]), retries + 1
+            else:
+                retry_day, retries = None, 0
+
+    def start(self):
+        if not PREFETCH_ENABLED or self.running:
+            return
+        if cache.redis is None and WEB_WORKERS > 1:
+            print(f"Daily prefetch disabled: {WEB_WORKERS} workers and no Redis lock; "
+                  "use Celery beat or configure REDIS_URL")
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": PREFETCH_ENABLED,
+            "running": self.running,
+            "next_run": self.next_run.isoformat() + "Z" if self.next_run else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_run": self.last_run
+        }
+
+
+# Global prefetch scheduler instance
+prefetch_scheduler = PrefetchScheduler()
@@ -3,16 +3,28 @@ Enhanced Climate Service with Prediction and Visualization Support
 Supports all 47 Kenya counties with time-series forecasting
 """
 import asyncio
+import os
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-import random
 import math
 
 from ..data.kenya_counties import KENYA_COUNTIES, CLIMATE_ZONES, get_counties_by_climate_zone
+from ..data.climate_profiles import (
+    COUNTY_ROWS, COUNTY_DROUGHT_THRESHOLDS
+)
 from ..services.production_nasa_gibs import production_nasa_gibs_service
-from ..utils.cache import get_cache, set_cache
+from ..services.time_series_engine import ClimateTimeSeriesEngine, month_labels
+from ..services.climate_analytics import linear_trends, classify_trends
+from ..utils.cache import CACHE_STALE_TTL, get_cache, get_or_compute, set_cache
+from ..utils.concurrency import DEFAULT_CONCURRENCY, gather_bounded
+
+# Cache lifetimes (seconds), also advertised to clients in Cache-Control
+CURRENT_DATA_TTL = 7200
+HISTORICAL_TTL = 14400
+PREDICTIONS_TTL = 21600
+DROUGHT_RISK_TTL = 28800
 
 @dataclass
 class WeatherPrediction:
@@ -33,6 +45,9 @@ class ClimateTimeSeries:
     humidity: List[float]
     ndvi: List[float]
 
+def historical_cache_key(county_id: int, months_back: int) -> str:
+    return f"county_historical_{county_id}_{months_back}"
+
 class EnhancedClimateService:
     """Enhanced climate service with prediction capabilities"""
     
@@ -40,338 +55,235 @@ class EnhancedClimateService:
         self.nasa_service = production_nasa_gibs_service
         self.counties = KENYA_COUNTIES
         
-        # Seasonal patterns for different climate zones
-        self.seasonal_patterns = {
-            "Arid": {
-                "rainfall": [5, 8, 15, 25, 35, 45, 30, 20, 15, 10, 8, 5],  # mm
-                "temperature": [32, 33, 34, 35, 36, 35, 34, 33, 33, 33, 32, 31],  # °C
-                "humidity": [30, 32, 35, 40, 45, 50, 48, 42, 38, 35, 32, 30],  # %
-                "ndvi": [0.15, 0.18, 0.25, 0.35, 0.45, 0.50, 0.40, 0.30, 0.25, 0.20, 0.18, 0.15]
-            },
-            "Semi-Arid": {
-                "rainfall": [25, 35, 60, 80, 90, 75, 45, 35, 30, 25, 20, 20],
-                "temperature": [26, 27, 28, 27, 25, 24, 24, 25, 26, 27, 27, 26],
-                "humidity": [45, 48, 55, 65, 70, 68, 60, 55, 50, 48, 45, 44],
-                "ndvi": [0.25, 0.30, 0.45, 0.60, 0.70, 0.65, 0.50, 0.40, 0.35, 0.30, 0.28, 0.25]
-            },
-            "Highland Agricultural": {
-                "rainfall": [45, 55, 120, 180, 150, 100, 80, 70, 85, 110, 90, 60],
-                "temperature": [18, 19, 20, 19, 18, 17, 16, 17, 18, 19, 19, 18],
-                "humidity": [65, 68, 75, 80, 82, 78, 70, 68, 70, 75, 72, 68],
-                "ndvi": [0.45, 0.50, 0.70, 0.85, 0.90, 0.80, 0.70, 0.65, 0.70, 0.75, 0.65, 0.50]
-            },
-            "Highland Tropical": {
-                "rainfall": [80, 90, 160, 220, 200, 140, 120, 110, 130, 150, 120, 95],
-                "temperature": [20, 21, 22, 21, 20, 19, 18, 19, 20, 21, 21, 20],
-                "humidity": [75, 78, 82, 85, 88, 85, 80, 78, 80, 83, 80, 77],
-                "ndvi": [0.60, 0.65, 0.80, 0.90, 0.95, 0.85, 0.80, 0.75, 0.80, 0.85, 0.75, 0.65]
-            },
-            "Coastal": {
-                "rainfall": [35, 45, 80, 120, 180, 90, 70, 60, 50, 60, 80, 50],
-                "temperature": [27, 28, 28, 27, 26, 25, 25, 26, 27, 28, 28, 27],
-                "humidity": [70, 72, 75, 78, 82, 80, 75, 72, 70, 72, 75, 72],
-                "ndvi": [0.40, 0.45, 0.60, 0.75, 0.80, 0.65, 0.55, 0.50, 0.45, 0.50, 0.60, 0.45]
-            },
-            "Tropical": {
-                "rainfall": [60, 70, 140, 180, 160, 120, 100, 90, 100, 120, 100, 80],
-                "temperature": [23, 24, 25, 24, 23, 22, 21, 22, 23, 24, 24, 23],
-                "humidity": [70, 73, 78, 82, 85, 82, 78, 75, 73, 75, 78, 73],
-                "ndvi": [0.50, 0.55, 0.75, 0.85, 0.90, 0.80, 0.70, 0.65, 0.70, 0.75, 0.70, 0.60]
-            }
-        }
-    
-    def _get_seasonal_baseline(self, county_id: int, month: int, metric: str) -> float:
-        """Get seasonal baseline for a county and metric"""
-        if county_id not in self.counties:
-            return 0.0
-            
-        climate_zone = self.counties[county_id]["climate_zone"]
-        base_zone = climate_zone
+        # Concurrency limit for per-county fan-outs that hit the cache or upstream services
+        self.max_concurrency = DEFAULT_CONCURRENCY
         
-        # Map specific zones to base patterns
-        if "Highland" in climate_zone:
-            if "Agricultural" in climate_zone:
-                base_zone = "Highland Agricultural"
-            elif "Tropical" in climate_zone:
-                base_zone = "Highland Tropical"
-            else:
-                base_zone = "Highland Agricultural"
-        elif "Coastal" in climate_zone:
-            base_zone = "Coastal"
-        elif "Tropical" in climate_zone:
-            base_zone = "Tropical"
-        elif "Semi-Arid" in climate_zone:
-            base_zone = "Semi-Arid"
-        elif "Arid" in climate_zone:
-            base_zone = "Arid"
-        else:
-            base_zone = "Semi-Arid"  # Default
-            
-        pattern = self.seasonal_patterns.get(base_zone, self.seasonal_patterns["Semi-Arid"])
-        month_index = (month - 1) % 12
-        
-        return pattern[metric][month_index]
-    
-    def _add_climate_variation(self, base_value: float, variation_factor: float = 0.15) -> float:
-        """Add realistic climate variation to base values"""
-        variation = random.uniform(-variation_factor, variation_factor)
-        return base_value * (1 + variation)
+        # Vectorized generator over the precomputed county baseline index
+        seed = os.getenv("CLIMATE_SIM_SEED")
+        self.engine = ClimateTimeSeriesEngine(seed=int(seed) if seed else None)
     
     def _generate_time_series(self, county_id: int, start_date: datetime, 
                             months: int, include_predictions: bool = False) -> ClimateTimeSeries:
         """Generate time series data for a county"""
-        dates = []
-        temperatures = []
-        rainfall_data = []
-        humidity_data = []
-        ndvi_data = []
-        
-        current_date = start_date
-        
-        for i in range(months):
-            # Add noise for future predictions
-            noise_factor = 0.1 if include_predictions and i > months // 2 else 0.05
-            
-            # Get baseline values
-            temp_base = self._get_seasonal_baseline(county_id, current_date.month, "temperature")
-            rain_base = self._get_seasonal_baseline(county_id, current_date.month, "rainfall")
-            humidity_base = self._get_seasonal_baseline(county_id, current_date.month, "humidity")
-            ndvi_base = self._get_seasonal_baseline(county_id, current_date.month, "ndvi")
-            
-            # Add county-specific adjustments
-            county_data = self.counties[county_id]
-            elevation_factor = (county_data["elevation_m"] - 1000) / 1000.0  # Normalize around 1000m
-            
-            # Temperature decreases with elevation
-            temp_adjusted = temp_base - (elevation_factor * 2.0)
-            
-            # Add variation
-            temperature = self._add_climate_variation(temp_adjusted, noise_factor)
-            rainfall = max(0, self._add_climate_variation(rain_base, noise_factor))
-            humidity = max(20, min(95, self._add_climate_variation(humidity_base, noise_factor)))
-            ndvi = max(0, min(1, self._add_climate_variation(ndvi_base, noise_factor)))
-            
-            dates.append(current_date.strftime("%Y-%m"))
-            temperatures.append(round(temperature, 1))
-            rainfall_data.append(round(rainfall, 1))
-            humidity_data.append(round(humidity, 1))
-            ndvi_data.append(round(ndvi, 3))
-            
-            # Move to next month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
+        return self._generate_batch_time_series([county_id], start_date, months, include_predictions)[county_id]
+    
+    def _generate_batch_time_series(self, county_ids: List[int], start_date: datetime,
+                                    months: int, include_predictions: bool = False) -> Dict[int, ClimateTimeSeries]:
+        """Generate time series for many counties in one vectorized pass"""
+        values = self.engine.generate(county_ids, start_date, months, include_predictions)
+        dates = month_labels(start_date, months)
         
-        return ClimateTimeSeries(
-            dates=dates,
-            temperatures=temperatures,
-            rainfall=rainfall_data,
-            humidity=humidity_data,
-            ndvi=ndvi_data
-        )
+        return {
+            county_id: ClimateTimeSeries(
+                dates=dates,
+                temperatures=series[0].tolist(),
+                rainfall=series[1].tolist(),
+                humidity=series[2].tolist(),
+                ndvi=series[3].tolist()
+            )
+            for county_id, series in zip(county_ids, values)
+        }
     
     async def get_all_counties_current_data(self) -> Dict:
         """Get current climate data for all 47 counties"""
-        cache_key = "all_counties_current_data_v1"
-        cached_data = await get_cache(cache_key)
-        if cached_data:
-            return cached_data
-        
         try:
-            counties_data = {}
-            current_date = datetime.utcnow()
-            
-            # Process counties in batches to avoid overwhelming the system
-            batch_size = 10
-            county_ids = list(self.counties.keys())
-            
-            for i in range(0, len(county_ids), batch_size):
-                batch = county_ids[i:i + batch_size]
-                batch_tasks = []
-                
-                for county_id in batch:
-                    # Generate current month data
-                    time_series = self._generate_time_series(county_id, current_date, 1)
-                    
-                    county_data = self.counties[county_id].copy()
-                    county_data.update({
-                        "current_temperature": time_series.temperatures[0],
-                        "current_rainfall": time_series.rainfall[0],
-                        "current_humidity": time_series.humidity[0],
-                        "current_ndvi": time_series.ndvi[0],
-                        "last_updated": current_date.isoformat() + "Z"
-                    })
-                    
-                    counties_data[county_id] = county_data
-                
-                # Small delay between batches
-                await asyncio.sleep(0.1)
-            
-            result = {
-                "counties": counties_data,
-                "total_counties": len(counties_data),
-                "data_timestamp": current_date.isoformat() + "Z",
-                "coverage": "All 47 Kenya Counties"
-            }
-            
-            # Cache for 2 hours
-            await set_cache(cache_key, result, ttl=7200)
-            return result
-            
+            # Cache for 2 hours; concurrent misses wait on a single computation
+            return await get_or_compute("all_counties_current_data_v1",
+                                        self._build_all_counties_current_data, ttl=CURRENT_DATA_TTL)
         except Exception as e:
             return {"error": f"Failed to retrieve all counties data: {str(e)}"}
     
+    async def _build_all_counties_current_data(self) -> Dict:
+        """Compute current climate data for all 47 counties"""
+        counties_data = {}
+        current_date = datetime.utcnow()
+        
+        # Current month for every county in one vectorized pass; purely local, so no throttling
+        county_ids = list(self.counties.keys())
+        time_series = self._generate_batch_time_series(county_ids, current_date, 1)
+        
+        for county_id in county_ids:
+            series = time_series[county_id]
+            county_data = self.counties[county_id].copy()
+            county_data.update({
+                "current_temperature": series.temperatures[0],
+                "current_rainfall": series.rainfall[0],
+                "current_humidity": series.humidity[0],
+                "current_ndvi": series.ndvi[0],
+                "last_updated": current_date.isoformat() + "Z"
+            })
+            
+            counties_data[county_id] = county_data
+        
+        return {
+            "counties": counties_data,
+            "total_counties": len(counties_data),
+            "data_timestamp": current_date.isoformat() + "Z",
+            "coverage": "All 47 Kenya Counties"
+        }
+    
     async def get_county_historical_data(self, county_id: int, months_back: int = 12) -> Dict:
         """Get historical climate data for a county"""
-        cache_key = f"county_historical_{county_id}_{months_back}"
-        cached_data = await get_cache(cache_key)
-        if cached_data:
-            return cached_data
+        if county_id not in self.counties:
+            return {"error": f"County {county_id} not found"}
         
         try:
-            if county_id not in self.counties:
-                return {"error": f"County {county_id} not found"}
-            
-            # Generate historical data
-            start_date = datetime.utcnow() - timedelta(days=30 * months_back)
-            time_series = self._generate_time_series(county_id, start_date, months_back)
-            
-            county_info = self.counties[county_id]
-            
-            result = {
-                "county_id": county_id,
-                "county_name": county_info["name"],
-                "climate_zone": county_info["climate_zone"],
-                "historical_period": {
-                    "start_date": start_date.strftime("%Y-%m"),
-                    "end_date": datetime.utcnow().strftime("%Y-%m"),
-                    "months": months_back
-                },
-                "time_series": {
-                    "dates": time_series.dates,
-                    "temperature": time_series.temperatures,
-                    "rainfall": time_series.rainfall,
-                    "humidity": time_series.humidity,
-                    "ndvi": time_series.ndvi
-                },
-                "averages": {
-                    "temperature": round(np.mean(time_series.temperatures), 1),
-                    "rainfall": round(np.mean(time_series.rainfall), 1),
-                    "humidity": round(np.mean(time_series.humidity), 1),
-                    "ndvi": round(np.mean(time_series.ndvi), 3)
-                },
-                "data_source": "Enhanced_Climate_Service",
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
-            
             # Cache for 4 hours
-            await set_cache(cache_key, result, ttl=14400)
-            return result
-            
+            return await get_or_compute(
+                historical_cache_key(county_id, months_back),
+                lambda: self._build_county_historical_data(county_id, months_back),
+                ttl=HISTORICAL_TTL
+            )
         except Exception as e:
             return {"error": f"Failed to retrieve historical data: {str(e)}"}
     
+    async def _build_county_historical_data(self, county_id: int, months_back: int) -> Dict:
+        """Compute historical climate data for a county"""
+        # Generate historical data
+        start_date = datetime.utcnow() - timedelta(days=30 * months_back)
+        time_series = self._generate_time_series(county_id, start_date, months_back)
+        return self._historical_result(county_id, start_date, months_back, time_series)
+    
+    def _historical_result(self, county_id: int, start_date: datetime, months_back: int,
+                           time_series: ClimateTimeSeries) -> Dict:
+        """Historical data payload for a county from its generated time series"""
+        county_info = self.counties[county_id]
+        
+        result = {
+            "county_id": county_id,
+            "county_name": county_info["name"],
+            "climate_zone": county_info["climate_zone"],
+            "historical_period": {
+                "start_date": start_date.strftime("%Y-%m"),
+                "end_date": datetime.utcnow().strftime("%Y-%m"),
+                "months": months_back
+            },
+            "time_series": {
+                "dates": time_series.dates,
+                "temperature": time_series.temperatures,
+                "rainfall": time_series.rainfall,
+                "humidity": time_series.humidity,
+                "ndvi": time_series.ndvi
+            },
+            "averages": {
+                "temperature": round(np.mean(time_series.temperatures), 1),
+                "rainfall": round(np.mean(time_series.rainfall), 1),
+                "humidity": round(np.mean(time_series.humidity), 1),
+                "ndvi": round(np.mean(time_series.ndvi), 3)
+            },
+            "data_source": "Enhanced_Climate_Service",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+        return result
+    
     async def get_county_predictions(self, county_id: int, months_ahead: int = 6) -> Dict:
         """Get weather predictions for a county"""
-        cache_key = f"county_predictions_{county_id}_{months_ahead}"
-        cached_data = await get_cache(cache_key)
-        if cached_data:
-            return cached_data
+        if county_id not in self.counties:
+            return {"error": f"County {county_id} not found"}
         
         try:
-            if county_id not in self.counties:
-                return {"error": f"County {county_id} not found"}
-            
-            # Generate prediction data starting from next month
-            start_date = datetime.utcnow().replace(day=1)
-            if start_date.month == 12:
-                start_date = start_date.replace(year=start_date.year + 1, month=1)
-            else:
-                start_date = start_date.replace(month=start_date.month + 1)
-            
-            time_series = self._generate_time_series(county_id, start_date, months_ahead, include_predictions=True)
-            
-            county_info = self.counties[county_id]
-            
-            # Generate confidence scores (decreasing over time)
-            confidence_scores = []
-            for i in range(months_ahead):
-                base_confidence = 0.85
-                decay_factor = 0.05 * i  # Confidence decreases over time
-                confidence = max(0.60, base_confidence - decay_factor)
-                confidence_scores.append(round(confidence, 2))
-            
-            # Calculate trends
-            temp_trend = "stable"
-            rain_trend = "stable"
-            
-            if len(time_series.temperatures) >= 3:
-                temp_slope = (time_series.temperatures[-1] - time_series.temperatures[0]) / len(time_series.temperatures)
-                temp_trend = "increasing" if temp_slope > 0.5 else "decreasing" if temp_slope < -0.5 else "stable"
-                
-                rain_slope = (time_series.rainfall[-1] - time_series.rainfall[0]) / len(time_series.rainfall)
-                rain_trend = "increasing" if rain_slope > 5 else "decreasing" if rain_slope < -5 else "stable"
-            
-            result = {
-                "county_id": county_id,
-                "county_name": county_info["name"],
-                "climate_zone": county_info["climate_zone"],
-                "prediction_period": {
-                    "start_date": start_date.strftime("%Y-%m"),
-                    "months_ahead": months_ahead,
-                    "model_type": "Enhanced Seasonal Forecasting"
-                },
-                "predictions": {
-                    "dates": time_series.dates,
-                    "temperature": time_series.temperatures,
-                    "rainfall": time_series.rainfall,
-                    "humidity": time_series.humidity,
-                    "ndvi": time_series.ndvi,
-                    "confidence_scores": confidence_scores
-                },
-                "trends": {
-                    "temperature": temp_trend,
-                    "rainfall": rain_trend
-                },
-                "summary": {
-                    "avg_temperature": round(np.mean(time_series.temperatures), 1),
-                    "total_rainfall": round(np.sum(time_series.rainfall), 1),
-                    "avg_humidity": round(np.mean(time_series.humidity), 1),
-                    "avg_ndvi": round(np.mean(time_series.ndvi), 3)
-                },
-                "data_source": "Enhanced_Climate_Predictions",
-                "generated_at": datetime.utcnow().isoformat() + "Z"
-            }
-            
             # Cache for 6 hours
-            await set_cache(cache_key, result, ttl=21600)
-            return result
-            
+            return await get_or_compute(
+                f"county_predictions_{county_id}_{months_ahead}",
+                lambda: self._build_county_predictions(county_id, months_ahead),
+                ttl=PREDICTIONS_TTL
+            )
         except Exception as e:
             return {"error": f"Failed to generate predictions: {str(e)}"}
     
+    async def _build_county_predictions(self, county_id: int, months_ahead: int) -> Dict:
+        """Compute weather predictions for a county"""
+        # Generate prediction data starting from next month
+        start_date = datetime.utcnow().replace(day=1)
+        if start_date.month == 12:
+            start_date = start_date.replace(year=start_date.year + 1, month=1)
+        else:
+            start_date = start_date.replace(month=start_date.month + 1)
+        
+        time_series = self._generate_time_series(county_id, start_date, months_ahead, include_predictions=True)
+        
+        county_info = self.counties[county_id]
+        
+        # Generate confidence scores (decreasing over time)
+        confidence_scores = []
+        for i in range(months_ahead):
+            base_confidence = 0.85
+            decay_factor = 0.05 * i  # Confidence decreases over time
+            confidence = max(0.60, base_confidence - decay_factor)
+            confidence_scores.append(round(confidence, 2))
+        
+        # Calculate trends
+        temp_trend = "stable"
+        rain_trend = "stable"
+        
+        if len(time_series.temperatures) >= 3:
+            temp_slope = (time_series.temperatures[-1] - time_series.temperatures[0]) / len(time_series.temperatures)
+            temp_trend = "increasing" if temp_slope > 0.5 else "decreasing" if temp_slope < -0.5 else "stable"
+            
+            rain_slope = (time_series.rainfall[-1] - time_series.rainfall[0]) / len(time_series.rainfall)
+            rain_trend = "increasing" if rain_slope > 5 else "decreasing" if rain_slope < -5 else "stable"
+        
+        result = {
+            "county_id": county_id,
+            "county_name": county_info["name"],
+            "climate_zone": county_info["climate_zone"],
+            "prediction_period": {
+                "start_date": start_date.strftime("%Y-%m"),
+                "months_ahead": months_ahead,
+                "model_type": "Enhanced Seasonal Forecasting"
+            },
+            "predictions": {
+                "dates": time_series.dates,
+                "temperature": time_series.temperatures,
+                "rainfall": time_series.rainfall,
+                "humidity": time_series.humidity,
+                "ndvi": time_series.ndvi,
+                "confidence_scores": confidence_scores
+            },
+            "trends": {
+                "temperature": temp_trend,
+                "rainfall": rain_trend
+            },
+            "summary": {
+                "avg_temperature": round(np.mean(time_series.temperatures), 1),
+                "total_rainfall": round(np.sum(time_series.rainfall), 1),
+                "avg_humidity": round(np.mean(time_series.humidity), 1),
+                "avg_ndvi": round(np.mean(time_series.ndvi), 3)
+            },
+            "data_source": "Enhanced_Climate_Predictions",
+            "generated_at": datetime.utcnow().isoformat() + "Z"
+        }
+        return result
+    
     async def get_climate_comparison(self, county_ids: List[int], months: int = 6) -> Dict:
         """Compare climate data across multiple counties"""
         try:
-            comparison_data = {}
+            valid_ids = [county_id for county_id in county_ids if county_id in self.counties]
+            failed_counties = {
+                county_id: f"County {county_id} not found"
+                for county_id in county_ids if county_id not in self.counties
+            }
             
-            for county_id in county_ids:
-                if county_id in self.counties:
-                    historical = await self.get_county_historical_data(county_id, months)
-                    predictions = await self.get_county_predictions(county_id, months)
-                    
-                    if "error" not in historical and "error" not in predictions:
-                        comparison_data[county_id] = {
-                            "name": self.counties[county_id]["name"],
-                            "climate_zone": self.counties[county_id]["climate_zone"],
-                            "historical": historical["averages"],
-                            "predicted": predictions["summary"]
-                        }
+            # Counties are compared concurrently; one failing county does not fail the comparison
+            results = await gather_bounded(
+                (self._compare_county(county_id, months) for county_id in valid_ids),
+                self.max_concurrency,
+                return_exceptions=True
+            )
+            
+            comparison_data = {}
+            for county_id, result in zip(valid_ids, results):
+                if isinstance(result, Exception):
+                    failed_counties[county_id] = str(result)
+                elif "error" in result:
+                    failed_counties[county_id] = result["error"]
+                else:
+                    comparison_data[county_id] = result
             
             return {
                 "comparison": comparison_data,
                 "counties_compared": len(comparison_data),
+                "failed_counties": failed_counties,
                 "period_months": months,
                 "comparison_date": datetime.utcnow().isoformat() + "Z"
             }
@@ -379,93 +291,160 @@ class EnhancedClimateService:
         except Exception as e:
             return {"error": f"Failed to generate comparison: {str(e)}"}
     
+    async def _compare_county(self, county_id: int, months: int) -> Dict:
+        """Historical averages and predicted summary for one county"""
+        historical, predictions = await asyncio.gather(
+            self.get_county_historical_data(county_id, months),
+            self.get_county_predictions(county_id, months)
+        )
+        
+        if "error" in historical:
+            return historical
+        if "error" in predictions:
+            return predictions
+        
+        return {
+            "name": self.counties[county_id]["name"],
+            "climate_zone": self.counties[county_id]["climate_zone"],
+            "historical": historical["averages"],
+            "predicted": predictions["summary"]
+        }
+    
     async def get_drought_risk_assessment(self, months_ahead: int = 3) -> Dict:
         """Assess drought risk across all counties"""
-        cache_key = f"drought_risk_all_counties_{months_ahead}"
-        cached_data = await get_cache(cache_key)
-        if cached_data:
-            return cached_data
-        
         try:
-            risk_assessment = {}
-            high_risk_counties = []
-            moderate_risk_counties = []
-            low_risk_counties = []
+            # Cache for 8 hours
+            return await get_or_compute(
+                f"drought_risk_all_counties_{months_ahead}",
+                lambda: self._build_drought_risk_assessment(months_ahead),
+                ttl=DROUGHT_RISK_TTL
+            )
+        except Exception as e:
+            return {"error": f"Failed to assess drought risk: {str(e)}"}
+    
+    async def _build_drought_risk_assessment(self, months_ahead: int) -> Dict:
+        """Compute drought risk across all counties"""
+        risk_assessment = {}
+        high_risk_counties = []
+        moderate_risk_counties = []
+        low_risk_counties = []
+        
+        county_ids = list(self.counties.keys())
+        failed_counties = {}
+        
+        # Predictions for every county are fetched concurrently with bounded parallelism
+        all_predictions = await gather_bounded(
+            (self.get_county_predictions(county_id, months_ahead) for county_id in county_ids),
+            self.max_concurrency
+        )
+        
+        for county_id, predictions in zip(county_ids, all_predictions):
+            county_data = self.counties[county_id]
             
-            for county_id, county_data in self.counties.items():
-                # Get predictions for drought assessment
-                predictions = await self.get_county_predictions(county_id, months_ahead)
+            if "error" in predictions:
+                failed_counties[county_id] = predictions["error"]
+                continue
+            
+            # Calculate drought risk based on predicted rainfall and NDVI
+            pred_data = predictions["predictions"]
+            avg_rainfall = np.mean(pred_data["rainfall"])
+            avg_ndvi = np.mean(pred_data["ndvi"])
+            
+            # Climate zone thresholds from the precomputed profile index
+            climate_zone = county_data["climate_zone"]
+            rainfall_threshold, ndvi_threshold = COUNTY_DROUGHT_THRESHOLDS[COUNTY_ROWS[county_id]]
+            
+            # Calculate risk score
+            rainfall_risk = max(0, (rainfall_threshold - avg_rainfall) / rainfall_threshold)
+            ndvi_risk = max(0, (ndvi_threshold - avg_ndvi) / ndvi_threshold)
+            risk_score = (rainfall_risk + ndvi_risk) / 2
+            
+            # Categorize risk
+            if risk_score > 0.7:
+                risk_level = "High"
+                high_risk_counties.append(county_id)
+            elif risk_score > 0.4:
+                risk_level = "Moderate"
+                moderate_risk_counties.append(county_id)
+            else:
+                risk_level = "Low"
+                low_risk_counties.append(county_id)
+            
+            risk_assessment[county_id] = {
+                "name": county_data["name"],
+                "climate_zone": climate_zone,
+                "risk_level": risk_level,
+                "risk_score": round(risk_score, 3),
+                "predicted_rainfall": round(avg_rainfall, 1),
+                "predicted_ndvi": round(avg_ndvi, 3),
+                "confidence": round(np.mean(pred_data["confidence_scores"]), 2)
+            }
+        
+        result = {
+            "assessment_period": f"Next {months_ahead} months",
+            "total_counties": len(risk_assessment),
+            "risk_summary": {
+                "high_risk": len(high_risk_counties),
+                "moderate_risk": len(moderate_risk_counties),
+                "low_risk": len(low_risk_counties)
+            },
+            "counties_by_risk": {
+                "high_risk": high_risk_counties,
+                "moderate_risk": moderate_risk_counties,
+                "low_risk": low_risk_counties
+            },
+            "detailed_assessment": risk_assessment,
+            "failed_counties": failed_counties,
+            "generated_at": datetime.utcnow().isoformat() + "Z"
+        }
+        return result
+
+    async def get_climate_trends(self, metric: str, county_ids: List[int], months: int = 12) -> Dict:
+        """Least-squares trends for a metric across many counties in one vectorized pass"""
+        try:
+            county_ids = [county_id for county_id in county_ids if county_id in self.counties]
+            historical = dict(zip(county_ids, await gather_bounded(
+                (get_cache(historical_cache_key(county_id, months)) for county_id in county_ids),
+                self.max_concurrency
+            )))
+            
+            # Build every county missing from the cache in one engine call, and cache each for single lookups
+            missing = [county_id for county_id in county_ids if historical[county_id] is None]
+            if missing:
+                start_date = datetime.utcnow() - timedelta(days=30 * months)
+                batch = self._generate_batch_time_series(missing, start_date, months)
+                for county_id in missing:
+                    historical[county_id] = await set_cache(
+                        historical_cache_key(county_id, months),
+                        self._historical_result(county_id, start_date, months, batch[county_id]),
+                        ttl=HISTORICAL_TTL, stale_ttl=CACHE_STALE_TTL
+                    )
+            
+            rows = [historical[county_id]["time_series"][metric] for county_id in county_ids]
+            
+            trends_data = {}
+            if rows and months >= 2:
+                stats = linear_trends(np.array(rows))
+                directions = classify_trends(stats["slope"])
                 
-                if "error" not in predictions:
-                    # Calculate drought risk based on predicted rainfall and NDVI
-                    pred_data = predictions["predictions"]
-                    avg_rainfall = np.mean(pred_data["rainfall"])
-                    avg_ndvi = np.mean(pred_data["ndvi"])
-                    
-                    # Climate zone thresholds
-                    climate_zone = county_data["climate_zone"]
-                    rainfall_threshold = 50  # Default
-                    ndvi_threshold = 0.3     # Default
-                    
-                    if "Arid" in climate_zone:
-                        rainfall_threshold = 20
-                        ndvi_threshold = 0.2
-                    elif "Semi-Arid" in climate_zone:
-                        rainfall_threshold = 40
-                        ndvi_threshold = 0.3
-                    elif "Highland" in climate_zone:
-                        rainfall_threshold = 80
-                        ndvi_threshold = 0.5
-                    
-                    # Calculate risk score
-                    rainfall_risk = max(0, (rainfall_threshold - avg_rainfall) / rainfall_threshold)
-                    ndvi_risk = max(0, (ndvi_threshold - avg_ndvi) / ndvi_threshold)
-                    risk_score = (rainfall_risk + ndvi_risk) / 2
-                    
-                    # Categorize risk
-                    if risk_score > 0.7:
-                        risk_level = "High"
-                        high_risk_counties.append(county_id)
-                    elif risk_score > 0.4:
-                        risk_level = "Moderate"
-                        moderate_risk_counties.append(county_id)
-                    else:
-                        risk_level = "Low"
-                        low_risk_counties.append(county_id)
-                    
-                    risk_assessment[county_id] = {
-                        "name": county_data["name"],
-                        "climate_zone": climate_zone,
-                        "risk_level": risk_level,
-                        "risk_score": round(risk_score, 3),
-                        "predicted_rainfall": round(avg_rainfall, 1),
-                        "predicted_ndvi": round(avg_ndvi, 3),
-                        "confidence": round(np.mean(pred_data["confidence_scores"]), 2)
+                for i, county_id in enumerate(county_ids):
+                    trends_data[county_id] = {
+                        "name": self.counties[county_id]["name"],
+                        "trend_direction": str(directions[i]),
+                        "trend_slope": round(float(stats["slope"][i]), 3),
+                        "current_value": float(stats["current"][i]),
+                        "period_average": round(float(stats["mean"][i]), 2)
                     }
             
-            result = {
-                "assessment_period": f"Next {months_ahead} months",
-                "total_counties": len(risk_assessment),
-                "risk_summary": {
-                    "high_risk": len(high_risk_counties),
-                    "moderate_risk": len(moderate_risk_counties),
-                    "low_risk": len(low_risk_counties)
-                },
-                "counties_by_risk": {
-                    "high_risk": high_risk_counties,
-                    "moderate_risk": moderate_risk_counties,
-                    "low_risk": low_risk_counties
-                },
-                "detailed_assessment": risk_assessment,
-                "generated_at": datetime.utcnow().isoformat() + "Z"
+            return {
+                "counties_analyzed": len(trends_data),
+                "trends": trends_data,
+                # Series are generated, not fetched, so no single county can fail on its own
+                "failed_counties": {}
             }
             
-            # Cache for 8 hours
-            await set_cache(cache_key, result, ttl=28800)
-            return result
-            
         except Exception as e:
-            return {"error": f"Failed to assess drought risk: {str(e)}"}
+            return {"error": f"Failed to analyze trends: {str(e)}"}
 
 # Global service instance
 enhanced_climate_service = EnhancedClimateService()
@@ -9,28 +9,24 @@ import json
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from PIL import Image
-import io
 import base64
 from ..utils.cache import get_cache, set_cache
+from ..utils.http import get_http_session
+from ..utils.upstream import SYNTHETIC_CACHE_TTL
+from .gibs_wmts import GIBS_WMTS_BASE, gibs_wmts_client
+from .temporal_compositor import composite_dates, fetch_composite
+from ..data.county_geometry import COUNTY_BOUNDS, county_mask
+from ..data.climate_profiles import get_county_normals
 
 class EnhancedNASAGIBSService:
     """Enhanced NASA GIBS service with real data processing"""
     
     def __init__(self):
-        self.wmts_base = "https://gibs.earthdata.nasa.gov/wmts-geo/1.0.0"
-        self.wms_base = "https://gibs.earthdata.nasa.gov/wms/epsg4326/best/wms.cgi"
+        self.wmts_base = GIBS_WMTS_BASE
         self.session = None
         
-        # Kenya county boundaries with more precise coordinates
-        self.county_bounds = {
-            1: {"name": "Nairobi", "north": -1.163, "south": -1.444, "east": 37.104, "west": 36.752},
-            2: {"name": "Mombasa", "north": -3.95, "south": -4.3, "east": 39.82, "west": 39.52},
-            3: {"name": "Kisumu", "north": -0.05, "south": -0.4, "east": 35.0, "west": 34.65},
-            4: {"name": "Nakuru", "north": -0.2, "south": -1.2, "east": 36.4, "west": 35.8},
-            5: {"name": "Machakos", "north": -1.3, "south": -1.7, "east": 37.5, "west": 36.8},
-            # Add more counties as needed
-        }
+        # All 47 counties from the shared county registry
+        self.county_bounds = COUNTY_BOUNDS
         
         # Available layers with their configurations
         self.layers = {
@@ -38,7 +34,8 @@ class EnhancedNASAGIBSService:
                 "layer_name": "MODIS_Terra_NDVI_8Day",
                 "format": "image/png",
                 "style": "default",
-                "tile_matrix_set": "EPSG4326_250m",
+                "tile_matrix_set": "250m",
+                "period_days": 8,  # MODIS 8-day composite
                 "data_range": [0, 1],
                 "scale_factor": 0.0001
             },
@@ -46,7 +43,7 @@ class EnhancedNASAGIBSService:
                 "layer_name": "MODIS_Terra_Land_Surface_Temp_Day",
                 "format": "image/png", 
                 "style": "default",
-                "tile_matrix_set": "EPSG4326_1km",
+                "tile_matrix_set": "1km",
                 "data_range": [7500, 65535],  # Kelvin * 0.02
                 "scale_factor": 0.02
             },
@@ -54,24 +51,25 @@ class EnhancedNASAGIBSService:
                 "layer_name": "GPM_3IMERGHH_06_precipitation",
                 "format": "image/png",
                 "style": "default", 
-                "tile_matrix_set": "EPSG4326_10km",
+                "tile_matrix_set": "2km",
                 "data_range": [0, 100],  # mm/hr
                 "scale_factor": 1.0
             }
         }
     
+    def attach_session(self, session: aiohttp.ClientSession):
+        """Use the application's shared connection pool"""
+        self.session = session
+    
     async def initialize(self):
-        """Initialize the service with session"""
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        """Initialize the service with the shared session"""
+        if not self.session or self.session.closed:
+            self.session = await get_http_session()
         return True
     
     async def close(self):
-        """Close the session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the session; the shared pool is closed by the application lifespan"""
+        self.session = None
     
     def _get_date_string(self, date_input):
         """Convert date to GIBS format (YYYY-MM-DD)"""
@@ -83,85 +81,34 @@ class EnhancedNASAGIBSService:
             return date_input.strftime('%Y-%m-%d')
         return date_input
     
-    async def _get_wms_data(self, layer_config: Dict, bounds: Dict, date: str, width: int = 256, height: int = 256) -> Optional[np.ndarray]:
-        """Get raster data from WMS service"""
+    async def _get_raster_data(self, layer_config: Dict, bounds: Dict, date: str, width: int = 256, height: int = 256) -> Optional[np.ndarray]:
+        """Get raster data mosaicked from shared WMTS tiles"""
         try:
             await self.initialize()  # Ensure session is initialized
-            
-            params = {
-                'SERVICE': 'WMS',
-                'VERSION': '1.3.0',
-                'REQUEST': 'GetMap',
-                'LAYERS': layer_config['layer_name'],
-                'STYLES': layer_config['style'],
-                'FORMAT': layer_config['format'],
-                'CRS': 'EPSG:4326',
-                'BBOX': f"{bounds['south']},{bounds['west']},{bounds['north']},{bounds['east']}",
-                'WIDTH': str(width),
-                'HEIGHT': str(height),
-                'TIME': self._get_date_string(date)
-            }
-            
-            async with self.session.get(self.wms_base, params=params) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    # Convert PNG to numpy array
-                    image = Image.open(io.BytesIO(image_data))
-                    return np.array(image)
-                else:
-                    print(f"WMS request failed: {response.status}")
-                    return None
+            return await gibs_wmts_client.get_raster(
+                layer_config, bounds, self._get_date_string(date), (width, height), session=self.session
+            )
                     
         except Exception as e:
-            print(f"WMS data retrieval error: {e}")
+            print(f"WMTS data retrieval error: {e}")
             return None
     
-    def _process_image_data(self, image_array: Optional[np.ndarray], layer_type: str) -> Dict:
-        """Process image array to extract meaningful values"""
-        if image_array is None:
-            return {"mean": 0, "std": 0, "min": 0, "max": 0, "count": 0}
-        
-        # Convert RGBA to single channel (use red channel for data)
-        if len(image_array.shape) == 3:
-            data_channel = image_array[:, :, 0]
-        else:
-            data_channel = image_array
-        
-        # Filter out no-data values (typically 0 or 255)
-        valid_mask = (data_channel > 0) & (data_channel < 255)
-        valid_data = data_channel[valid_mask]
-        
-        if len(valid_data) == 0:
-            return {"mean": 0, "std": 0, "min": 0, "max": 0, "count": 0}
-        
-        # Apply scaling based on layer type
-        layer_config = self.layers.get(layer_type, {})
-        scale_factor = layer_config.get('scale_factor', 1.0)
-        data_range = layer_config.get('data_range', [0, 255])
+    async def _get_composite(self, county_id: int, layer_config: Dict, layer_type: str,
+                             start_date: str, end_date: str) -> Dict:
+        """Temporal composite of every product date between start_date and end_date"""
+        bounds = self.county_bounds[county_id]
         
-        # Scale from 0-255 to actual data range
-        scaled_data = (valid_data / 255.0) * (data_range[1] - data_range[0]) + data_range[0]
-        scaled_data = scaled_data * scale_factor
-        
-        # Apply layer-specific conversions
-        if layer_type == "temperature":
-            # Convert from Kelvin to Celsius
-            scaled_data = scaled_data - 273.15
-        elif layer_type == "ndvi":
-            # NDVI is typically scaled -1 to 1, but we want 0 to 1 for vegetation
-            scaled_data = np.clip(scaled_data, 0, 1)
-        
-        return {
-            "mean": float(np.mean(scaled_data)),
-            "std": float(np.std(scaled_data)),
-            "min": float(np.min(scaled_data)),
-            "max": float(np.max(scaled_data)),
-            "count": int(len(valid_data))
-        }
+        # Zonal statistics over the county polygon rather than its whole bounding box
+        bbox = (bounds['south'], bounds['west'], bounds['north'], bounds['east'])
+        mask = county_mask(county_id, bbox, (256, 256))
+        return await fetch_composite(
+            lambda date: self._get_raster_data(layer_config, bounds, date),
+            layer_type, layer_config, start_date, end_date, mask
+        )
     
     async def get_ndvi_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get NDVI data for a county using real NASA GIBS data"""
-        cache_key = f"nasa_ndvi_v2_{county_id}_{start_date}_{end_date}"
+        cache_key = f"nasa_ndvi_v3_{county_id}_{self._get_date_string(start_date)}_{self._get_date_string(end_date)}"
         cached_data = await get_cache(cache_key)
         if cached_data:
             return cached_data
@@ -173,12 +120,9 @@ class EnhancedNASAGIBSService:
             bounds = self.county_bounds[county_id]
             layer_config = self.layers["ndvi"]
             
-            # Use the end date for the most recent data
-            date = self._get_date_string(end_date)
-            
-            # Get the actual satellite image data
-            image_data = await self._get_wms_data(layer_config, bounds, date)
-            stats = self._process_image_data(image_data, "ndvi")
+            # Max-value composite over every 8-day period in the window
+            composite = await self._get_composite(county_id, layer_config, "ndvi", start_date, end_date)
+            stats = composite["stats"]
             
             result = {
                 "county_id": county_id,
@@ -192,12 +136,14 @@ class EnhancedNASAGIBSService:
                 "pixel_count": stats["count"],
                 "data_source": "NASA_GIBS_MODIS_Terra",
                 "layer": layer_config["layer_name"],
+                "composite": composite["reducer"],
+                "image_dates": composite["dates"],
                 "confidence": 0.90,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
-            # Cache for 6 hours
-            await set_cache(cache_key, result, ttl=21600)
+            # Cache for 6 hours; results without imagery only briefly
+            await set_cache(cache_key, result, ttl=21600 if composite["success"] else SYNTHETIC_CACHE_TTL)
             return result
             
         except Exception as e:
@@ -205,7 +151,7 @@ class EnhancedNASAGIBSService:
     
     async def get_temperature_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get land surface temperature data"""
-        cache_key = f"nasa_temp_v2_{county_id}_{start_date}_{end_date}"
+        cache_key = f"nasa_temp_v3_{county_id}_{self._get_date_string(start_date)}_{self._get_date_string(end_date)}"
         cached_data = await get_cache(cache_key)
         if cached_data:
             return cached_data
@@ -216,10 +162,8 @@ class EnhancedNASAGIBSService:
             
             bounds = self.county_bounds[county_id]
             layer_config = self.layers["temperature"]
-            date = self._get_date_string(end_date)
-            
-            image_data = await self._get_wms_data(layer_config, bounds, date)
-            stats = self._process_image_data(image_data, "temperature")
+            composite = await self._get_composite(county_id, layer_config, "temperature", start_date, end_date)
+            stats = composite["stats"]
             
             result = {
                 "county_id": county_id,
@@ -233,11 +177,14 @@ class EnhancedNASAGIBSService:
                 "pixel_count": stats["count"],
                 "data_source": "NASA_GIBS_MODIS_LST",
                 "layer": layer_config["layer_name"],
+                "composite": composite["reducer"],
+                "image_dates": composite["dates"],
                 "confidence": 0.85,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
-            await set_cache(cache_key, result, ttl=21600)
+            # Cache for 6 hours; results without imagery only briefly
+            await set_cache(cache_key, result, ttl=21600 if composite["success"] else SYNTHETIC_CACHE_TTL)
             return result
             
         except Exception as e:
@@ -245,7 +192,7 @@ class EnhancedNASAGIBSService:
     
     async def get_precipitation_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get precipitation data from GPM IMERG"""
-        cache_key = f"nasa_precip_v2_{county_id}_{start_date}_{end_date}"
+        cache_key = f"nasa_precip_v5_{county_id}_{self._get_date_string(start_date)}_{self._get_date_string(end_date)}"
         cached_data = await get_cache(cache_key)
         if cached_data:
             return cached_data
@@ -256,13 +203,14 @@ class EnhancedNASAGIBSService:
             
             bounds = self.county_bounds[county_id]
             layer_config = self.layers["precipitation"]
-            date = self._get_date_string(end_date)
+            composite = await self._get_composite(county_id, layer_config, "precipitation", start_date, end_date)
+            stats = composite["stats"]
+            # Days the composite window covers, after any COMPOSITE_MAX_DATES cap
+            window_days = len(composite_dates("precipitation", start_date, end_date))
             
-            image_data = await self._get_wms_data(layer_config, bounds, date)
-            stats = self._process_image_data(image_data, "precipitation")
-            
-            # Convert from mm/hr to daily total (approximate)
-            daily_total = stats["mean"] * 24 if stats["mean"] > 0 else 0
+            # Window total from each pixel's mean mm/hr rate over its valid dates,
+            # so dates GIBS has not published do not read as dry days
+            daily_total = stats["mean"] * 24 * window_days if stats["mean"] > 0 else 0
             
             result = {
                 "county_id": county_id,
@@ -270,16 +218,20 @@ class EnhancedNASAGIBSService:
                 "start_date": start_date,
                 "end_date": end_date,
                 "rainfall_total": round(daily_total, 2),
+                "window_days": window_days,
                 "rainfall_mean": round(stats["mean"], 2),
                 "rainfall_max": round(stats["max"], 2),
                 "pixel_count": stats["count"],
                 "data_source": "NASA_GIBS_GPM_IMERG",
                 "layer": layer_config["layer_name"],
+                "composite": composite["reducer"],
+                "image_dates": composite["dates"],
                 "confidence": 0.88,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
-            await set_cache(cache_key, result, ttl=21600)
+            # Cache for 6 hours; results without imagery only briefly
+            await set_cache(cache_key, result, ttl=21600 if composite["success"] else SYNTHETIC_CACHE_TTL)
             return result
             
         except Exception as e:
@@ -330,28 +282,25 @@ class EnhancedNASAGIBSService:
     
     async def detect_drought_conditions(self, county_id: int, historical_days: int = 90) -> Dict:
         """Enhanced drought detection using real satellite data"""
+        if county_id not in self.county_bounds:
+            return {"error": f"County {county_id} not found"}
+        
         try:
             # Get recent data (last 30 days)
             recent_data = await self.get_county_climate_data(county_id, days=30)
             
-            # Get historical baseline (same period last year)
-            historical_end = datetime.utcnow() - timedelta(days=365)
-            historical_start = historical_end - timedelta(days=30)
-            
-            hist_start_str = historical_start.isoformat() + "Z"
-            hist_end_str = historical_end.isoformat() + "Z"
-            
-            historical_data = await self.get_county_climate_data(county_id, days=30)
-            
             # Extract current values
             current_ndvi = recent_data.get("ndvi_mean", 0.4)
             current_rainfall = recent_data.get("rainfall_total", 20)
             current_temp = recent_data.get("temperature_mean", 25)
             
-            # Historical baselines (these would come from actual historical analysis)
-            historical_ndvi = 0.45  # This should be calculated from multi-year data
-            historical_rainfall = 40
-            historical_temp = 24
+            # Seasonal normals of this county; rainfall scaled to the composited window
+            window = recent_data["date_range"]
+            window_days = recent_data.get("window_days") or len(composite_dates("precipitation", window["start"], window["end"]))
+            normals = get_county_normals(county_id, datetime.utcnow().month)
+            historical_ndvi = normals["ndvi_normal"]
+            historical_rainfall = normals["rainfall_normal"] * window_days / 30.4
+            historical_temp = normals["temp_normal"]
             
             # Calculate anomalies
             ndvi_anomaly = (current_ndvi - historical_ndvi) / historical_ndvi if historical_ndvi > 0 else 0
@@ -0,0 +1,187 @@
+"""
+Streaming export of county climate data
+Yields CSV, NDJSON or Arrow/Parquet chunks one county at a time
+"""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow/Parquet exports are optional
+    pa = None
+    pq = None
+
+from ..data.kenya_counties import KENYA_COUNTIES
+from ..utils.serialization import dumps
+from .enhanced_climate_service import enhanced_climate_service
+
+EXPORT_COLUMNS = [
+    "county_id", "county_name", "climate_zone", "record_type", "date",
+    "temperature", "rainfall", "humidity", "ndvi", "confidence"
+]
+
+STREAMING_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow is installed for parquet/arrow exports"""
+    return pa is not None
+
+
+async def iter_county_records(county_ids: List[int], months: int,
+                              include_predictions: bool) -> AsyncIterator[List[Dict]]:
+    """Yield the flat export rows of one county at a time"""
+    for county_id in county_ids:
+        county = KENYA_COUNTIES[county_id]
+        base = {
+            "county_id": county_id,
+            "county_name": county["name"],
+            "climate_zone": county["climate_zone"]
+        }
+        rows = []
+
+        historical = await enhanced_climate_service.get_county_historical_data(county_id, months)
+        if "error" not in historical:
+            series = historical["time_series"]
+            for i, date in enumerate(series["dates"]):
+                rows.append({
+                    **base,
+                    "record_type": "historical",
+                    "date": date,
+                    "temperature": series["temperature"][i],
+                    "rainfall": series["rainfall"][i],
+                    "humidity": series["humidity"][i],
+                    "ndvi": series["ndvi"][i],
+                    "confidence": None
+                })
+
+        if include_predictions:
+            predictions = await enhanced_climate_service.get_county_predictions(county_id, 6)
+            if "error" not in predictions:
+                series = predictions["predictions"]
+                for i, date in enumerate(series["dates"]):
+                    rows.append({
+                        **base,
+                        "record_type": "prediction",
+                        "date": date,
+                        "temperature": series["temperature"][i],
+                        "rainfall": series["rainfall"][i],
+                        "humidity": series["humidity"][i],
+                        "ndvi": series["ndvi"][i],
+                        "confidence": series["confidence_scores"][i]
+                    })
+
+        yield rows
+
+
+async def stream_csv(records: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """CSV header followed by one chunk per county"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+
+    async for rows in records:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def stream_ndjson(records: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """One JSON object per line, flushed per county"""
+    async for rows in records:
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the stream"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema():
+    return pa.schema([
+        ("county_id", pa.int16()),
+        ("county_name", pa.string()),
+        ("climate_zone", pa.string()),
+        ("record_type", pa.string()),
+        ("date", pa.string()),
+        ("temperature", pa.float32()),
+        ("rainfall", pa.float32()),
+        ("humidity", pa.float32()),
+        ("ndvi", pa.float32()),
+        ("confidence", pa.float32())
+    ])
+
+
+async def stream_arrow(records: AsyncIterator[List[Dict]], file_format: str = "parquet") -> AsyncIterator[bytes]:
+    """Parquet row groups or Arrow IPC record batches, one per county"""
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        async for rows in records:
+            if rows:
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def stream_export(county_ids: List[int], file_format: str, months: int = 12,
+                  include_predictions: bool = True) -> AsyncIterator[bytes]:
+    """Streaming body for a multi-county export in the requested format"""
+    records = iter_county_records(county_ids, months, include_predictions)
+    if file_format == "csv":
+        return stream_csv(records)
+    if file_format == "ndjson":
+        return stream_ndjson(records)
+    return stream_arrow(records, file_format)
+
+
+def export_filename(county_ids: List[int], file_format: str) -> str:
+    """Download filename for an export"""
+    scope = "all_counties" if len(county_ids) == len(KENYA_COUNTIES) else "_".join(map(str, county_ids[:5]))
+    if len(county_ids) > 5 and scope != "all_counties":
+        scope += "_etc"
+    return f"uzimasmart_climate_{scope}_{datetime.utcnow().strftime('%Y%m%d')}.{file_format}"
@@ -0,0 +1,221 @@
+"""
+NASA GIBS WMTS tile-pyramid client
+Maps any bbox onto the fixed EPSG:4326 tile matrices and mosaics shared, cached 512 px tiles
+"""
+import os
+import math
+import asyncio
+import numpy as np
+import aiohttp
+from typing import Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+
+from ..utils.concurrency import gather_bounded
+from ..utils.raster_executor import raster_executor
+from ..utils.tile_store import tile_store
+from ..utils.upstream import CircuitOpenError, upstream_client
+from .raster_ops import decode_image, validate_image
+
+load_dotenv()
+
+GIBS_WMTS_BASE = os.getenv("GIBS_WMTS_BASE", "https://gibs.earthdata.nasa.gov/wmts/epsg4326/best")
+WMTS_MAX_CONCURRENCY = int(os.getenv("WMTS_MAX_CONCURRENCY", "16"))
+
+# GIBS EPSG:4326 pyramids: 512 px tiles from (-180, 90), 0.5625 deg/px at level 0 halving per level
+TILE_SIZE = 512
+ORIGIN_LON = -180.0
+ORIGIN_LAT = 90.0
+LEVEL0_RESOLUTION = 0.5625
+
+# GIBS EPSG:4326 TileMatrixSet identifiers (as used in REST tile paths) and their deepest level,
+# per the GIBS WMTS GetCapabilities document
+TILE_MATRIX_MAX_LEVEL = {
+    "250m": 8,
+    "500m": 7,
+    "1km": 6,
+    "2km": 5
+}
+
+TileIndex = Tuple[int, int, int]  # (level, row, col)
+
+
+def level_resolution(level: int) -> float:
+    """Degrees per pixel at a pyramid level"""
+    return LEVEL0_RESOLUTION / 2 ** level
+
+
+def matrix_shape(level: int) -> Tuple[int, int]:
+    """(rows, cols) of the tile matrix at a level"""
+    span = level_resolution(level) * TILE_SIZE
+    return math.ceil(180.0 / span), math.ceil(360.0 / span)
+
+
+def select_level(tile_matrix_set: str, bbox: Sequence[float], size: Sequence[int]) -> int:
+    """Coarsest level at least as fine as the requested grid, capped at the set's deepest level"""
+    south, west, north, east = bbox
+    width, height = size
+    target = min((east - west) / width, (north - south) / height)
+    if tile_matrix_set not in TILE_MATRIX_MAX_LEVEL:
+        raise ValueError(f"Unknown GIBS tile matrix set {tile_matrix_set}, expected one of {list(TILE_MATRIX_MAX_LEVEL)}")
+    max_level = TILE_MATRIX_MAX_LEVEL[tile_matrix_set]
+    for level in range(max_level + 1):
+        if level_resolution(level) <= target:
+            return level
+    return max_level
+
+
+def tile_range(level: int, bbox: Sequence[float]) -> Tuple[int, int, int, int]:
+    """Inclusive (row0, row1, col0, col1) tile indices covering a (south, west, north, east) bbox"""
+    south, west, north, east = bbox
+    span = level_resolution(level) * TILE_SIZE
+    rows, cols = matrix_shape(level)
+    # Nudge the far edges inward so a bbox ending exactly on a tile edge does not pull in the next tile
+    row0 = min(max(int((ORIGIN_LAT - north) // span), 0), rows - 1)
+    row1 = min(max(int((ORIGIN_LAT - south - 1e-9) // span), 0), rows - 1)
+    col0 = min(max(int((west - ORIGIN_LON) // span), 0), cols - 1)
+    col1 = min(max(int((east - ORIGIN_LON - 1e-9) // span), 0), cols - 1)
+    return row0, row1, col0, col1
+
+
+def tile_bounds(level: int, row: int, col: int) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of one tile"""
+    span = level_resolution(level) * TILE_SIZE
+    north = ORIGIN_LAT - row * span
+    west = ORIGIN_LON + col * span
+    return north - span, west, north, west + span
+
+
+def mosaic_tiles(tiles: Dict[TileIndex, Optional[np.ndarray]], level: int, rows: Tuple[int, int],
+                 cols: Tuple[int, int], bbox: Sequence[float], size: Sequence[int]) -> np.ndarray:
+    """Nearest-neighbour sample of the tile mosaic onto a (height, width, 4) grid over bbox"""
+    south, west, north, east = bbox
+    width, height = size
+    row0, row1 = rows
+    col0, col1 = cols
+
+    # Missing tiles stay transparent, which downstream conversion treats as no data
+    mosaic = np.zeros(((row1 - row0 + 1) * TILE_SIZE, (col1 - col0 + 1) * TILE_SIZE, 4), dtype=np.uint8)
+    for (_, row, col), tile in tiles.items():
+        if tile is not None:
+            y, x = (row - row0) * TILE_SIZE, (col - col0) * TILE_SIZE
+            h, w = min(tile.shape[0], TILE_SIZE), min(tile.shape[1], TILE_SIZE)
+            mosaic[y:y + h, x:x + w] = tile[:h, :w]
+
+    resolution = level_resolution(level)
+    lons = west + (np.arange(width) + 0.5) * (east - west) / width
+    lats = north - (np.arange(height) + 0.5) * (north - south) / height
+    x = np.clip(((lons - ORIGIN_LON) / resolution).astype(np.int64) - col0 * TILE_SIZE, 0, mosaic.shape[1] - 1)
+    y = np.clip(((ORIGIN_LAT - lats) / resolution).astype(np.int64) - row0 * TILE_SIZE, 0, mosaic.shape[0] - 1)
+    return mosaic[y[:, None], x[None, :]]
+
+
+def decode_tile(data: bytes) -> Optional[np.ndarray]:
+    """Decoded RGBA tile, or None if the body is not a usable image"""
+    if not validate_image(data):
+        return None
+    return decode_image(data)
+
+
+class GIBSWMTSClient:
+    """Fetches GIBS WMTS tiles once, shares them across requests and mosaics them per bbox"""
+
+    def __init__(self, base_url: str = GIBS_WMTS_BASE):
+        self.base_url = base_url
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.tiles_fetched = 0
+        self.tiles_stored = 0
+        self.tiles_shared = 0
+        self.tiles_failed = 0
+        self.tiles_rejected = 0
+
+    def tile_url(self, layer_config: Dict, date: str, level: int, row: int, col: int) -> str:
+        return (
+            f"{self.base_url}/{layer_config['layer_name']}/{layer_config.get('style', 'default')}/"
+            f"{date}/{layer_config['tile_matrix_set']}/{level}/{row}/{col}.png"
+        )
+
+    async def get_tile(self, layer_config: Dict, date: str, level: int, row: int, col: int,
+                       session: Optional[aiohttp.ClientSession] = None,
+                       errors: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """One decoded tile from the tile store, an in-flight request or GIBS.
+
+        Failures are appended to errors when given, so the caller can report them once per raster.
+        """
+        layer = f"{layer_config['layer_name']}/{layer_config['tile_matrix_set']}"
+        key = tile_store.tile_key(layer, tile_bounds(level, row, col), date, (TILE_SIZE, TILE_SIZE))
+        immutable = tile_store.is_immutable(date, layer_config.get('period_days', 1))
+
+        if immutable:
+            tile = await raster_executor.run_io(tile_store.get, key)
+            if tile is not None:
+                self.tiles_stored += 1
+                return tile
+
+        # Overlapping counties requesting the same tile share one download
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.tiles_shared += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        tile = None
+        try:
+            data = await upstream_client.fetch(
+                layer_config['layer_name'], self.tile_url(layer_config, date, level, row, col), session=session
+            )
+            tile = await raster_executor.run(decode_tile, data)
+            self.tiles_fetched += 1
+            # Fully transparent tiles are unpublished imagery, not data worth keeping
+            if tile is not None and immutable and tile[..., 3].any():
+                await raster_executor.run_io(tile_store.put, key, tile)
+        except CircuitOpenError:
+            # Rejected without a request; the breaker already reports its state
+            self.tiles_rejected += 1
+        except Exception as e:
+            self.tiles_failed += 1
+            if errors is not None:
+                errors.append(f"{level}/{row}/{col}: {e}")
+            else:
+                print(f"WMTS tile error {layer} {date} {level}/{row}/{col}: {e}")
+        finally:
+            self._inflight.pop(key, None)
+            future.set_result(tile)
+        return tile
+
+    async def get_raster(self, layer_config: Dict, bounds: Dict, date: str, size: Sequence[int] = (256, 256),
+                         session: Optional[aiohttp.ClientSession] = None) -> Optional[np.ndarray]:
+        """RGBA (height, width, 4) raster of bounds on a size grid, or None if no tile arrived"""
+        bbox = (bounds['south'], bounds['west'], bounds['north'], bounds['east'])
+        level = select_level(layer_config['tile_matrix_set'], bbox, size)
+        row0, row1, col0, col1 = tile_range(level, bbox)
+        indices: List[TileIndex] = [
+            (level, row, col) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)
+        ]
+
+        errors: List[str] = []
+        fetched = await gather_bounded(
+            [self.get_tile(layer_config, date, *index, session=session, errors=errors) for index in indices],
+            limit=WMTS_MAX_CONCURRENCY
+        )
+        if errors:
+            print(f"WMTS tile errors {layer_config['layer_name']} {date}: "
+                  f"{len(errors)} of {len(indices)} tiles failed, first {errors[0]}")
+        tiles = dict(zip(indices, fetched))
+        if all(tile is None for tile in fetched):
+            return None
+        return await raster_executor.run(mosaic_tiles, tiles, level, (row0, row1), (col0, col1), bbox, tuple(size))
+
+    def stats(self) -> Dict:
+        return {
+            "fetched": self.tiles_fetched,
+            "from_store": self.tiles_stored,
+            "shared_in_flight": self.tiles_shared,
+            "failed": self.tiles_failed,
+            "rejected_open_circuit": self.tiles_rejected,
+            "in_flight": len(self._inflight)
+        }
+
+
+# Global WMTS client instance
+gibs_wmts_client = GIBSWMTSClient()
@@ -9,6 +9,8 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from ..utils.cache import get_cache, set_cache
+from ..utils.http import get_http_session
+from ..data.county_geometry import KENYA_BOUNDS, get_county_bounds
 import numpy as np
 from xml.etree import ElementTree as ET
 
@@ -55,10 +57,15 @@ class NASAGIBSService:
             }
         }
     
+    def attach_session(self, session: aiohttp.ClientSession):
+        """Use the application's shared connection pool"""
+        self.session = session
+    
     async def initialize(self):
         """Initialize NASA GIBS service"""
         try:
-            self.session = aiohttp.ClientSession()
+            if not self.session or self.session.closed:
+                self.session = await get_http_session()
             # Test connection
             async with self.session.get(f"{self.capabilities_url}?SERVICE=WMTS&REQUEST=GetCapabilities") as response:
                 if response.status == 200:
@@ -72,30 +79,13 @@ class NASAGIBSService:
             return False
     
     async def close(self):
-        """Close the session"""
-        if self.session:
-            await self.session.close()
+        """Release the session; the shared pool is closed by the application lifespan"""
+        self.session = None
     
     def _get_kenya_bounds(self, county_id: int = None) -> Dict:
         """Get bounding box for Kenya or specific county"""
-        # Kenya national bounds
-        kenya_bounds = {
-            "north": 5.0,
-            "south": -4.7,
-            "east": 41.9,
-            "west": 33.9
-        }
-        
-        # County-specific bounds (sample for major counties)
-        county_bounds = {
-            1: {"north": -1.16, "south": -1.44, "east": 37.1, "west": 36.6},  # Nairobi
-            2: {"north": -3.8, "south": -4.3, "east": 39.8, "west": 39.4},   # Mombasa
-            3: {"north": -0.0, "south": -0.4, "east": 35.0, "west": 34.5},   # Kisumu
-            4: {"north": -0.2, "south": -1.2, "east": 36.4, "west": 35.8},   # Nakuru
-            5: {"north": -1.3, "south": -1.7, "east": 37.5, "west": 36.8},   # Machakos
-        }
-        
-        return county_bounds.get(county_id, kenya_bounds)
+        county_bounds = get_county_bounds(county_id) if county_id is not None else None
+        return county_bounds or KENYA_BOUNDS
     
     async def get_ndvi_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get NDVI data from MODIS Terra/Aqua"""
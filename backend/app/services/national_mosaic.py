@@ -0,0 +1,134 @@
+"""
+Nationwide GIBS mosaic with per-county zonal reduction
+One Kenya-extent raster per layer and date, reduced to all 47 county statistics at once
+"""
+import os
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+
+from ..data.kenya_counties import KENYA_COUNTIES
+from ..data.county_geometry import KENYA_BOUNDS, county_label_raster
+from ..utils.cache import get_or_compute
+from ..utils.raster_executor import raster_executor
+from .colormaps import colormap_registry
+from .production_nasa_gibs import production_nasa_gibs_service
+from .raster_ops import EMPTY_STATS, labelled_statistics
+from .temporal_compositor import COMPOSITE_REDUCERS, composite_dates, composite_raster, fetch_window_tiles, parse_date
+
+load_dotenv()
+
+# Grid spacing of the national raster (0.01 deg is roughly 1.1 km)
+NATIONAL_RESOLUTION_DEG = float(os.getenv("NATIONAL_RESOLUTION_DEG", "0.01"))
+
+# Product dates one national window may span; each is a full Kenya-extent raster
+NATIONAL_MAX_DATES = int(os.getenv("NATIONAL_MAX_DATES", "8"))
+
+# Cache lifetime (seconds) of national statistics, also advertised to clients in Cache-Control
+NATIONAL_TTL = 21600
+# Windows that end before today only change on GIBS reprocessing; kept across two daily prefetches
+NATIONAL_ARCHIVE_TTL = 172800
+
+# Decimal places reported per layer
+LAYER_DECIMALS = {"ndvi": 3, "temperature": 2, "precipitation": 2}
+
+
+def national_county_statistics(tiles: List[np.ndarray], layer_type: str, layer_config: Dict,
+                               lut: Optional[Dict], bbox: Sequence[float], size: Sequence[int]) -> Dict[int, Dict]:
+    """Composite national tiles over time and reduce them per county label"""
+    # The county label raster is rasterized once per worker and cached there
+    labels = county_label_raster(bbox, size)
+    return labelled_statistics(composite_raster(tiles, layer_type, layer_config, lut), labels)
+
+
+class NationalMosaicService:
+    """All-county satellite statistics from a single national raster per layer and date"""
+
+    def __init__(self, gibs_service=production_nasa_gibs_service):
+        self.gibs_service = gibs_service
+        self.bounds = KENYA_BOUNDS
+        self.bbox = (KENYA_BOUNDS["south"], KENYA_BOUNDS["west"], KENYA_BOUNDS["north"], KENYA_BOUNDS["east"])
+        self.size = (
+            int(round((KENYA_BOUNDS["east"] - KENYA_BOUNDS["west"]) / NATIONAL_RESOLUTION_DEG)),
+            int(round((KENYA_BOUNDS["north"] - KENYA_BOUNDS["south"]) / NATIONAL_RESOLUTION_DEG))
+        )
+
+    def window(self, layer_type: str, start_date: str = None, end_date: str = None) -> Tuple[date, date]:
+        """Validated date window (default: last 8 days); raises ValueError for bad or too long windows"""
+        try:
+            end = parse_date(end_date) if end_date else (datetime.utcnow() - timedelta(days=1)).date()
+            start = parse_date(start_date) if start_date else end - timedelta(days=7)
+        except ValueError:
+            raise ValueError("Dates must be YYYY-MM-DD")
+        if start > end:
+            raise ValueError("start_date must not be after end_date")
+
+        dates = len(composite_dates(layer_type, start, end, max_dates=None))
+        if dates > NATIONAL_MAX_DATES:
+            raise ValueError(f"Window spans {dates} {layer_type} dates, at most {NATIONAL_MAX_DATES} allowed")
+        return start, end
+
+    async def get_county_statistics(self, layer_type: str, start_date: str = None, end_date: str = None) -> Dict:
+        """Statistics of one layer for every county over a date window (default: last 8 days)"""
+        if layer_type not in self.gibs_service.layers:
+            return {"error": f"Unknown layer {layer_type}"}
+
+        try:
+            start, end = self.window(layer_type, start_date, end_date)
+
+            # Cache past windows for 2 days and windows reaching today for 6 hours;
+            # concurrent misses share one national fetch
+            ttl = NATIONAL_ARCHIVE_TTL if end < datetime.utcnow().date() else NATIONAL_TTL
+            return await get_or_compute(
+                f"national_{layer_type}_{start.isoformat()}_{end.isoformat()}",
+                lambda: self._build_county_statistics(layer_type, start.isoformat(), end.isoformat()),
+                ttl=ttl
+            )
+        except Exception as e:
+            return {"error": f"National {layer_type} statistics failed: {str(e)}"}
+
+    async def _build_county_statistics(self, layer_type: str, start_date: str, end_date: str) -> Dict:
+        """Fetch the national window, composite it and reduce it per county"""
+        layer_config = self.gibs_service.layers[layer_type]
+
+        async def fetch_tile(date: str) -> Optional[np.ndarray]:
+            response = await self.gibs_service._get_satellite_data(layer_config, self.bounds, date, self.size)
+            return response["data"] if response["success"] else None
+
+        dates, tiles = await fetch_window_tiles(fetch_tile, layer_type, start_date, end_date)
+        if not tiles:
+            raise ValueError(f"no national imagery between {start_date} and {end_date}")
+
+        lut = await colormap_registry.get(layer_config["layer_name"])
+        county_stats = await raster_executor.run(
+            national_county_statistics, tiles, layer_type, layer_config, lut, self.bbox, self.size
+        )
+
+        decimals = LAYER_DECIMALS.get(layer_type, 3)
+        counties = []
+        for county_id, county in KENYA_COUNTIES.items():
+            stats = county_stats.get(county_id, EMPTY_STATS)
+            counties.append({
+                "county_id": county_id,
+                "county_name": county["name"],
+                **{k: round(v, decimals) if k != "count" else v for k, v in stats.items()},
+                "data_quality": "satellite" if stats["count"] > 0 else "unavailable"
+            })
+
+        return {
+            "layer_type": layer_type,
+            "layer": layer_config["layer_name"],
+            "start_date": start_date,
+            "end_date": end_date,
+            "composite": COMPOSITE_REDUCERS.get(layer_type, "mean"),
+            "image_dates": dates,
+            "grid": {"bounds": self.bounds, "width": self.size[0], "height": self.size[1]},
+            "counties": counties,
+            "data_source": "NASA_GIBS_National_Mosaic",
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+
+
+# Global national mosaic service instance
+national_mosaic_service = NationalMosaicService()
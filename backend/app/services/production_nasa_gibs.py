@@ -9,28 +9,24 @@ import json
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from PIL import Image
-import io
 import base64
 from ..utils.cache import get_cache, set_cache
+from ..utils.http import get_http_session
+from ..utils.upstream import SYNTHETIC_CACHE_TTL
+from .gibs_wmts import GIBS_WMTS_BASE, gibs_wmts_client
+from .temporal_compositor import composite_dates, fetch_composite
+from ..data.county_geometry import COUNTY_BOUNDS, county_mask
+from ..data.climate_profiles import get_county_normals, get_seasonal_baseline
 
 class ProductionNASAGIBSService:
     """Production-ready NASA GIBS service with enhanced error handling"""
     
     def __init__(self):
-        self.wmts_base = "https://gibs.earthdata.nasa.gov/wmts-geo/1.0.0"
-        self.wms_base = "https://gibs.earthdata.nasa.gov/wms/epsg4326/best/wms.cgi"
+        self.wmts_base = GIBS_WMTS_BASE
         self.session: Optional[aiohttp.ClientSession] = None
         
-        # Kenya county boundaries with precise coordinates
-        self.county_bounds = {
-            1: {"name": "Nairobi", "north": -1.163, "south": -1.444, "east": 37.104, "west": 36.752},
-            2: {"name": "Mombasa", "north": -3.95, "south": -4.3, "east": 39.82, "west": 39.52},
-            3: {"name": "Kisumu", "north": -0.05, "south": -0.4, "east": 35.0, "west": 34.65},
-            4: {"name": "Nakuru", "north": -0.2, "south": -1.2, "east": 36.4, "west": 35.8},
-            5: {"name": "Machakos", "north": -1.3, "south": -1.7, "east": 37.5, "west": 36.8},
-            # Can expand with more counties
-        }
+        # All 47 counties from the shared county registry
+        self.county_bounds = COUNTY_BOUNDS
         
         # Available layers with their configurations
         self.layers = {
@@ -38,34 +34,42 @@ class ProductionNASAGIBSService:
                 "layer_name": "MODIS_Terra_NDVI_8Day",
                 "format": "image/png",
                 "style": "default",
-                "tile_matrix_set": "EPSG4326_250m"
+                "tile_matrix_set": "250m",
+                "period_days": 8,  # MODIS 8-day composite
+                "data_range": [0, 1],  # Approximate linear palette range
+                "scale_factor": 1.0
             },
             "temperature": {
                 "layer_name": "MODIS_Terra_Land_Surface_Temp_Day",
                 "format": "image/png", 
                 "style": "default",
-                "tile_matrix_set": "EPSG4326_1km"
+                "tile_matrix_set": "1km",
+                "data_range": [250, 340],  # Kelvin
+                "scale_factor": 1.0
             },
             "precipitation": {
                 "layer_name": "GPM_3IMERGHH_06_precipitation",
                 "format": "image/png",
                 "style": "default", 
-                "tile_matrix_set": "EPSG4326_10km"
+                "tile_matrix_set": "2km",
+                "data_range": [0, 100],  # mm/hr
+                "scale_factor": 1.0
             }
         }
     
+    def attach_session(self, session: aiohttp.ClientSession):
+        """Use the application's shared connection pool"""
+        self.session = session
+    
     async def initialize(self):
-        """Initialize the service with session"""
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        """Initialize the service with the shared session"""
+        if not self.session or self.session.closed:
+            self.session = await get_http_session()
         return True
     
     async def close(self):
-        """Close the session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Release the session; the shared pool is closed by the application lifespan"""
+        self.session = None
     
     def _get_date_string(self, date_input):
         """Convert date to GIBS format (YYYY-MM-DD)"""
@@ -76,24 +80,9 @@ class ProductionNASAGIBSService:
             return date_input.strftime('%Y-%m-%d')
         return date_input
     
-    async def _validate_gibs_response(self, response_data: bytes) -> bool:
-        """Validate if the response contains valid image data"""
-        try:
-            # Check if response is an actual image
-            image = Image.open(io.BytesIO(response_data))
-            # Check if image has reasonable dimensions
-            if image.size[0] < 10 or image.size[1] < 10:
-                return False
-            # Check if image is not just a blank/error image
-            image_array = np.array(image)
-            if image_array.size == 0:
-                return False
-            return True
-        except Exception:
-            return False
-    
-    async def _get_satellite_data(self, layer_config: Dict, bounds: Dict, date: str) -> Dict:
-        """Get satellite data with robust error handling"""
+    async def _get_satellite_data(self, layer_config: Dict, bounds: Dict, date: str,
+                                  size: Tuple[int, int] = (256, 256)) -> Dict:
+        """Get decoded satellite data mosaicked from shared WMTS tiles"""
         try:
             # Ensure session is initialized
             if not self.session:
@@ -107,43 +96,21 @@ class ProductionNASAGIBSService:
                     "message": "Failed to initialize HTTP session"
                 }
             
-            params = {
-                'SERVICE': 'WMS',
-                'VERSION': '1.3.0',
-                'REQUEST': 'GetMap',
-                'LAYERS': layer_config['layer_name'],
-                'STYLES': layer_config['style'],
-                'FORMAT': layer_config['format'],
-                'CRS': 'EPSG:4326',
-                'BBOX': f"{bounds['south']},{bounds['west']},{bounds['north']},{bounds['east']}",
-                'WIDTH': '256',
-                'HEIGHT': '256',
-                'TIME': self._get_date_string(date)
-            }
-            
-            async with self.session.get(self.wms_base, params=params) as response:
-                if response.status == 200:
-                    response_data = await response.read()
-                    
-                    # Validate the response
-                    if await self._validate_gibs_response(response_data):
-                        return {
-                            "success": True,
-                            "data": response_data,
-                            "message": "Data retrieved successfully"
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "data": None,
-                            "message": "Invalid or empty image data"
-                        }
-                else:
-                    return {
-                        "success": False,
-                        "data": None,
-                        "message": f"HTTP error {response.status}"
-                    }
+            image_array = await gibs_wmts_client.get_raster(
+                layer_config, bounds, self._get_date_string(date), size, session=self.session
+            )
+            if image_array is not None:
+                return {
+                    "success": True,
+                    "data": image_array,
+                    "message": "Data retrieved successfully"
+                }
+            else:
+                return {
+                    "success": False,
+                    "data": None,
+                    "message": "Invalid or empty image data"
+                }
                     
         except Exception as e:
             return {
@@ -152,62 +119,37 @@ class ProductionNASAGIBSService:
                 "message": f"Request failed: {str(e)}"
             }
     
+    async def _get_composite(self, county_id: int, layer_config: Dict, layer_type: str,
+                             start_date: str, end_date: str) -> Dict:
+        """Temporal composite of every product date between start_date and end_date"""
+        bounds = self.county_bounds[county_id]
+        
+        async def fetch_tile(date: str) -> Optional[np.ndarray]:
+            response = await self._get_satellite_data(layer_config, bounds, date)
+            return response["data"] if response["success"] else None
+        
+        # Zonal statistics over the county polygon rather than its whole bounding box
+        bbox = (bounds['south'], bounds['west'], bounds['north'], bounds['east'])
+        mask = county_mask(county_id, bbox, (256, 256))
+        return await fetch_composite(fetch_tile, layer_type, layer_config, start_date, end_date, mask)
+    
     def _generate_synthetic_data(self, layer_type: str, county_id: int) -> Dict:
         """Generate realistic synthetic data when satellite data is unavailable"""
-        # This provides reasonable estimates based on Kenya's climate patterns
+        # Seasonal, elevation-corrected baselines of this county for the current month
         county_name = self.county_bounds.get(county_id, {}).get("name", f"County {county_id}")
-        
-        # Base values with some variation by county
-        base_values = {
-            "ndvi": {
-                1: 0.45,  # Nairobi - urban, moderate vegetation
-                2: 0.38,  # Mombasa - coastal, lower vegetation
-                3: 0.52,  # Kisumu - lakeside, higher vegetation
-                4: 0.48,  # Nakuru - agricultural area
-                5: 0.41   # Machakos - semi-arid
-            },
-            "temperature": {
-                1: 19.5,  # Nairobi - highland, cooler
-                2: 26.8,  # Mombasa - coastal, warmer
-                3: 23.2,  # Kisumu - lakeside, moderate
-                4: 18.9,  # Nakuru - highland, cooler
-                5: 22.1   # Machakos - moderate elevation
-            },
-            "precipitation": {
-                1: 2.5,   # Nairobi - moderate rainfall
-                2: 3.8,   # Mombasa - coastal rains
-                3: 4.2,   # Kisumu - high rainfall near lake
-                4: 2.1,   # Nakuru - moderate
-                5: 1.8    # Machakos - semi-arid, low rainfall
-            }
-        }
-        
-        base_value = base_values[layer_type].get(county_id, base_values[layer_type][1])
-        
-        # Add some seasonal variation
         current_month = datetime.now().month
-        seasonal_factor = 1.0
         
         if layer_type == "precipitation":
-            # Kenya has two rainy seasons: March-May and October-December
-            if current_month in [3, 4, 5, 10, 11, 12]:
-                seasonal_factor = 1.5  # Increase during rainy seasons
-            else:
-                seasonal_factor = 0.7  # Decrease during dry seasons
-        elif layer_type == "ndvi":
-            # NDVI follows precipitation patterns with a lag
-            if current_month in [4, 5, 6, 11, 12, 1]:
-                seasonal_factor = 1.2  # Higher vegetation after rains
-            else:
-                seasonal_factor = 0.9  # Lower during dry periods
-        
-        adjusted_value = base_value * seasonal_factor
+            # Monthly rainfall (mm) expressed as a mean mm/hr rate
+            base_value = get_seasonal_baseline(county_id, current_month, "rainfall") / (30.4 * 24)
+        else:
+            base_value = get_seasonal_baseline(county_id, current_month, layer_type)
         
         return {
-            "mean": round(adjusted_value, 3),
-            "std": round(adjusted_value * 0.15, 3),  # 15% variation
-            "min": round(adjusted_value * 0.8, 3),
-            "max": round(adjusted_value * 1.2, 3),
+            "mean": round(base_value, 3),
+            "std": round(abs(base_value) * 0.15, 3),  # 15% variation
+            "min": round(base_value * 0.8, 3),
+            "max": round(base_value * 1.2, 3),
             "count": 65536,  # Simulated pixel count for 256x256 image
             "data_quality": "synthetic",
             "county_name": county_name
@@ -215,7 +157,7 @@ class ProductionNASAGIBSService:
     
     async def get_ndvi_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get NDVI data with fallback to synthetic data"""
-        cache_key = f"nasa_ndvi_prod_{county_id}_{start_date}_{end_date}"
+        cache_key = f"nasa_ndvi_prod_v2_{county_id}_{self._get_date_string(start_date)}_{self._get_date_string(end_date)}"
         cached_data = await get_cache(cache_key)
         if cached_data:
             return cached_data
@@ -228,11 +170,11 @@ class ProductionNASAGIBSService:
             layer_config = self.layers["ndvi"]
             
             # Try to get real satellite data
-            satellite_response = await self._get_satellite_data(layer_config, bounds, end_date)
+            composite = await self._get_composite(county_id, layer_config, "ndvi", start_date, end_date)
             
-            if satellite_response["success"]:
-                # Process real satellite data (placeholder for now)
-                stats = {"mean": 0.45, "std": 0.08, "min": 0.35, "max": 0.65, "count": 45231}
+            # Use real satellite statistics when the composite has valid pixels
+            if composite["success"]:
+                stats = {k: round(v, 3) if k != "count" else v for k, v in composite["stats"].items()}
                 data_quality = "satellite"
             else:
                 # Use synthetic data as fallback
@@ -252,11 +194,14 @@ class ProductionNASAGIBSService:
                 "data_source": "NASA_GIBS_Production",
                 "data_quality": data_quality,
                 "layer": layer_config["layer_name"],
+                "composite": composite["reducer"],
+                "image_dates": composite["dates"],
                 "confidence": 0.90 if data_quality == "satellite" else 0.75,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
-            await set_cache(cache_key, result, ttl=21600)  # Cache for 6 hours
+            # Cache satellite results for 6 hours; synthetic fallbacks only briefly
+            await set_cache(cache_key, result, ttl=21600 if data_quality == "satellite" else SYNTHETIC_CACHE_TTL)
             return result
             
         except Exception as e:
@@ -264,7 +209,7 @@ class ProductionNASAGIBSService:
     
     async def get_temperature_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get temperature data with fallback to synthetic data"""
-        cache_key = f"nasa_temp_prod_{county_id}_{start_date}_{end_date}"
+        cache_key = f"nasa_temp_prod_v2_{county_id}_{self._get_date_string(start_date)}_{self._get_date_string(end_date)}"
         cached_data = await get_cache(cache_key)
         if cached_data:
             return cached_data
@@ -276,10 +221,11 @@ class ProductionNASAGIBSService:
             bounds = self.county_bounds[county_id]
             layer_config = self.layers["temperature"]
             
-            satellite_response = await self._get_satellite_data(layer_config, bounds, end_date)
+            composite = await self._get_composite(county_id, layer_config, "temperature", start_date, end_date)
             
-            if satellite_response["success"]:
-                stats = {"mean": 23.5, "std": 2.8, "min": 18.2, "max": 28.9, "count": 42156}
+            # Use real satellite statistics when the composite has valid pixels
+            if composite["success"]:
+                stats = {k: round(v, 2) if k != "count" else v for k, v in composite["stats"].items()}
                 data_quality = "satellite"
             else:
                 stats = self._generate_synthetic_data("temperature", county_id)
@@ -298,11 +244,14 @@ class ProductionNASAGIBSService:
                 "data_source": "NASA_GIBS_Production",
                 "data_quality": data_quality,
                 "layer": layer_config["layer_name"],
+                "composite": composite["reducer"],
+                "image_dates": composite["dates"],
                 "confidence": 0.85 if data_quality == "satellite" else 0.70,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
-            await set_cache(cache_key, result, ttl=21600)
+            # Cache satellite results for 6 hours; synthetic fallbacks only briefly
+            await set_cache(cache_key, result, ttl=21600 if data_quality == "satellite" else SYNTHETIC_CACHE_TTL)
             return result
             
         except Exception as e:
@@ -310,7 +259,7 @@ class ProductionNASAGIBSService:
     
     async def get_precipitation_data(self, county_id: int, start_date: str, end_date: str) -> Dict:
         """Get precipitation data with fallback to synthetic data"""
-        cache_key = f"nasa_precip_prod_{county_id}_{start_date}_{end_date}"
+        cache_key = f"nasa_precip_prod_v4_{county_id}_{self._get_date_string(start_date)}_{self._get_date_string(end_date)}"
         cached_data = await get_cache(cache_key)
         if cached_data:
             return cached_data
@@ -322,17 +271,21 @@ class ProductionNASAGIBSService:
             bounds = self.county_bounds[county_id]
             layer_config = self.layers["precipitation"]
             
-            satellite_response = await self._get_satellite_data(layer_config, bounds, end_date)
+            composite = await self._get_composite(county_id, layer_config, "precipitation", start_date, end_date)
+            # Days the composite window covers, after any COMPOSITE_MAX_DATES cap
+            window_days = len(composite_dates("precipitation", start_date, end_date))
             
-            if satellite_response["success"]:
-                stats = {"mean": 1.5, "std": 0.8, "min": 0.0, "max": 4.2, "count": 38921}
+            # Use real satellite statistics when the composite has valid pixels
+            if composite["success"]:
+                # The composite is each pixel's mean mm/hr rate over the dates it has data for
+                stats = {k: round(v, 2) if k != "count" else v for k, v in composite["stats"].items()}
                 data_quality = "satellite"
             else:
                 stats = self._generate_synthetic_data("precipitation", county_id)
                 data_quality = "synthetic"
             
-            # Convert to daily total (approximate)
-            daily_total = stats["mean"] * 24 if stats["mean"] > 0 else 0
+            # Window total from the mean daily rate, so dates GIBS has not published do not read as dry days
+            daily_total = stats["mean"] * 24 * window_days if stats["mean"] > 0 else 0
             
             result = {
                 "county_id": county_id,
@@ -340,17 +293,21 @@ class ProductionNASAGIBSService:
                 "start_date": start_date,
                 "end_date": end_date,
                 "rainfall_total": round(daily_total, 2),
+                "window_days": window_days,
                 "rainfall_mean": stats["mean"],
                 "rainfall_max": stats["max"],
                 "pixel_count": stats["count"],
                 "data_source": "NASA_GIBS_Production",
                 "data_quality": data_quality,
                 "layer": layer_config["layer_name"],
+                "composite": composite["reducer"],
+                "image_dates": composite["dates"],
                 "confidence": 0.88 if data_quality == "satellite" else 0.72,
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
             
-            await set_cache(cache_key, result, ttl=21600)
+            # Cache satellite results for 6 hours; synthetic fallbacks only briefly
+            await set_cache(cache_key, result, ttl=21600 if data_quality == "satellite" else SYNTHETIC_CACHE_TTL)
             return result
             
         except Exception as e:
@@ -401,6 +358,9 @@ class ProductionNASAGIBSService:
     
     async def detect_drought_conditions(self, county_id: int, historical_days: int = 90) -> Dict:
         """Production drought detection with realistic assessments"""
+        if county_id not in self.county_bounds:
+            return {"error": f"County {county_id} not found"}
+        
         try:
             # Get recent data
             recent_data = await self.get_county_climate_data(county_id, days=30)
@@ -409,16 +369,12 @@ class ProductionNASAGIBSService:
             current_rainfall = recent_data.get("rainfall_total", 20)
             current_temp = recent_data.get("temperature_mean", 25)
             
-            # Enhanced thresholds based on Kenya's climate
-            county_thresholds = {
-                1: {"ndvi_normal": 0.45, "rainfall_normal": 50, "temp_normal": 19.5},  # Nairobi
-                2: {"ndvi_normal": 0.38, "rainfall_normal": 70, "temp_normal": 26.8},  # Mombasa
-                3: {"ndvi_normal": 0.52, "rainfall_normal": 85, "temp_normal": 23.2},  # Kisumu
-                4: {"ndvi_normal": 0.48, "rainfall_normal": 45, "temp_normal": 18.9},  # Nakuru
-                5: {"ndvi_normal": 0.41, "rainfall_normal": 35, "temp_normal": 22.1}   # Machakos
-            }
-            
-            thresholds = county_thresholds.get(county_id, county_thresholds[1])
+            # Seasonal normals of this county; rainfall scaled to the composited window
+            window = recent_data["date_range"]
+            window_days = recent_data.get("window_days") or len(composite_dates("precipitation", window["start"], window["end"]))
+            thresholds = get_county_normals(county_id, datetime.utcnow().month)
+            thresholds["rainfall_normal"] *= window_days / 30.4
+            thresholds = {k: round(v, 3) for k, v in thresholds.items()}
             
             # Calculate normalized anomalies
             ndvi_anomaly = (current_ndvi - thresholds["ndvi_normal"]) / thresholds["ndvi_normal"]
@@ -0,0 +1,140 @@
+"""
+Raster operations for NASA GIBS imagery
+Pure functions for decoding, validation and statistics, safe to run in worker pools
+"""
+import io
+import struct
+import numpy as np
+from PIL import Image
+from typing import Dict, Optional
+
+from .colormaps import apply_colormap
+
+EMPTY_STATS = {"mean": 0, "std": 0, "min": 0, "max": 0, "count": 0}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# IHDR colour types mapped to PIL modes
+PNG_COLOR_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+
+
+def decode_image(image_data: bytes) -> np.ndarray:
+    """Decode PNG bytes into an (H, W, 4) RGBA uint8 array"""
+    image = Image.open(io.BytesIO(image_data))
+    if image.mode != "RGBA":
+        # Palettized GIBS tiles expand through their palette, keeping colours for the colormap lookup
+        image = image.convert("RGBA")
+    return np.asarray(image)
+
+
+def read_png_header(image_data: bytes) -> Optional[Dict]:
+    """Dimensions and mode from the PNG IHDR chunk, without decoding pixels"""
+    if len(image_data) < 33 or image_data[:8] != PNG_SIGNATURE or image_data[12:16] != b"IHDR":
+        return None
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", image_data[16:26])
+    return {
+        "width": width,
+        "height": height,
+        "bit_depth": bit_depth,
+        "mode": PNG_COLOR_MODES.get(color_type)
+    }
+
+
+def validate_image(image_data: bytes, min_size: int = 10) -> bool:
+    """Check from the header that the response is an 8-bit PNG of reasonable size"""
+    header = read_png_header(image_data)
+    if header is None or header["mode"] is None:
+        return False
+    if header["width"] < min_size or header["height"] < min_size:
+        return False
+    # Palette images may pack indices below 8 bits; PIL unpacks them to uint8
+    return header["bit_depth"] == 8 or (header["mode"] == "P" and header["bit_depth"] < 8)
+
+
+def to_physical(image_array: np.ndarray, layer_type: str, layer_config: Dict,
+                lut: Optional[Dict] = None) -> np.ndarray:
+    """Pixels in physical units, with NaN where the pixel holds no data"""
+    if lut is not None:
+        values = apply_colormap(image_array, lut)
+        if layer_type == "ndvi":
+            np.clip(values, 0, 1, out=values)
+        return values
+
+    # Without a colormap, approximate with a linear scale of the red channel
+    # Convert RGBA to single channel (use red channel for data)
+    data_channel = image_array[:, :, 0] if image_array.ndim == 3 else image_array
+
+    # Filter out no-data values (typically 0 or 255)
+    valid_mask = (data_channel > 0) & (data_channel < 255)
+    if image_array.ndim == 3 and image_array.shape[-1] == 4:
+        valid_mask &= image_array[:, :, 3] > 0
+
+    scale_factor = layer_config.get('scale_factor', 1.0)
+    data_range = layer_config.get('data_range', [0, 255])
+
+    # Scale from 0-255 to actual data range
+    values = (data_channel / 255.0) * (data_range[1] - data_range[0]) + data_range[0]
+    values *= scale_factor
+
+    if layer_type == "temperature":
+        # Convert from Kelvin to Celsius
+        values -= 273.15
+    elif layer_type == "ndvi":
+        # NDVI is typically scaled -1 to 1, but we want 0 to 1 for vegetation
+        np.clip(values, 0, 1, out=values)
+
+    values[~valid_mask] = np.nan
+    return values
+
+
+def summarize(values: np.ndarray) -> Dict:
+    """NaN-aware mean, std, min, max and valid pixel count"""
+    count = int(np.count_nonzero(~np.isnan(values)))
+    if count == 0:
+        return dict(EMPTY_STATS)
+    return {
+        "mean": float(np.nanmean(values)),
+        "std": float(np.nanstd(values)),
+        "min": float(np.nanmin(values)),
+        "max": float(np.nanmax(values)),
+        "count": count
+    }
+
+
+def zonal_summary(values: np.ndarray, mask: Optional[np.ndarray] = None) -> Dict:
+    """Statistics over the pixels inside a boolean zone mask (all pixels without one)"""
+    return summarize(values if mask is None else values[mask])
+
+
+def labelled_statistics(values: np.ndarray, labels: np.ndarray) -> Dict[int, Dict]:
+    """Per-label statistics of a raster in one pass; label 0 is background"""
+    valid = (labels > 0) & ~np.isnan(values)
+    zone = labels[valid].astype(np.intp)
+    data = values[valid]
+    if zone.size == 0:
+        return {}
+
+    count = np.bincount(zone)
+    total = np.bincount(zone, weights=data)
+    squares = np.bincount(zone, weights=data * data)
+
+    # Min/max per label: sort once by label, then reduce each contiguous run
+    order = np.argsort(zone, kind="stable")
+    sorted_zone = zone[order]
+    sorted_data = data[order]
+    starts = np.flatnonzero(np.r_[True, sorted_zone[1:] != sorted_zone[:-1]])
+    present = sorted_zone[starts]
+    minimum = np.minimum.reduceat(sorted_data, starts)
+    maximum = np.maximum.reduceat(sorted_data, starts)
+
+    mean = total[present] / count[present]
+    std = np.sqrt(np.maximum(squares[present] / count[present] - mean * mean, 0))
+    return {
+        int(label): {
+            "mean": float(mean[i]),
+            "std": float(std[i]),
+            "min": float(minimum[i]),
+            "max": float(maximum[i]),
+            "count": int(count[label])
+        }
+        for i, label in enumerate(present)
+    }
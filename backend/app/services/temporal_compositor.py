@@ -0,0 +1,117 @@
+"""
+Temporal compositing of NASA GIBS imagery
+Fetches every product date in a window concurrently and reduces the (T, H, W) stack in one pass
+"""
+import os
+import warnings
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.concurrency import gather_bounded
+from ..utils.raster_executor import raster_executor
+from .colormaps import colormap_registry
+from .raster_ops import EMPTY_STATS, to_physical, zonal_summary
+
+# Enough for a 30-day window of a daily product (both ends inclusive)
+COMPOSITE_MAX_DATES = int(os.getenv("COMPOSITE_MAX_DATES", "31"))
+
+# Product cadence in days; MODIS 8-day periods restart on day-of-year 1, 9, 17, ... each year
+LAYER_CADENCE_DAYS = {"ndvi": 8, "temperature": 1, "precipitation": 1}
+
+# Max-value NDVI suppresses cloud; LST and IMERG rates are averaged over each pixel's valid dates
+COMPOSITE_REDUCERS = {"ndvi": "max", "temperature": "mean", "precipitation": "mean"}
+
+
+def parse_date(value) -> date:
+    """Calendar date from an ISO string or datetime"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value.replace('Z', '').split('T')[0], "%Y-%m-%d").date()
+
+
+def composite_dates(layer_type: str, start_date, end_date,
+                    max_dates: Optional[int] = COMPOSITE_MAX_DATES) -> List[str]:
+    """Product dates covering the window, most recent max_dates kept (all of them when None)"""
+    start, end = sorted((parse_date(start_date), parse_date(end_date)))
+    cadence = LAYER_CADENCE_DAYS.get(layer_type, 1)
+
+    # Start from the product period that contains the window start
+    day = start - timedelta(days=(start.timetuple().tm_yday - 1) % cadence)
+    dates = []
+    while day <= end:
+        dates.append(day.isoformat())
+        following = day + timedelta(days=cadence)
+        day = following if following.year == day.year else date(following.year, 1, 1)
+    return dates[-max_dates:] if max_dates else dates
+
+
+def reduce_stack(stack: np.ndarray, layer_type: str) -> np.ndarray:
+    """Per-pixel composite of a (T, H, W) stack, NaN where no date has data"""
+    reducer = COMPOSITE_REDUCERS.get(layer_type, "mean")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN pixels are expected
+        if reducer == "max":
+            return np.nanmax(stack, axis=0)
+        return np.nanmean(stack, axis=0)
+
+
+def composite_raster(tiles: List[np.ndarray], layer_type: str, layer_config: Dict,
+                     lut: Optional[Dict] = None) -> np.ndarray:
+    """Composite tiles over time one date at a time, same result as reduce_stack without the (T, H, W) stack"""
+    reducer = COMPOSITE_REDUCERS.get(layer_type, "mean")
+    composite = None
+    count = None
+    for tile in tiles:
+        values = to_physical(tile, layer_type, layer_config, lut)
+        if reducer == "max":
+            # fmax keeps the valid value where one side is NaN
+            composite = values if composite is None else np.fmax(composite, values)
+            continue
+        valid = ~np.isnan(values)
+        if composite is None:
+            composite = np.zeros(values.shape)
+            count = np.zeros(values.shape, dtype=np.int32)
+        composite += np.where(valid, values, 0.0)
+        count += valid
+
+    if reducer != "max":
+        with np.errstate(invalid="ignore"):  # 0 / 0 leaves NaN where no date has data
+            composite = composite / count
+    return composite
+
+
+def composite_statistics(tiles: List[np.ndarray], layer_type: str, layer_config: Dict,
+                         lut: Optional[Dict] = None, mask: Optional[np.ndarray] = None) -> Dict:
+    """Composite over time and summarize inside the mask"""
+    return zonal_summary(composite_raster(tiles, layer_type, layer_config, lut), mask)
+
+
+async def fetch_window_tiles(fetch_tile: Callable[[str], Awaitable[Optional[np.ndarray]]], layer_type: str,
+                             start_date, end_date) -> Tuple[List[str], List[np.ndarray]]:
+    """Fetch every product date in the window concurrently; returns the dates and tiles that arrived"""
+    dates = composite_dates(layer_type, start_date, end_date)
+    tiles = await gather_bounded([fetch_tile(day) for day in dates])
+    available = [(day, tile) for day, tile in zip(dates, tiles) if tile is not None]
+    return [day for day, _ in available], [tile for _, tile in available]
+
+
+async def fetch_composite(fetch_tile: Callable[[str], Awaitable[Optional[np.ndarray]]], layer_type: str,
+                          layer_config: Dict, start_date, end_date, mask: Optional[np.ndarray] = None) -> Dict:
+    """Fetch all dates in the window concurrently and composite the tiles that arrived"""
+    reducer = COMPOSITE_REDUCERS.get(layer_type, "mean")
+    dates, tiles = await fetch_window_tiles(fetch_tile, layer_type, start_date, end_date)
+
+    if not tiles:
+        return {"success": False, "stats": dict(EMPTY_STATS), "dates": [], "reducer": reducer}
+
+    lut = await colormap_registry.get(layer_config["layer_name"])
+    stats = await raster_executor.run(composite_statistics, tiles, layer_type, layer_config, lut, mask)
+    return {
+        "success": stats["count"] > 0,
+        "stats": stats,
+        "dates": dates,
+        "reducer": reducer
+    }
@@ -0,0 +1,355 @@
+"""
+Two-tier cache for climate and satellite data
+Bounded in-process LRU with per-entry TTL in front of a shared Redis tier
+"""
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+from .serialization import CachedPayload, dumps, loads
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis client is optional, fall back to in-process only
+    aioredis = None
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "3600"))
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "uzima:")
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "1800"))
+
+
+class LRUCache:
+    """Bounded in-process LRU cache with per-entry TTL and an optional stale window"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_entry(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Return (value, is_fresh); stale values are returned until their stale window ends"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+
+        value, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if stale_until <= now:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None, False
+
+        self._entries.move_to_end(key)
+        if fresh_until <= now:
+            self.stale_hits += 1
+            return value, False
+
+        self.hits += 1
+        return value, True
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh value and mark it as recently used"""
+        value, fresh = self.get_entry(key)
+        return value if fresh else None
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0):
+        """Store a value, evicting the least recently used entries when full"""
+        fresh_until = time.monotonic() + ttl
+        self._entries[key] = (value, fresh_until, fresh_until + stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """In-process LRU tier backed by an optional shared Redis tier"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl: int = CACHE_DEFAULT_TTL,
+                 key_prefix: str = CACHE_KEY_PREFIX):
+        self.local = LRUCache(max_entries)
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+        self.redis = None
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+
+    async def connect(self, redis_url: Optional[str] = REDIS_URL) -> bool:
+        """Connect the shared tier, staying in-process only if Redis is unavailable"""
+        if not redis_url or aioredis is None:
+            return False
+
+        try:
+            client = aioredis.from_url(redis_url)
+            await client.ping()
+            self.redis = client
+            return True
+        except Exception as e:
+            print(f"Redis cache unavailable, using in-process cache only: {e}")
+            self.redis = None
+            return False
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self.redis is not None:
+            try:
+                await self.redis.close()
+            finally:
+                self.redis = None
+
+    async def get_entry(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Look up a key in the local tier, then the shared tier; returns (value, is_fresh)"""
+        value, fresh = self.local.get_entry(key)
+        # A stale local entry may already have been refreshed by another worker
+        if fresh or self.redis is None:
+            return value, fresh
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(self.key_prefix + key)
+                pipe.pttl(self.key_prefix + key)
+                raw, remaining_ms = await pipe.execute()
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Redis cache read error: {e}")
+            return value, False
+
+        if raw is None:
+            self.redis_misses += 1
+            return value, False
+
+        self.redis_hits += 1
+        envelope = loads(raw)
+        value = envelope["value"]
+        if isinstance(value, dict):
+            value = CachedPayload(value)
+            value.created_at = envelope.get("created_at", value.created_at)
+
+        # Promote to the local tier for the remainder of the shared TTL
+        remaining = remaining_ms / 1000.0 if remaining_ms and remaining_ms > 0 else self.default_ttl
+        fresh_for = max(0.0, min(remaining, envelope["fresh_until"] - time.time()))
+        self.local.set(key, value, fresh_for, remaining - fresh_for)
+        return value, fresh_for > 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a fresh value from either tier"""
+        value, fresh = await self.get_entry(key)
+        return value if fresh else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0) -> Any:
+        """Write a value through both tiers and return it; dicts are stored as self-encoding CachedPayloads"""
+        if ttl is None:
+            ttl = self.default_ttl
+        if isinstance(value, dict) and not isinstance(value, CachedPayload):
+            value = CachedPayload(value)
+        # A zero lifetime means "do not cache"
+        if ttl + stale_ttl <= 0:
+            return value
+        self.local.set(key, value, ttl, stale_ttl)
+
+        if self.redis is None:
+            return value
+
+        try:
+            body = value.body if isinstance(value, CachedPayload) else dumps(value)
+            created_at = value.created_at if isinstance(value, CachedPayload) else time.time()
+            payload = (b'{"fresh_until":' + dumps(time.time() + ttl) + b',"created_at":' + dumps(created_at)
+                       + b',"value":' + body + b'}')
+            await self.redis.set(self.key_prefix + key, payload, ex=int(ttl + stale_ttl))
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Redis cache write error: {e}")
+        return value
+
+    async def delete(self, key: str):
+        """Remove a key from both tiers"""
+        self.local.delete(key)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self.key_prefix + key)
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"Redis cache delete error: {e}")
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[bool]:
+        """Claim a key across processes with Redis SET NX EX; None when Redis is unavailable"""
+        if self.redis is None:
+            return None
+        try:
+            return bool(await self.redis.set(self.key_prefix + key, b"1", nx=True, ex=int(ttl)))
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Redis lock error: {e}")
+            return None
+
+    async def release_lock(self, key: str):
+        """Drop a lock taken with acquire_lock so another process can claim it"""
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self.key_prefix + key)
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Redis lock error: {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters for both tiers"""
+        return {
+            "backend": "redis+memory" if self.redis is not None else "memory",
+            "local": {
+                "entries": len(self.local),
+                "max_entries": self.local.max_entries,
+                "hits": self.local.hits,
+                "stale_hits": self.local.stale_hits,
+                "misses": self.local.misses,
+                "evictions": self.local.evictions,
+                "expirations": self.local.expirations
+            },
+            "redis": {
+                "connected": self.redis is not None,
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors
+            }
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent cache misses so each key is computed by one task at a time"""
+
+    def __init__(self, cache: TwoTierCache, stale_ttl: int = CACHE_STALE_TTL):
+        self.cache = cache
+        self.stale_ttl = stale_ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.computations = 0
+        self.coalesced = 0
+        self.background_refreshes = 0
+        self.refresh_errors = 0
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             ttl: Optional[int] = None, stale_ttl: Optional[int] = None) -> Any:
+        """Return the cached value, serving stale values while one background task refreshes them"""
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        value, fresh = await self.cache.get_entry(key)
+        if value is not None:
+            if not fresh and key not in self._inflight:
+                self.background_refreshes += 1
+                task = self._start(key, compute, ttl, stale_ttl)
+                task.add_done_callback(self._log_refresh_failure)
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, compute, ttl, stale_ttl)
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled request does not cancel the computation other callers wait on
+        return await asyncio.shield(task)
+
+    def _start(self, key: str, compute: Callable[[], Awaitable[Any]],
+               ttl: Optional[int], stale_ttl: int) -> asyncio.Task:
+        self.computations += 1
+        task = asyncio.ensure_future(self._compute_and_store(key, compute, ttl, stale_ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]],
+                                 ttl: Optional[int], stale_ttl: int) -> Any:
+        value = await compute()
+        return await self.cache.set(key, value, ttl, stale_ttl)
+
+    def _log_refresh_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_errors += 1
+            print(f"Background cache refresh failed: {task.exception()}")
+
+    def stats(self) -> Dict:
+        return {
+            "inflight": len(self._inflight),
+            "computations": self.computations,
+            "coalesced": self.coalesced,
+            "background_refreshes": self.background_refreshes,
+            "refresh_errors": self.refresh_errors
+        }
+
+
+# Global cache instances
+cache = TwoTierCache()
+single_flight = SingleFlight(cache)
+
+
+async def init_cache() -> bool:
+    """Initialize the cache, connecting Redis when REDIS_URL is configured"""
+    return await cache.connect(REDIS_URL)
+
+
+async def close_cache():
+    """Release cache connections on shutdown"""
+    await cache.close()
+
+
+async def get_cache(key: str) -> Optional[Any]:
+    """Get a cached value or None"""
+    return await cache.get(key)
+
+
+async def set_cache(key: str, value: Any, ttl: Optional[int] = None, expire: Optional[int] = None,
+                    stale_ttl: int = 0) -> Any:
+    """Cache a value and return it as stored; accepts both ttl= and the legacy expire= keyword (seconds)"""
+    return await cache.set(key, value, ttl if ttl is not None else expire, stale_ttl)
+
+
+async def get_or_compute(key: str, compute: Callable[[], Awaitable[Any]],
+                         ttl: Optional[int] = None, stale_ttl: Optional[int] = None) -> Any:
+    """Get a cached value, computing it once for all concurrent callers on a miss.
+
+    Expired values stay servable for stale_ttl seconds while a single background
+    task recomputes them. Exceptions raised by compute are not cached.
+    """
+    return await single_flight.get_or_compute(key, compute, ttl, stale_ttl)
+
+
+async def delete_cache(key: str):
+    """Invalidate a cached value"""
+    await cache.delete(key)
+
+
+async def acquire_lock(key: str, ttl: int) -> Optional[bool]:
+    """Claim a cross-process lock for ttl seconds: True if claimed, False if held elsewhere, None without Redis"""
+    return await cache.acquire_lock(key, ttl)
+
+
+async def release_lock(key: str):
+    """Release a lock claimed with acquire_lock"""
+    await cache.release_lock(key)
+
+
+def get_cache_stats() -> Dict:
+    """Get cache hit/miss/eviction counters"""
+    stats = cache.stats()
+    stats["single_flight"] = single_flight.stats()
+    return stats
@@ -0,0 +1,22 @@
+"""
+Concurrency helpers for fan-out over counties
+Bounded asyncio.gather so upstream I/O is throttled without serializing work
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Iterable, List, Optional
+
+# Default number of concurrent upstream calls per fan-out
+DEFAULT_CONCURRENCY = int(os.getenv("CLIMATE_MAX_CONCURRENCY", "10"))
+
+
+async def gather_bounded(aws: Iterable[Awaitable[Any]], limit: Optional[int] = None,
+                         return_exceptions: bool = False) -> List[Any]:
+    """Like asyncio.gather, but with at most `limit` awaitables running at once"""
+    semaphore = asyncio.Semaphore(limit or DEFAULT_CONCURRENCY)
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=return_exceptions)
@@ -0,0 +1,54 @@
+"""
+Shared HTTP connection pool for upstream data services
+One aiohttp session per process, created and closed with the FastAPI lifespan
+"""
+import os
+import aiohttp
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "16"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "600"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """Create a pooled HTTP/1.1 keep-alive session with DNS caching"""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        use_dns_cache=True,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True
+    )
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT, sock_connect=HTTP_CONNECT_TIMEOUT)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        version=aiohttp.HttpVersion11,
+        headers={"Connection": "keep-alive", "User-Agent": "UzimaSmart/1.0"}
+    )
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared session, creating it on first use outside the app lifespan"""
+    global _session
+    if _session is None or _session.closed:
+        _session = create_http_session()
+    return _session
+
+
+async def close_http_session():
+    """Close the shared session and its connection pool"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -0,0 +1,143 @@
+"""
+HTTP caching for API responses
+Pre-encoded static payloads with strong ETags, and TTL-aligned validators with conditional GET
+"""
+import re
+import time
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+from .cache import CACHE_STALE_TTL
+from .serialization import dumps
+
+# Static metadata only changes on deploy; clients revalidate daily
+STATIC_CACHE_CONTROL = "public, max-age=86400"
+
+# Headers describing the body, which a 304 has none of (RFC 9110 section 15.4.5)
+BODY_HEADERS = (b"content-length", b"content-type", b"content-encoding", b"transfer-encoding")
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of a response body (same form as CachedPayload.etag)"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the ETag (weak comparison, as RFC 9110 requires for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+class StaticPayload:
+    """A JSON payload encoded once, with its ETag"""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, content: Any):
+        self.body = dumps(content)
+        self.etag = make_etag(self.body)
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
+
+
+def static_response(request: Request, payload: StaticPayload,
+                    cache_control: str = STATIC_CACHE_CONTROL) -> Response:
+    """Serve a pre-encoded payload, or 304 if the client's copy is current"""
+    headers = {"ETag": payload.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return not_modified(payload.etag, {"Cache-Control": cache_control})
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+def _http_date_timestamp(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPCacheMiddleware:
+    """ETag, Last-Modified and TTL-aligned Cache-Control on matching GET responses, with 304 for current copies"""
+
+    def __init__(self, app, rules: Dict[str, int]):
+        self.app = app
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in rules.items()]
+        self.not_modified = 0
+
+    def _ttl(self, path: str) -> Optional[int]:
+        return next((ttl for pattern, ttl in self.rules if pattern.search(path)), None)
+
+    async def __call__(self, scope, receive, send):
+        ttl = self._ttl(scope["path"]) if scope["type"] == "http" and scope["method"] in ("GET", "HEAD") else None
+        if ttl is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start: Dict = {}
+        chunks: List[bytes] = []
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._respond(start, b"".join(chunks), ttl, request_headers, send)
+
+        await self.app(scope, receive, send_with_validators)
+
+    async def _respond(self, start: Dict, body: bytes, ttl: int, request_headers: Headers, send):
+        headers = MutableHeaders(raw=list(start["headers"]))
+        modified_at = _http_date_timestamp(headers.get("last-modified"))
+
+        # Only responses built from a cache entry (which sets Last-Modified) are cacheable; errors are not
+        if start["status"] != 200 or modified_at is None:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = headers.get("etag") or make_etag(body)
+        now = time.time()
+
+        # Clients may reuse the response only for what is left of the server-side TTL
+        max_age = max(0, int(ttl - (now - modified_at)))
+        validators = {
+            "ETag": etag,
+            "Last-Modified": formatdate(modified_at, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={CACHE_STALE_TTL}"
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if_modified_since = _http_date_timestamp(request_headers.get("if-modified-since"))
+        if etag_matches(if_none_match, etag) or (
+            if_none_match is None and if_modified_since is not None and int(modified_at) <= if_modified_since
+        ):
+            self.not_modified += 1
+            # Keep Vary, CORS and other response headers; only the body headers go
+            not_modified_headers = MutableHeaders(raw=[
+                (name, value) for name, value in start["headers"] if name.lower() not in BODY_HEADERS
+            ])
+            for name, value in validators.items():
+                not_modified_headers[name] = value
+            await send({"type": "http.response.start", "status": 304, "headers": not_modified_headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        for name, value in validators.items():
+            headers[name] = value
+        start["headers"] = headers.raw
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,131 @@
+"""
+Raster processing executor
+Runs PNG decoding, raster statistics and tile file I/O off the event loop with queue and latency metrics
+"""
+import os
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "thread" suits PIL/NumPy, which release the GIL; "process" isolates CPU-heavy work
+RASTER_EXECUTOR = os.getenv("RASTER_EXECUTOR", "thread")
+RASTER_WORKERS = int(os.getenv("RASTER_WORKERS", str(min(4, os.cpu_count() or 1))))
+LATENCY_WINDOW = 512
+
+
+def _timed_call(fn: Callable, args: tuple):
+    """Run fn in the worker and report when it started and finished"""
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class PoolMetrics:
+    """Queue and latency counters of one worker pool"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pending = 0
+        self.completed = 0
+        self.errors = 0
+        self.wait_ms = deque(maxlen=LATENCY_WINDOW)
+        self.run_ms = deque(maxlen=LATENCY_WINDOW)
+
+    @staticmethod
+    def _summarize(samples: deque) -> Dict:
+        if not samples:
+            return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+        values = np.fromiter(samples, dtype=np.float64)
+        return {
+            "mean": round(float(values.mean()), 3),
+            "p95": round(float(np.percentile(values, 95)), 3),
+            "max": round(float(values.max()), 3)
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queue_depth": max(0, self.pending - self.workers),
+            "completed": self.completed,
+            "errors": self.errors,
+            "queue_wait_ms": self._summarize(self.wait_ms),
+            "run_time_ms": self._summarize(self.run_ms)
+        }
+
+
+class RasterExecutor:
+    """Bounded worker pools for decode, validation and statistics, plus tile file I/O"""
+
+    def __init__(self, kind: str = RASTER_EXECUTOR, workers: int = RASTER_WORKERS):
+        self.kind = kind if kind in ("thread", "process") else "thread"
+        self.workers = max(1, workers)
+        self._pool: Optional[Executor] = None
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        # Compute and I/O jobs queue on different pools, so they are measured apart
+        self.compute = PoolMetrics(self.workers)
+        self.io = PoolMetrics(self.workers)
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="raster")
+        return self._pool
+
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="raster-io")
+        return self._io_pool
+
+    async def run(self, fn: Callable, *args):
+        """Run a module-level function in the pool and await its result"""
+        return await self._submit(self._get_pool(), self.compute, fn, args)
+
+    async def run_io(self, fn: Callable, *args):
+        """Run blocking file I/O on a thread, even with a process pool, so it shares this process's state"""
+        return await self._submit(self._get_io_pool(), self.io, fn, args)
+
+    async def _submit(self, pool: Executor, metrics: PoolMetrics, fn: Callable, args: tuple):
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        metrics.pending += 1
+        try:
+            result, started, finished = await loop.run_in_executor(pool, _timed_call, fn, args)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.pending -= 1
+
+        metrics.completed += 1
+        metrics.wait_ms.append((started - submitted) * 1000)
+        metrics.run_ms.append((finished - started) * 1000)
+        return result
+
+    def shutdown(self):
+        """Stop the worker pools; they are recreated on the next submission"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
+            self._io_pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "executor": self.kind,
+            "compute": self.compute.stats(),
+            "io": self.io.stats()
+        }
+
+
+# Global raster executor instance
+raster_executor = RasterExecutor()
@@ -0,0 +1,82 @@
+"""
+Fast JSON serialization for API responses and the cache
+orjson with native NumPy support, and cached payloads that keep their encoded bytes
+"""
+import json
+import time
+import hashlib
+from email.utils import formatdate
+from typing import Any, Optional
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library encoder
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _json_default(obj: Any):
+    """Serialize NumPy scalars/arrays and datetimes that the encoder does not handle natively"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON; NaN and infinity become null under orjson"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default, option=ORJSON_OPTIONS)
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CachedPayload(dict):
+    """A cached result that encodes itself once; later responses reuse the bytes and ETag"""
+
+    __slots__ = ("_body", "_etag", "created_at")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self.created_at = time.time()
+
+    @property
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = dumps(self)
+        return self._body
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag of the encoded payload"""
+        if self._etag is None:
+            self._etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        return self._etag
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.created_at, usegmt=True)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; cached payloads are written as-is with their validators"""
+
+    def __init__(self, content: Any, status_code: int = 200, headers: Optional[dict] = None, **kwargs):
+        if isinstance(content, CachedPayload):
+            headers = {"ETag": content.etag, "Last-Modified": content.last_modified, **(headers or {})}
+        super().__init__(content, status_code=status_code, headers=headers, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, CachedPayload):
+            return content.body
+        return dumps(content)
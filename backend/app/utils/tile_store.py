@@ -0,0 +1,171 @@
+"""
+Persistent on-disk raster tile store for NASA GIBS imagery
+Content-addressed, memory-mapped .npy tiles with size-based LRU eviction
+"""
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TILE_STORE_DIR = os.getenv("TILE_STORE_DIR", os.path.join(tempfile.gettempdir(), "uzimasmart_tiles"))
+# Budget for the whole directory, shared by every worker process that writes to it
+TILE_STORE_MAX_MB = int(os.getenv("TILE_STORE_MAX_MB", "512"))
+# Rescan the directory after writing this fraction of the budget, to see other workers' tiles
+TILE_STORE_RESCAN_FRACTION = 8
+# Part of every tile key, so a change in the decoded layout never reads stale tiles
+TILE_FORMAT = "rgba8"
+# Days after a product period ends during which GIBS may still publish or replace its imagery
+TILE_PUBLICATION_MARGIN_DAYS = int(os.getenv("TILE_PUBLICATION_MARGIN_DAYS", "3"))
+
+
+class TileStore:
+    """On-disk store of decoded RGBA uint8 tiles keyed by (layer, bbox, date, size)"""
+
+    def __init__(self, root: str = TILE_STORE_DIR, max_bytes: int = TILE_STORE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._written_since_scan = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def tile_key(layer: str, bbox: Sequence[float], date: str, size: Sequence[int]) -> str:
+        """Content address of a tile request"""
+        canonical = "|".join([
+            TILE_FORMAT,
+            layer,
+            ",".join(f"{float(v):.6f}" for v in bbox),
+            date,
+            "x".join(str(int(v)) for v in size)
+        ])
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_immutable(date: str, period_days: int = 1) -> bool:
+        """Whether the product period starting on date ended more than the publication margin ago (UTC)"""
+        try:
+            start = datetime.strptime(date[:10], "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return False
+        # Multi-day MODIS periods are cut short at the end of the year
+        end = min(start + timedelta(days=period_days), datetime(start.year + 1, 1, 1))
+        return (end + timedelta(days=TILE_PUBLICATION_MARGIN_DAYS)).date() <= datetime.utcnow().date()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.npy")
+
+    def _load_index(self):
+        """Rebuild the LRU index from disk, oldest access first"""
+        if self._loaded:
+            return
+        entries = []
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.endswith(".npy"):
+                        try:
+                            stat = os.stat(os.path.join(dirpath, filename))
+                        except OSError:  # Evicted by another worker
+                            continue
+                        entries.append((stat.st_mtime, filename[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._loaded = True
+
+    def _rescan(self):
+        """Rebuild the index from disk, picking up tiles other workers wrote or evicted"""
+        self._index.clear()
+        self._total_bytes = 0
+        self._written_since_scan = 0
+        self._loaded = False
+        self._load_index()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Memory-map a stored tile, or None on a miss (blocking; call through raster_executor.run_io)"""
+        path = self._path(key)
+        try:
+            tile = np.load(path, mmap_mode="r")
+            os.utime(path)  # Record the access for LRU eviction across restarts
+        except (FileNotFoundError, ValueError, OSError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._load_index()
+            if key in self._index:
+                self._index.move_to_end(key)
+            self.hits += 1
+        return tile
+
+    def put(self, key: str, tile: np.ndarray):
+        """Store a decoded tile atomically and evict least recently used tiles over budget (blocking)"""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                np.save(handle, np.ascontiguousarray(tile, dtype=np.uint8))
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            # An unwritable store only costs the cache, never the request
+            print(f"Tile store write error: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        with self._lock:
+            self._load_index()
+            self._total_bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self.writes += 1
+            self._written_since_scan += size
+            # Other workers share the directory, so check the budget against what is on disk
+            if (self._total_bytes > self.max_bytes
+                    or self._written_since_scan > self.max_bytes // TILE_STORE_RESCAN_FRACTION):
+                self._rescan()
+                self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._load_index()
+            return {
+                "root": self.root,
+                "tiles": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions
+            }
+
+
+# Global tile store instance
+tile_store = TileStore()
@@ -0,0 +1,191 @@
+"""
+Resilient upstream client for NASA GIBS
+Token-bucket rate limiting, retries with full-jitter backoff and per-layer circuit breakers
+"""
+import os
+import time
+import random
+import asyncio
+import aiohttp
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+from .http import get_http_session
+
+load_dotenv()
+
+UPSTREAM_RATE_PER_SEC = float(os.getenv("UPSTREAM_RATE_PER_SEC", "20"))
+UPSTREAM_BURST = int(os.getenv("UPSTREAM_BURST", "40"))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+UPSTREAM_BACKOFF_CAP = float(os.getenv("UPSTREAM_BACKOFF_CAP", "8"))
+# Per-attempt timeout, so one slow response cannot hold a worker for the whole session timeout
+UPSTREAM_ATTEMPT_TIMEOUT = float(os.getenv("UPSTREAM_ATTEMPT_TIMEOUT", "10"))
+# Overall budget for one fetch including retries and backoff, so a slow upstream fails fast
+UPSTREAM_TOTAL_TIMEOUT = float(os.getenv("UPSTREAM_TOTAL_TIMEOUT", "20"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "60"))
+# Cache lifetime of results served from synthetic fallbacks, so real data replaces them quickly
+SYNTHETIC_CACHE_TTL = int(os.getenv("SYNTHETIC_CACHE_TTL", "300"))
+
+# Statuses worth retrying: throttling and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class UpstreamError(Exception):
+    """Upstream request failed after all retries"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(UpstreamError):
+    """Request rejected without a network call because the circuit is open"""
+
+
+class TokenBucket:
+    """Async token bucket limiting the upstream request rate"""
+
+    def __init__(self, rate: float = UPSTREAM_RATE_PER_SEC, capacity: int = UPSTREAM_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self.waits += 1
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial after a cool-down"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go upstream; half-open lets a single trial through"""
+        state = self.state
+        if state == "closed":
+            return True
+        # A trial that never reported back (e.g. cancelled) is replaced after another cool-down
+        now = time.monotonic()
+        if state == "half_open" and (self._trial_started is None or now - self._trial_started >= self.reset_timeout):
+            self._trial_started = now
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    """Rate-limited, retrying GET client with one circuit breaker per upstream key"""
+
+    def __init__(self):
+        self.bucket = TokenBucket()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker()
+        return self.breakers[key]
+
+    async def fetch(self, key: str, url: str, params: Optional[Dict] = None,
+                    session: Optional[aiohttp.ClientSession] = None) -> bytes:
+        """GET url and return the body, retrying transient failures with full-jitter backoff"""
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {key}")
+
+        if session is None or session.closed:
+            session = await get_http_session()
+        deadline = time.monotonic() + UPSTREAM_TOTAL_TIMEOUT
+
+        error: UpstreamError = UpstreamError(f"No attempt made for {key}")
+        for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+            if attempt:
+                delay = random.uniform(0, min(UPSTREAM_BACKOFF_CAP, UPSTREAM_BACKOFF_BASE * 2 ** (attempt - 1)))
+                if time.monotonic() + delay >= deadline:
+                    break
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+            await self.bucket.acquire()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Each attempt gets the per-attempt timeout, cut short by what is left of the budget
+            timeout = aiohttp.ClientTimeout(total=min(UPSTREAM_ATTEMPT_TIMEOUT, remaining))
+            self.requests += 1
+            try:
+                async with session.get(url, params=params, timeout=timeout) as response:
+                    if response.status == 200:
+                        body = await response.read()
+                        breaker.record_success()
+                        return body
+                    error = UpstreamError(f"HTTP error {response.status}", response.status)
+                    if response.status not in RETRYABLE_STATUSES:
+                        # The upstream is healthy; the request itself is wrong (e.g. no imagery for a date)
+                        breaker.record_success()
+                        raise error
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = UpstreamError(f"Request failed: {type(e).__name__} {e}".strip())
+
+        self.failures += 1
+        breaker.record_failure()
+        raise error
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "rate_limited_waits": self.bucket.waits,
+            "breakers": {
+                key: {"state": breaker.state, "failures": breaker.failures}
+                for key, breaker in self.breakers.items()
+            }
+        }
+
+
+# Global upstream client instance
+upstream_client = UpstreamClient()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Download Kenya county boundaries into app/data/kenya_counties.geojson
+The committed file comes from the echarts-countries-pypkg Kenya map (MIT, default); --source geoboundaries
+uses the higher-resolution geoBoundaries gbOpen KEN ADM1 release (CC BY 4.0) instead
+"""
+import sys
+import os
+import io
+import json
+import tarfile
+import argparse
+import urllib.request
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.data.kenya_counties import KENYA_COUNTIES
+from app.data.county_geometry import match_county_name
+
+GEOBOUNDARIES_API = "https://www.geoboundaries.org/api/current/gbOpen/KEN/ADM1/"
+ECHARTS_PACKAGE_API = "https://pypi.org/pypi/echarts-countries-pypkg/json"
+ECHARTS_KENYA_MAP = "echarts_countries_pypkg/resources/echarts-countries-js/Kenya.js"
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "data", "kenya_counties.geojson")
+
+# ~1 m precision is far below the finest raster grid used for masks
+COORDINATE_DECIMALS = 5
+
+
+def fetch_json(url: str):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return json.load(response)
+
+
+def fetch_bytes(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def round_coordinates(coordinates):
+    if isinstance(coordinates[0], (int, float)):
+        return [round(value, COORDINATE_DECIMALS) for value in coordinates]
+    return [round_coordinates(part) for part in coordinates]
+
+
+def geoboundaries_features():
+    """(name, geometry) pairs and attribution from the geoBoundaries simplified release"""
+    release = fetch_json(GEOBOUNDARIES_API)
+    source = fetch_json(release["simplifiedGeometryGeoJSON"])
+    features = [(feature["properties"]["shapeName"], feature["geometry"]) for feature in source["features"]]
+    attribution = {
+        "source": f"geoBoundaries gbOpen KEN ADM1 ({release.get('boundarySource', 'geoBoundaries')})",
+        "license": release.get("boundaryLicense", "CC BY 4.0")
+    }
+    return features, attribution
+
+
+def decode_echarts_ring(encoded: str, offset, scale: int = 1024):
+    """Decode one ECharts UTF-8 encoded ring (zigzag deltas in 1/1024 degree steps)"""
+    x, y = offset
+    ring = []
+    for i in range(0, len(encoded), 2):
+        dx, dy = ord(encoded[i]) - 64, ord(encoded[i + 1]) - 64
+        x += (dx >> 1) ^ -(dx & 1)
+        y += (dy >> 1) ^ -(dy & 1)
+        ring.append([x / scale, y / scale])
+    return ring
+
+
+def echarts_features():
+    """(name, geometry) pairs and attribution from the Kenya map in echarts-countries-pypkg"""
+    release = fetch_json(ECHARTS_PACKAGE_API)
+    sdist = next(url for url in release["urls"] if url["packagetype"] == "sdist")
+    with tarfile.open(fileobj=io.BytesIO(fetch_bytes(sdist["url"]))) as archive:
+        member = next(name for name in archive.getnames() if name.endswith(ECHARTS_KENYA_MAP))
+        script = archive.extractfile(member).read().decode("utf-8")
+
+    start = script.index('{"type":"FeatureCollection"')
+    collection, _ = json.JSONDecoder().raw_decode(script[start:])
+    features = []
+    for feature in collection["features"]:
+        geometry = feature["geometry"]
+        if geometry["type"] == "Polygon":
+            coordinates = [
+                decode_echarts_ring(ring, offset)
+                for ring, offset in zip(geometry["coordinates"], geometry["encodeOffsets"])
+            ]
+        else:
+            coordinates = [
+                [decode_echarts_ring(ring, offset) for ring, offset in zip(polygon, offsets)]
+                for polygon, offsets in zip(geometry["coordinates"], geometry["encodeOffsets"])
+            ]
+        features.append((feature["properties"]["name"], {"type": geometry["type"], "coordinates": coordinates}))
+    attribution = {
+        "source": f"echarts-countries-pypkg {release['info']['version']} Kenya map ({release['info']['home_page']})",
+        "license": release["info"]["license"] or "MIT"
+    }
+    return features, attribution
+
+
+SOURCES = {"geoboundaries": geoboundaries_features, "echarts": echarts_features}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", choices=sorted(SOURCES), default="echarts")
+    args = parser.parse_args()
+
+    source_features, attribution = SOURCES[args.source]()
+    features = []
+    for source_name, geometry in source_features:
+        county_id = match_county_name(source_name)
+        if county_id is None:
+            print(f"Skipping unmatched boundary {source_name}")
+            continue
+        features.append({
+            "type": "Feature",
+            "properties": {"shapeName": KENYA_COUNTIES[county_id]["name"]},
+            "geometry": {"type": geometry["type"], "coordinates": round_coordinates(geometry["coordinates"])}
+        })
+
+    found = {feature["properties"]["shapeName"] for feature in features}
+    missing = [county["name"] for county in KENYA_COUNTIES.values() if county["name"] not in found]
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as handle:
+        json.dump({"type": "FeatureCollection", **attribution, "features": features}, handle, separators=(",", ":"))
+
+    print(f"Wrote {len(features)} county boundaries from {attribution['source']} to {OUTPUT_PATH}")
+    if missing:
+        print(f"Missing counties (bounding boxes will be used): {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
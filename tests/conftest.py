@@ -0,0 +1,65 @@
+"""
+Shared pytest setup
+Makes the backend `app` package importable when running pytest from the repository root,
+and provides an in-memory Redis stand-in
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio calls the cache makes; fail=True makes every call raise"""
+
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    async def set(self, key, value, ex=None, nx=False):
+        self._call()
+        if nx and key in self.values:
+            return None
+        self.values[key] = (value, ex)
+        return True
+
+    async def delete(self, key):
+        self._call()
+        return 1 if self.values.pop(key, None) is not None else 0
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.commands.append(lambda: self.redis.values.get(key, (None, None))[0])
+
+    def pttl(self, key):
+        self.commands.append(lambda: (self.redis.values.get(key, (None, -2))[1] or 0) * 1000)
+
+    async def execute(self):
+        self.redis._call()
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
@@ -0,0 +1,199 @@
+"""
+Tests for the two-tier cache and single-flight computation
+Covers coalesced misses, stale-while-revalidate refreshes and error handling
+"""
+import asyncio
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import LRUCache, SingleFlight, TwoTierCache
+from app.utils.serialization import CachedPayload
+
+
+def make_single_flight(stale_ttl: int = 60) -> SingleFlight:
+    return SingleFlight(TwoTierCache(max_entries=16, default_ttl=60), stale_ttl=stale_ttl)
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.get("a")
+    lru.set("c", 3, ttl=60)
+
+    assert lru.get("a") == 1
+    assert lru.get("b") is None
+    assert lru.evictions == 1
+
+
+def test_lru_set_refreshes_recency_and_bounds_size():
+    lru = LRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.set("a", 10, ttl=60)
+    lru.set("c", 3, ttl=60)
+
+    assert len(lru) == 2
+    assert lru.get("a") == 10
+    assert lru.get("b") is None
+    assert lru.get("c") == 3
+
+
+def test_lru_entries_go_stale_then_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    lru = LRUCache(max_entries=4)
+    lru.set("key", 1, ttl=10, stale_ttl=5)
+
+    now[0] += 9
+    assert lru.get_entry("key") == (1, True)
+    now[0] += 2
+    assert lru.get_entry("key") == (1, False)
+    assert lru.get("key") is None
+    now[0] += 5
+    assert lru.get_entry("key") == (None, False)
+    assert (lru.hits, lru.stale_hits, lru.expirations) == (1, 2, 1)
+    assert len(lru) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    single_flight = make_single_flight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"value": 42}
+
+    waiters = [asyncio.ensure_future(single_flight.get_or_compute("key", compute)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert all(result == {"value": 42} for result in results)
+    assert single_flight.coalesced == 9
+    assert await single_flight.get_or_compute("key", compute) == {"value": 42}
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_one_refresh_runs():
+    single_flight = make_single_flight()
+    # Zero freshness keeps the entry only for its stale window
+    await single_flight.cache.set("key", {"version": 1}, ttl=0, stale_ttl=60)
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"version": 2}
+
+    results = [await single_flight.get_or_compute("key", compute, ttl=60) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert results == [{"version": 1}] * 5
+    assert calls == 1
+    assert single_flight.background_refreshes == 1
+
+    release.set()
+    await asyncio.gather(*single_flight._inflight.values())
+    assert await single_flight.get_or_compute("key", compute, ttl=60) == {"version": 2}
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_not_cached():
+    single_flight = make_single_flight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("upstream down")
+        return {"value": "ok"}
+
+    waiters = [asyncio.ensure_future(single_flight.get_or_compute("key", compute)) for _ in range(3)]
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await single_flight.cache.get("key") is None
+
+    assert await single_flight.get_or_compute("key", compute) == {"value": "ok"}
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_is_not_cached():
+    cache = TwoTierCache(max_entries=16, default_ttl=60)
+    await cache.set("key", {"value": 1}, ttl=0)
+    assert await cache.get("key") is None
+    assert len(cache.local) == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_local_entry_defers_to_fresh_shared_entry(fake_redis):
+    redis = fake_redis
+    worker, other_worker = TwoTierCache(max_entries=16), TwoTierCache(max_entries=16)
+    worker.redis = other_worker.redis = redis
+    await worker.set("key", {"version": 1}, ttl=0, stale_ttl=60)
+    # Another worker already refreshed the shared tier
+    await other_worker.set("key", {"version": 2}, ttl=60)
+
+    single_flight = SingleFlight(worker, stale_ttl=60)
+
+    async def compute():
+        raise AssertionError("a fresh shared entry must not be recomputed")
+
+    assert await single_flight.get_or_compute("key", compute) == {"version": 2}
+    assert single_flight.background_refreshes == 0
+    assert worker.redis_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_local_entry_is_served_when_shared_tier_misses(fake_redis):
+    worker = TwoTierCache(max_entries=16)
+    worker.local.set("key", {"version": 1}, ttl=0, stale_ttl=60)
+    worker.redis = fake_redis
+
+    assert await worker.get_entry("key") == ({"version": 1}, False)
+    assert worker.redis_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_entry_is_promoted_to_the_local_tier(fake_redis):
+    writer, reader = TwoTierCache(max_entries=16), TwoTierCache(max_entries=16)
+    writer.redis = reader.redis = fake_redis
+    await writer.set("key", {"value": 1}, ttl=60, stale_ttl=30)
+    assert fake_redis.values["uzima:key"][1] == 90
+
+    value = await reader.get("key")
+    assert value == {"value": 1}
+    assert isinstance(value, CachedPayload)
+    assert reader.redis_hits == 1
+
+    calls = fake_redis.calls
+    assert await reader.get("key") == {"value": 1}
+    assert fake_redis.calls == calls
+    assert reader.local.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fall_back_to_the_local_tier(fake_redis):
+    cache = TwoTierCache(max_entries=16)
+    cache.redis = fake_redis
+    fake_redis.fail = True
+
+    assert await cache.set("key", {"value": 1}, ttl=60) == {"value": 1}
+    assert await cache.get("key") == {"value": 1}
+    cache.local.clear()
+    assert await cache.get("key") is None
+    await cache.delete("key")
+    assert await cache.acquire_lock("lock", 60) is None
+
+    assert cache.redis_errors == 4
+    assert cache.stats()["redis"]["errors"] == 4
@@ -0,0 +1,80 @@
+"""
+Tests for the concurrent county fan-outs
+Comparison and drought assessment run counties concurrently, report failures and cache with their TTLs
+"""
+import asyncio
+import pytest
+
+from app.data.kenya_counties import KENYA_COUNTIES
+from app.services import enhanced_climate_service as service_module
+from app.services.enhanced_climate_service import (
+    DROUGHT_RISK_TTL, HISTORICAL_TTL, PREDICTIONS_TTL, EnhancedClimateService
+)
+from app.utils.cache import cache
+
+
+@pytest.fixture
+def service():
+    cache.local.clear()
+    yield EnhancedClimateService()
+    cache.local.clear()
+
+
+def tracked_predictions(service, failing=()):
+    """Replace predictions with slow fakes that record the peak number running at once"""
+    state = {"running": 0, "peak": 0}
+    predictions = service.get_county_predictions
+
+    async def fake_predictions(county_id, months_ahead=6):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.005)
+        state["running"] -= 1
+        if county_id in failing:
+            return {"error": f"County {county_id} upstream down"}
+        return await predictions(county_id, months_ahead)
+
+    service.get_county_predictions = fake_predictions
+    return state
+
+
+@pytest.mark.asyncio
+async def test_comparison_runs_counties_concurrently_and_reports_failures(service):
+    state = tracked_predictions(service, failing={3})
+    result = await service.get_climate_comparison([1, 2, 3, 4, 99], months=6)
+
+    assert sorted(result["comparison"]) == [1, 2, 4]
+    assert result["counties_compared"] == 3
+    assert set(result["failed_counties"]) == {3, 99}
+    assert state["peak"] == 4
+    assert result["comparison"][1]["name"] == "Nairobi"
+
+
+@pytest.mark.asyncio
+async def test_drought_assessment_fan_out_is_bounded(service):
+    service.max_concurrency = 5
+    state = tracked_predictions(service, failing={10})
+    result = await service.get_drought_risk_assessment(3)
+
+    assert state["peak"] == 5
+    assert result["total_counties"] == len(KENYA_COUNTIES) - 1
+    assert list(result["failed_counties"]) == [10]
+    assert sum(result["risk_summary"].values()) == len(KENYA_COUNTIES) - 1
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_with_their_ttls(service, monkeypatch):
+    ttls = {}
+    get_or_compute = service_module.get_or_compute
+
+    async def recording_get_or_compute(key, compute, ttl=None, stale_ttl=None):
+        ttls[key] = ttl
+        return await get_or_compute(key, compute, ttl=ttl, stale_ttl=stale_ttl)
+
+    monkeypatch.setattr(service_module, "get_or_compute", recording_get_or_compute)
+    await service.get_county_historical_data(1, 12)
+    await service.get_drought_risk_assessment(3)
+
+    assert ttls[service_module.historical_cache_key(1, 12)] == HISTORICAL_TTL
+    assert ttls["county_predictions_1_3"] == PREDICTIONS_TTL
+    assert ttls["drought_risk_all_counties_3"] == DROUGHT_RISK_TTL
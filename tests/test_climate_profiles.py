@@ -0,0 +1,55 @@
+"""
+Tests for the precomputed county climate profiles
+Zone mapping, elevation-corrected baselines, normals and drought thresholds
+"""
+import pytest
+
+from app.data.climate_profiles import (
+    COUNTY_BASELINES, COUNTY_DROUGHT_THRESHOLDS, COUNTY_IDS, COUNTY_ROWS, SEASONAL_PATTERNS,
+    get_base_zone, get_county_normals, get_seasonal_baseline
+)
+from app.data.kenya_counties import KENYA_COUNTIES
+
+
+@pytest.mark.parametrize("climate_zone, base_zone", [
+    ("Highland Urban", "Highland Agricultural"),
+    ("Highland Agricultural", "Highland Agricultural"),
+    ("Highland Tropical", "Highland Tropical"),
+    ("Highland Cold", "Highland Agricultural"),
+    ("Highland Semi-Arid", "Highland Agricultural"),
+    ("Coastal Tropical", "Coastal"),
+    ("Tropical Lakeside", "Tropical"),
+    ("Semi-Arid", "Semi-Arid"),
+    ("Arid", "Arid"),
+    ("Montane", "Semi-Arid"),
+])
+def test_get_base_zone(climate_zone, base_zone):
+    assert get_base_zone(climate_zone) == base_zone
+
+
+def test_index_covers_every_county():
+    assert sorted(COUNTY_IDS) == sorted(KENYA_COUNTIES)
+    assert COUNTY_BASELINES.shape == (len(KENYA_COUNTIES), 12, 4)
+    assert not COUNTY_BASELINES.flags.writeable
+
+
+def test_county_normals_apply_the_elevation_correction():
+    # Nairobi (1795 m) follows the Highland Agricultural pattern, 1.59 degC cooler than at 1000 m
+    assert get_county_normals(1, 4) == pytest.approx({
+        "ndvi_normal": 0.85,
+        "rainfall_normal": 180,
+        "temp_normal": 19 - 1.59
+    })
+    # Garissa (arid, 147 m) is warmer than its zone pattern
+    assert get_seasonal_baseline(13, 5, "temperature") == pytest.approx(36 + 1.706)
+
+
+def test_months_wrap_around_the_year():
+    assert get_seasonal_baseline(7, 13, "rainfall") == get_seasonal_baseline(7, 1, "rainfall")
+    assert get_seasonal_baseline(7, 1, "rainfall") == SEASONAL_PATTERNS["Coastal"]["rainfall"][0]
+
+
+def test_drought_thresholds_follow_the_zone():
+    assert tuple(COUNTY_DROUGHT_THRESHOLDS[COUNTY_ROWS[13]]) == (20, 0.2)  # Garissa, Arid
+    assert tuple(COUNTY_DROUGHT_THRESHOLDS[COUNTY_ROWS[4]]) == (80, 0.5)  # Nyeri, Highland
+    assert tuple(COUNTY_DROUGHT_THRESHOLDS[COUNTY_ROWS[41]]) == (50, 0.3)  # Busia, Tropical
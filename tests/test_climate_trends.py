@@ -0,0 +1,49 @@
+"""
+Tests for county climate trend analysis
+Cache misses across all counties are generated in one engine call and cached per county
+"""
+import pytest
+
+from app.data.kenya_counties import KENYA_COUNTIES
+from app.services.enhanced_climate_service import EnhancedClimateService
+from app.utils.cache import cache
+
+
+@pytest.fixture
+def service(monkeypatch):
+    cache.local.clear()
+    service = EnhancedClimateService()
+    service.engine_calls = []
+    generate = service.engine.generate
+
+    def counting_generate(county_ids, *args, **kwargs):
+        service.engine_calls.append(list(county_ids))
+        return generate(county_ids, *args, **kwargs)
+
+    monkeypatch.setattr(service.engine, "generate", counting_generate)
+    yield service
+    cache.local.clear()
+
+
+@pytest.mark.asyncio
+async def test_all_counties_are_generated_in_one_batch(service):
+    county_ids = list(KENYA_COUNTIES)
+    analysis = await service.get_climate_trends("rainfall", county_ids, months=12)
+
+    assert analysis["counties_analyzed"] == len(county_ids)
+    assert service.engine_calls == [county_ids]
+
+    # Each county's series was cached, so later lookups reuse the batch
+    await service.get_climate_trends("temperature", county_ids, months=12)
+    historical = await service.get_county_historical_data(5, 12)
+    assert len(service.engine_calls) == 1
+    assert historical["county_id"] == 5
+    assert len(historical["time_series"]["rainfall"]) == 12
+
+
+@pytest.mark.asyncio
+async def test_only_uncached_counties_are_generated(service):
+    await service.get_county_historical_data(1, 12)
+    await service.get_climate_trends("ndvi", [1, 2, 3], months=12)
+
+    assert service.engine_calls == [[1], [2, 3]]
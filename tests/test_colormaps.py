@@ -0,0 +1,56 @@
+"""
+Tests for GIBS colormap parsing
+Lookup tables built from a v1.3 colormap document and applied to RGBA pixels
+"""
+import numpy as np
+
+from app.services.colormaps import apply_colormap, parse_colormap
+
+COLORMAP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<ColorMaps>
+  <ColorMap title="Temperature" units="K">
+    <Entries>
+      <ColorMapEntry rgb="0,0,255" transparent="false" value="[270,280)"/>
+      <ColorMapEntry rgb="0,255,0" transparent="false" value="[280,290)"/>
+      <ColorMapEntry rgb="255,0,0" transparent="false" value="[290,+INF)"/>
+    </Entries>
+  </ColorMap>
+  <ColorMap title="No Data">
+    <Entries>
+      <ColorMapEntry rgb="0,0,0" transparent="true" nodata="true"/>
+    </Entries>
+  </ColorMap>
+</ColorMaps>
+"""
+
+
+def test_parse_colormap_builds_sorted_lookup():
+    lut = parse_colormap(COLORMAP_XML)
+
+    assert lut["units"] == "K"
+    assert list(lut["keys"]) == sorted(lut["keys"])
+    values = dict(zip(lut["keys"].tolist(), lut["values"].tolist()))
+    assert values[255] == 275.0
+    assert values[255 << 8] == 285.0
+    assert values[255 << 16] == 290.0
+    assert np.isnan(values[0])
+
+
+def test_parse_colormap_without_entries_returns_none():
+    assert parse_colormap("<ColorMaps><ColorMap units='K'/></ColorMaps>") is None
+
+
+def test_apply_colormap_converts_kelvin_and_masks_unknown_pixels():
+    lut = parse_colormap(COLORMAP_XML)
+    image = np.array([[
+        [0, 0, 255, 255],
+        [255, 0, 0, 255],
+        [0, 255, 0, 0],
+        [12, 34, 56, 255],
+        [0, 0, 0, 255]
+    ]], dtype=np.uint8)
+
+    values = apply_colormap(image, lut)
+
+    np.testing.assert_allclose(values[0, :2], [275.0 - 273.15, 290.0 - 273.15])
+    assert np.isnan(values[0, 2:]).all()
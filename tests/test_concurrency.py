@@ -0,0 +1,82 @@
+"""
+Tests for bounded fan-out and the all-counties overview
+gather_bounded caps concurrency and keeps order; the overview is one batch without sleeps
+"""
+import asyncio
+import time
+import pytest
+
+from app.data.kenya_counties import KENYA_COUNTIES
+from app.services import enhanced_climate_service as service_module
+from app.services.enhanced_climate_service import CURRENT_DATA_TTL, EnhancedClimateService
+from app.utils.cache import cache
+from app.utils.concurrency import gather_bounded
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_caps_concurrency_and_keeps_order():
+    running = peak = 0
+
+    async def job(i: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # Later jobs finish first, so completion order differs from submission order
+        await asyncio.sleep(0.001 * (20 - i))
+        running -= 1
+        return i
+
+    assert await gather_bounded((job(i) for i in range(20)), limit=4) == list(range(20))
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_returns_exceptions_in_place():
+    async def job(i: int) -> int:
+        if i == 1:
+            raise ValueError("county failed")
+        return i
+
+    results = await gather_bounded([job(i) for i in range(3)], limit=2, return_exceptions=True)
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+
+    with pytest.raises(ValueError):
+        await gather_bounded([job(i) for i in range(3)], limit=2)
+
+
+@pytest.mark.asyncio
+async def test_overview_is_one_batch_without_sleeps(monkeypatch):
+    cache.local.clear()
+    service = EnhancedClimateService()
+    calls, ttls = [], {}
+    generate = service.engine.generate
+
+    def counting_generate(county_ids, *args, **kwargs):
+        calls.append(list(county_ids))
+        return generate(county_ids, *args, **kwargs)
+
+    async def no_sleep(delay, *args, **kwargs):
+        raise AssertionError("overview must not sleep")
+
+    get_or_compute = service_module.get_or_compute
+
+    async def recording_get_or_compute(key, compute, ttl=None, stale_ttl=None):
+        ttls[key] = ttl
+        return await get_or_compute(key, compute, ttl=ttl, stale_ttl=stale_ttl)
+
+    monkeypatch.setattr(service.engine, "generate", counting_generate)
+    monkeypatch.setattr(service_module.asyncio, "sleep", no_sleep)
+    monkeypatch.setattr(service_module, "get_or_compute", recording_get_or_compute)
+    try:
+        started = time.perf_counter()
+        overview = await service.get_all_counties_current_data()
+        elapsed = time.perf_counter() - started
+    finally:
+        cache.local.clear()
+
+    assert overview["total_counties"] == len(KENYA_COUNTIES)
+    assert set(overview["counties"]) == set(KENYA_COUNTIES)
+    assert calls == [list(KENYA_COUNTIES)]
+    assert list(ttls.values()) == [CURRENT_DATA_TTL]
+    assert elapsed < 0.5
@@ -0,0 +1,51 @@
+"""
+Tests for the bundled county boundaries
+Every county must resolve to a real polygon, not its bounding-box fallback
+"""
+import json
+import numpy as np
+
+from app.data import county_geometry
+from app.data.county_geometry import (
+    KENYA_BOUNDS, KENYA_COUNTIES_GEOJSON, _load_geojson, county_label_raster, county_mask, get_county_geometries
+)
+from app.data.kenya_counties import KENYA_COUNTIES
+
+
+def test_boundary_file_has_attribution():
+    with open(KENYA_COUNTIES_GEOJSON, encoding="utf-8") as handle:
+        collection = json.load(handle)
+    assert collection["source"]
+    assert collection["license"]
+
+
+def test_every_county_matches_a_polygon():
+    geometries = _load_geojson(KENYA_COUNTIES_GEOJSON)
+    assert set(geometries) == set(KENYA_COUNTIES)
+    assert all(geometry.is_valid and not geometry.is_empty for geometry in geometries.values())
+
+
+def test_no_bounding_box_fallbacks():
+    assert county_geometry.fallback_counties() == []
+
+
+def test_polygon_areas_match_reported_county_areas():
+    geometries = get_county_geometries()
+    for county_id, county in KENYA_COUNTIES.items():
+        geometry = geometries[county_id]
+        area_km2 = geometry.area * 111.32 ** 2 * np.cos(np.radians(geometry.centroid.y))
+        # Lake-shore counties include open water and the published areas differ by source
+        assert 0.6 < area_km2 / county["area_km2"] < 1.6, county["name"]
+
+
+def test_county_mask_is_tighter_than_its_bounding_box():
+    bounds = KENYA_COUNTIES[1]["bounds"]
+    bbox = (bounds["south"], bounds["west"], bounds["north"], bounds["east"])
+    mask = county_mask(1, bbox, (64, 64))
+    assert 0 < mask.sum() < mask.size
+
+
+def test_label_raster_covers_every_county():
+    bbox = (KENYA_BOUNDS["south"], KENYA_BOUNDS["west"], KENYA_BOUNDS["north"], KENYA_BOUNDS["east"])
+    labels = county_label_raster(bbox, (800, 970))
+    assert set(np.unique(labels)) - {0} == set(KENYA_COUNTIES)
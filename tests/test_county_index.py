@@ -0,0 +1,79 @@
+"""
+Tests for the county spatial index
+Point lookups and adjacency over the bundled county boundaries
+"""
+import pytest
+import shapely
+from shapely.geometry import Point
+
+from app.data.county_index import get_county_index
+from app.data.kenya_counties import KENYA_COUNTIES, get_county_neighbors
+
+# Reference coordinates (lat, lon) of each county capital in KENYA_COUNTIES
+CAPITALS = {
+    1: (-1.2864, 36.8172), 2: (-1.1714, 36.8356), 3: (-0.7167, 37.1500), 4: (-0.4167, 36.9500),
+    5: (-0.4989, 37.2803), 6: (-0.2711, 36.3800), 7: (-4.0435, 39.6682), 8: (-4.1816, 39.4606),
+    9: (-3.6305, 39.8499), 10: (-1.4980, 40.0300), 11: (-2.2717, 40.9020), 12: (-3.3961, 38.5561),
+    13: (-0.4532, 39.6461), 14: (1.7471, 40.0573), 15: (3.9366, 41.8670), 16: (2.3284, 37.9899),
+    17: (0.3546, 37.5822), 18: (0.0470, 37.6498), 19: (-0.3333, 37.6500), 20: (-0.5310, 37.4506),
+    21: (-1.3670, 38.0106), 22: (-1.5177, 37.2634), 23: (-1.7833, 37.6333), 24: (3.1191, 35.5973),
+    25: (1.2389, 35.1119), 26: (1.0968, 36.6985), 27: (1.0157, 35.0062), 28: (0.5143, 35.2698),
+    29: (0.6703, 35.5081), 30: (0.2039, 35.1053), 31: (0.4919, 35.7430), 32: (0.0167, 37.0667),
+    33: (-0.3031, 36.0800), 34: (-1.0780, 35.8601), 35: (-1.8520, 36.7768), 36: (-0.3677, 35.2831),
+    37: (-0.7813, 35.3416), 38: (0.2827, 34.7519), 39: (0.0765, 34.7228), 40: (0.5635, 34.5606),
+    41: (0.4608, 34.1115), 42: (0.0612, 34.2881), 43: (-0.0917, 34.7680), 44: (-0.5273, 34.4571),
+    45: (-1.0634, 34.4731), 46: (-0.6817, 34.7667), 47: (-0.5669, 34.9341),
+}
+
+
+@pytest.mark.parametrize("county_id", sorted(CAPITALS))
+def test_capital_resolves_to_its_county(county_id):
+    lat, lon = CAPITALS[county_id]
+    assert get_county_index().locate(lat, lon) == county_id, KENYA_COUNTIES[county_id]["capital"]
+
+
+def test_points_outside_kenya_do_not_resolve():
+    index = get_county_index()
+    assert index.locate(-6.8, 39.28) is None  # Dar es Salaam
+    assert index.locate(0.35, 32.58) is None  # Kampala
+
+
+def test_every_county_has_a_neighbour():
+    index = get_county_index()
+    assert all(index.adjacent(county_id) for county_id in KENYA_COUNTIES)
+
+
+def test_adjacency_is_symmetric_and_follows_boundaries():
+    index = get_county_index()
+    assert sorted(index.adjacent(11)) == [10, 13]  # Lamu: Tana River, Garissa
+    assert sorted(index.adjacent(1)) == [2, 22, 35]  # Nairobi: Kiambu, Machakos, Kajiado
+    for county_id in KENYA_COUNTIES:
+        for other_id in index.adjacent(county_id):
+            assert county_id in index.adjacent(other_id)
+
+
+@pytest.mark.parametrize("lat, lon", [(-1.2864, 36.8172), (-6.8, 39.28), (4.5, 41.0), (0.35, 32.58)])
+@pytest.mark.parametrize("k", [1, 3, 47])
+def test_nearest_matches_distances_to_every_county(lat, lon, k):
+    index = get_county_index()
+    distances = shapely.distance(index.geometries, Point(lon, lat))
+    expected = sorted(zip(distances.tolist(), index.ids.tolist()))[:k]
+
+    result = index.nearest(lat, lon, k)
+    assert [county_id for county_id, _ in result] == [county_id for _, county_id in expected]
+    assert [distance for _, distance in result] == pytest.approx([distance for distance, _ in expected])
+
+
+def test_nearest_reports_zero_for_the_containing_county():
+    assert get_county_index().nearest(-1.2864, 36.8172, 2)[0] == (1, 0.0)
+
+
+def test_county_neighbors_keep_bounding_box_centre_distances():
+    # Distances between bounding-box centres in degrees, as before the spatial index
+    neighbors = get_county_neighbors(1, 1.0)
+    assert [county_id for county_id, _, _ in neighbors] == [2, 3, 22, 4, 35, 5, 34, 6]
+    assert [round(distance, 4) for _, _, distance in neighbors] == [
+        0.156, 0.4592, 0.4942, 0.7038, 0.7997, 0.8403, 0.8997, 0.9144
+    ]
+    assert neighbors[0][1] is KENYA_COUNTIES[2]
+    assert get_county_neighbors(99) == []
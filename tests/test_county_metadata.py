@@ -0,0 +1,87 @@
+"""
+Tests for the pre-encoded county metadata
+Payloads must decode to their content with stable ETags, and search results stay in a bounded LRU
+"""
+import orjson
+from starlette.requests import Request
+
+from app.data.county_registry import county_registry
+from app.data.kenya_counties import CLIMATE_ZONES, KENYA_COUNTIES
+from app.services import county_metadata as metadata_module
+from app.services.county_metadata import CountyMetadata, counties_content, county_content, county_metadata
+from app.utils.http_cache import make_etag, static_response
+
+
+def make_request(headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/counties",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    })
+
+
+def test_payloads_decode_to_their_content():
+    assert orjson.loads(county_metadata.counties.body) == counties_content()
+    assert county_metadata.counties.etag == make_etag(county_metadata.counties.body)
+
+    zones = orjson.loads(county_metadata.climate_zones.body)
+    assert zones["total_zones"] == len(CLIMATE_ZONES)
+    for zone, counties in zones["counties_by_zone"].items():
+        assert [county["id"] for county in counties] == [
+            county_id for county_id, county in KENYA_COUNTIES.items() if county["climate_zone"] == zone
+        ]
+
+    for county_id in KENYA_COUNTIES:
+        assert orjson.loads(county_metadata.county(county_id).body) == county_content(county_id)
+    assert county_metadata.county(999) is None
+
+
+def test_etags_are_stable_and_distinct():
+    fresh = CountyMetadata()
+    # Every worker renders the same bytes, so ETags agree across processes
+    assert fresh.counties.body == county_metadata.counties.body
+    assert fresh.counties.etag == county_metadata.counties.etag
+    assert fresh.county(7).etag == county_metadata.county(7).etag
+
+    etags = {county_metadata.county(county_id).etag for county_id in KENYA_COUNTIES}
+    assert len(etags) == len(KENYA_COUNTIES)
+
+
+def test_static_response_answers_conditional_get():
+    payload = county_metadata.counties
+
+    response = static_response(make_request(), payload)
+    assert response.status_code == 200
+    assert response.body == payload.body
+    assert response.headers["etag"] == payload.etag
+
+    response = static_response(make_request({"If-None-Match": payload.etag}), payload)
+    assert response.status_code == 304
+    assert response.body == b""
+
+
+def test_search_matches_registry():
+    zone = "Coastal"
+    result = orjson.loads(CountyMetadata().search("mombasa", zone).body)
+
+    ids = [county["id"] for county in result["results"]]
+    assert ids == [*county_registry.search("mombasa"), *county_registry.in_zone(zone)]
+    assert result["results_count"] == len(ids)
+    assert result["search_criteria"] == {"name": "mombasa", "climate_zone": zone}
+
+
+def test_search_lru_reuses_and_evicts_least_recent(monkeypatch):
+    monkeypatch.setattr(metadata_module, "SEARCH_CACHE_SIZE", 2)
+    metadata = CountyMetadata()
+
+    nairobi = metadata.search("Nairobi", None)
+    arid = metadata.search(None, "Arid")
+    assert metadata.search("Nairobi", None) is nairobi
+
+    # Nairobi was used last, so the arid search is evicted
+    metadata.search("Kisumu", None)
+    assert list(metadata._search) == [("Nairobi", None), ("Kisumu", None)]
+    assert metadata.search("Nairobi", None) is nairobi
+    assert metadata.search(None, "Arid") is not arid
+    assert len(metadata._search) == 2
@@ -0,0 +1,90 @@
+"""
+Tests for the indexed county registry
+Name normalization, lookups by name, capital and zone, search ranking and attribute columns
+"""
+import numpy as np
+import pytest
+
+from app.data.county_registry import NUMERIC_COLUMNS, CountyRegistry, county_registry, normalize_name
+from app.data.kenya_counties import KENYA_COUNTIES
+
+
+def make_county(name: str, capital: str = "Town", zone: str = "Arid") -> dict:
+    return {
+        "name": name,
+        "capital": capital,
+        "climate_zone": zone,
+        "bounds": {"north": 1.0, "south": 0.0, "east": 1.0, "west": 0.0},
+        **{column: 1.0 for column in NUMERIC_COLUMNS}
+    }
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Nairobi", "nairobi"),
+    ("NAIROBI", "nairobi"),
+    ("Murang'a", "muranga"),
+    ("Murang’a", "muranga"),
+    ("Tharaka-Nithi", "tharakanithi"),
+    ("Tharaka Nithi", "tharakanithi"),
+    ("Élgeyo-Marakwét", "elgeyomarakwet"),
+    ("  Homa  Bay ", "homabay"),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+@pytest.mark.parametrize("name, county_id", [
+    ("muranga", 3), ("MURANG'A", 3), ("tharaka nithi", 19), ("Elgeyo Marakwet", 29), ("homa-bay", 44)
+])
+def test_by_name_ignores_case_accents_and_punctuation(name, county_id):
+    assert county_registry.by_name(name) == county_id
+
+
+def test_by_name_unknown_is_none():
+    assert county_registry.by_name("Atlantis") is None
+
+
+@pytest.mark.parametrize("capital, county_id", [("Kerugoya", 5), ("voi", 12), ("Eldoret", 28), ("ol-kalou", 6)])
+def test_by_capital(capital, county_id):
+    assert county_registry.by_capital(capital) == county_id
+
+
+def test_in_zone_matches_the_county_table():
+    for zone in {county["climate_zone"] for county in KENYA_COUNTIES.values()}:
+        expected = tuple(sorted(cid for cid, county in KENYA_COUNTIES.items() if county["climate_zone"] == zone))
+        assert county_registry.in_zone(zone) == expected
+        assert county_registry.in_zone(zone.upper()) == expected
+    assert county_registry.in_zone("Polar") == ()
+
+
+def test_search_ranks_exact_then_prefix_then_substring_then_fuzzy():
+    registry = CountyRegistry({
+        1: make_county("Merunga"),
+        2: make_county("South Meru"),
+        3: make_county("Meru"),
+        4: make_county("Mero"),
+        5: make_county("Garissa"),
+    })
+    assert registry.search("meru") == [3, 1, 2, 4]
+    assert registry.search("meru", limit=2) == [3, 1]
+
+
+def test_search_matches_capitals_exactly():
+    assert county_registry.search("Voi") == [12]
+    assert county_registry.search("Kitale")[0] == 27
+
+
+def test_search_falls_back_to_fuzzy_matches():
+    assert county_registry.search("Nakru") == [33]
+    assert county_registry.search("Kisumo") == [43]
+    assert county_registry.search("") == []
+
+
+def test_columns_are_aligned_read_only_arrays():
+    elevation = county_registry.column("elevation_m")
+    positions = county_registry.positions([47, 1, 29])
+    assert elevation[positions].tolist() == [KENYA_COUNTIES[cid]["elevation_m"] for cid in (47, 1, 29)]
+    with pytest.raises(ValueError):
+        elevation[0] = 0
+    with pytest.raises(KeyError):
+        county_registry.positions([1, 99])
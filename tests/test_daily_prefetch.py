@@ -0,0 +1,89 @@
+"""
+Tests for the in-process daily prefetch scheduler
+Runs claim a per-day Redis lock, and failed runs release it and are retried
+"""
+import asyncio
+from datetime import date
+import pytest
+
+from app.services import daily_prefetch
+from app.services.daily_prefetch import PrefetchScheduler
+from app.utils import cache as cache_module
+
+DAY = date(2024, 3, 1)
+
+
+def national_statistics(failing_calls: int):
+    """National statistics whose first failing_calls calls fail, as when GIBS is down"""
+    calls = 0
+
+    async def get_county_statistics(layer_type, start_date=None, end_date=None):
+        nonlocal calls
+        calls += 1
+        if calls <= failing_calls:
+            return {"error": f"National {layer_type} statistics failed: upstream down"}
+        return {"counties": [], "image_dates": [start_date]}
+
+    return get_county_statistics
+
+
+@pytest.fixture
+def prefetch(monkeypatch, fake_redis):
+    monkeypatch.setattr(cache_module.cache, "redis", fake_redis)
+
+    async def store(rows):
+        return len(rows)
+
+    monkeypatch.setattr(daily_prefetch, "store_climate_data", store)
+    return fake_redis
+
+
+def lock_key(day: date) -> str:
+    return cache_module.CACHE_KEY_PREFIX + PrefetchScheduler.lock_key(day)
+
+
+@pytest.mark.asyncio
+async def test_failed_run_releases_its_lock(prefetch, monkeypatch):
+    layers = len(daily_prefetch.PREFETCH_LAYERS)
+    monkeypatch.setattr(daily_prefetch.national_mosaic_service, "get_county_statistics",
+                        national_statistics(failing_calls=2 * layers))
+    scheduler = PrefetchScheduler()
+
+    summary = await scheduler.run_once(DAY)
+    assert scheduler.failed(summary)
+    assert summary["failed_layers"] == list(daily_prefetch.PREFETCH_LAYERS)
+    assert lock_key(DAY) not in prefetch.values
+
+    summary = await scheduler.run_once(DAY)
+    assert not scheduler.failed(summary)
+    assert lock_key(DAY) in prefetch.values
+    assert (scheduler.failures, scheduler.runs) == (1, 1)
+
+    # The successful run keeps the day claimed
+    assert "skipped" in await PrefetchScheduler().run_once(DAY)
+
+
+@pytest.mark.asyncio
+async def test_next_tick_retries_a_failed_day(prefetch, monkeypatch):
+    layers = len(daily_prefetch.PREFETCH_LAYERS)
+    monkeypatch.setattr(daily_prefetch.national_mosaic_service, "get_county_statistics",
+                        national_statistics(failing_calls=2 * layers))
+    monkeypatch.setattr(daily_prefetch, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(daily_prefetch, "PREFETCH_ON_STARTUP", True)
+    monkeypatch.setattr(daily_prefetch, "PREFETCH_RETRY_DELAY", 0)
+    scheduler = PrefetchScheduler()
+
+    scheduler.start()
+    try:
+        for _ in range(200):
+            if scheduler.runs:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await scheduler.stop()
+
+    assert (scheduler.failures, scheduler.runs) == (1, 1)
+    assert scheduler.last_run["rows_written"] == 0
+    # The retry ran the failed day again and now holds its lock
+    held = [key for key in prefetch.values if "prefetch_lock_" in key]
+    assert held == [lock_key(date.fromisoformat(scheduler.last_run["date"]))]
@@ -0,0 +1,80 @@
+"""
+Tests for the streaming county export
+Every format carries the same rows, one chunk per county, and Arrow/Parquet bodies read back
+"""
+import csv
+import io
+import pytest
+
+from app.services.export_service import EXPORT_COLUMNS, arrow_available, export_filename, stream_export
+from app.utils.cache import cache
+from app.utils.serialization import loads
+
+COUNTY_IDS = [1, 13, 47]
+MONTHS = 4
+# Historical months plus six predicted months per county
+ROWS = len(COUNTY_IDS) * (MONTHS + 6)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.local.clear()
+    yield
+    cache.local.clear()
+
+
+async def export(file_format: str, include_predictions: bool = True):
+    return [chunk async for chunk in stream_export(COUNTY_IDS, file_format, MONTHS, include_predictions)]
+
+
+@pytest.mark.asyncio
+async def test_csv_has_a_header_and_every_row():
+    chunks = await export("csv")
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+    assert len(chunks) == len(COUNTY_IDS)
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert len(rows) == ROWS
+    assert [row["record_type"] for row in rows].count("prediction") == 6 * len(COUNTY_IDS)
+
+
+@pytest.mark.asyncio
+async def test_ndjson_without_predictions():
+    lines = b"".join(await export("ndjson", include_predictions=False)).splitlines()
+    records = [loads(line) for line in lines]
+
+    assert len(records) == len(COUNTY_IDS) * MONTHS
+    assert {record["county_id"] for record in records} == set(COUNTY_IDS)
+    assert all(record["record_type"] == "historical" for record in records)
+
+
+needs_arrow = pytest.mark.skipif(not arrow_available(), reason="pyarrow is not installed")
+
+
+@needs_arrow
+@pytest.mark.asyncio
+async def test_parquet_is_valid_with_one_row_group_per_county():
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(await export("parquet"))))
+    table = parquet.read()
+
+    assert parquet.metadata.num_row_groups == len(COUNTY_IDS)
+    assert table.num_rows == ROWS
+    assert table.column_names == EXPORT_COLUMNS
+    assert sorted(set(table.column("county_id").to_pylist())) == COUNTY_IDS
+
+
+@needs_arrow
+@pytest.mark.asyncio
+async def test_arrow_stream_is_valid():
+    import pyarrow as pa
+    table = pa.ipc.open_stream(io.BytesIO(b"".join(await export("arrow")))).read_all()
+
+    assert table.num_rows == ROWS
+    assert table.schema.field("temperature").type == pa.float32()
+    assert table.column("county_name").to_pylist()[0] == "Nairobi"
+
+
+def test_export_filename():
+    assert export_filename([1, 2], "csv").startswith("uzimasmart_climate_1_2_")
+    assert "_1_2_3_4_5_etc_" in export_filename(list(range(1, 8)), "parquet")
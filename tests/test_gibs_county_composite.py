@@ -0,0 +1,95 @@
+"""
+Tests for the county-bounds composite of the GIBS services
+Every service reads the shared 47-county table and summarizes only pixels inside the county polygon
+"""
+import numpy as np
+import pytest
+
+from app.data.county_geometry import COUNTY_BOUNDS, KENYA_BOUNDS, county_mask
+from app.data.kenya_counties import KENYA_COUNTIES
+from app.services import temporal_compositor
+from app.services.enhanced_nasa_gibs import EnhancedNASAGIBSService
+from app.services.nasa_gibs_service import NASAGIBSService
+from app.services.production_nasa_gibs import ProductionNASAGIBSService
+from app.services.raster_ops import zonal_summary
+from app.services.temporal_compositor import composite_dates, composite_raster
+
+MOMBASA = 7
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Production service whose WMTS fetch returns a distinct random tile per date"""
+    service = ProductionNASAGIBSService()
+    rng = np.random.default_rng(17)
+    tiles = {}
+    requests = []
+
+    async def fake_satellite_data(layer_config, bounds, date, size=(256, 256)):
+        requests.append((bounds, date))
+        tile = rng.integers(1, 255, size=(*size, 4), dtype=np.uint8)
+        tile[..., 3] = 255
+        tiles[date] = tile
+        return {"success": True, "data": tile, "message": "Data retrieved successfully"}
+
+    async def no_colormap(layer_name):
+        return None
+
+    monkeypatch.setattr(service, "_get_satellite_data", fake_satellite_data)
+    monkeypatch.setattr(temporal_compositor.colormap_registry, "get", no_colormap)
+    service.tiles = tiles
+    service.requests = requests
+    return service
+
+
+def test_county_bounds_cover_all_counties():
+    assert set(COUNTY_BOUNDS) == set(KENYA_COUNTIES)
+    for county_id, county in KENYA_COUNTIES.items():
+        assert COUNTY_BOUNDS[county_id] == {"name": county["name"], **county["bounds"]}
+
+
+def test_services_share_county_ids():
+    assert ProductionNASAGIBSService().county_bounds is COUNTY_BOUNDS
+    assert EnhancedNASAGIBSService().county_bounds is COUNTY_BOUNDS
+    assert COUNTY_BOUNDS[MOMBASA]["name"] == "Mombasa"
+
+    legacy = NASAGIBSService()
+    assert legacy._get_kenya_bounds(MOMBASA)["name"] == "Mombasa"
+    assert legacy._get_kenya_bounds(999) == KENYA_BOUNDS
+    assert legacy._get_kenya_bounds() == KENYA_BOUNDS
+
+
+@pytest.mark.asyncio
+async def test_composite_summarizes_inside_county_polygon(service):
+    layer_config = service.layers["precipitation"]
+
+    composite = await service._get_composite(MOMBASA, layer_config, "precipitation", "2024-03-01", "2024-03-04")
+
+    bounds = COUNTY_BOUNDS[MOMBASA]
+    assert {date for _, date in service.requests} == set(composite_dates("precipitation", "2024-03-01", "2024-03-04"))
+    assert all(requested is bounds for requested, _ in service.requests)
+
+    mask = county_mask(MOMBASA, (bounds["south"], bounds["west"], bounds["north"], bounds["east"]), (256, 256))
+    tiles = [service.tiles[date] for date in composite["dates"]]
+    expected = zonal_summary(composite_raster(tiles, "precipitation", layer_config), mask)
+    assert composite["success"]
+    assert composite["stats"]["count"] == int(mask.sum()) < mask.size
+    for key in ("mean", "std", "min", "max"):
+        assert np.isclose(composite["stats"][key], expected[key])
+
+
+@pytest.mark.asyncio
+async def test_county_outside_old_sample_table_gets_satellite_data(service):
+    # Turkana (24) was missing from the hard-coded five-county table
+    result = await service.get_temperature_data(24, "2024-02-01", "2024-02-02")
+
+    assert result["county_name"] == "Turkana"
+    assert result["data_quality"] == "satellite"
+    assert all(bounds["name"] == "Turkana" for bounds, _ in service.requests)
+
+
+@pytest.mark.asyncio
+async def test_unknown_county_is_rejected(service):
+    assert "error" in await service.get_ndvi_data(99, "2024-02-01", "2024-02-09")
+    assert "error" in await service.detect_drought_conditions(99)
+    assert service.requests == []
@@ -0,0 +1,113 @@
+"""
+Tests for the GIBS WMTS tile pyramid helpers
+Tile selection and mosaicking checked against synthetic tiles
+"""
+from datetime import datetime
+import numpy as np
+import pytest
+
+from app.services import gibs_wmts
+from app.utils.upstream import CircuitOpenError, UpstreamError
+from app.services.gibs_wmts import (
+    TILE_SIZE, GIBSWMTSClient, level_resolution, matrix_shape, mosaic_tiles, select_level, tile_bounds, tile_range
+)
+
+KENYA_BBOX = (-4.7, 33.9, 5.0, 41.9)
+
+
+def solid_tile(value: int) -> np.ndarray:
+    tile = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    tile[..., 0] = value
+    tile[..., 3] = 255
+    return tile
+
+
+def test_matrix_shape_follows_gibs_pyramid():
+    assert matrix_shape(0) == (1, 2)
+    assert matrix_shape(2) == (3, 5)
+    assert matrix_shape(8) == (160, 320)
+
+
+def test_tile_range_covers_bbox():
+    # Level 2 tiles span 72 degrees, so Kenya straddles the column boundary at 36E
+    assert tile_range(2, KENYA_BBOX) == (1, 1, 2, 3)
+
+
+def test_tile_range_excludes_tile_touching_far_edge():
+    south, west, north, east = tile_bounds(5, 10, 20)
+    assert tile_range(5, (south, west, north, east)) == (10, 10, 20, 20)
+
+
+def test_select_level_caps_at_deepest_level():
+    assert select_level("2km", KENYA_BBOX, (8000, 8000)) == 5
+    assert select_level("250m", KENYA_BBOX, (8000, 8000)) == 8
+    assert level_resolution(select_level("1km", KENYA_BBOX, (64, 64))) <= (41.9 - 33.9) / 64
+
+
+def test_select_level_rejects_unknown_tile_matrix_set():
+    with pytest.raises(ValueError):
+        select_level("EPSG4326_10km", KENYA_BBOX, (256, 256))
+
+
+def test_tile_url_uses_tile_matrix_set_identifier():
+    client = GIBSWMTSClient(base_url="https://gibs.example/wmts/epsg4326/best")
+    layer = {"layer_name": "MODIS_Terra_NDVI_8Day", "tile_matrix_set": "250m"}
+    assert client.tile_url(layer, "2024-01-01", 8, 80, 192) == (
+        "https://gibs.example/wmts/epsg4326/best/MODIS_Terra_NDVI_8Day/default/2024-01-01/250m/8/80/192.png"
+    )
+
+
+def test_mosaic_of_single_tile_reproduces_it():
+    tile = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    tile[..., 0] = np.arange(TILE_SIZE) % 256
+    tile[..., 1] = (np.arange(TILE_SIZE) % 256)[:, None]
+    tile[..., 3] = 255
+    bbox = tile_bounds(4, 7, 30)
+
+    result = mosaic_tiles({(4, 7, 30): tile}, 4, (7, 7), (30, 30), bbox, (TILE_SIZE, TILE_SIZE))
+    np.testing.assert_array_equal(result, tile)
+
+
+def test_mosaic_stitches_neighbouring_tiles():
+    tiles = {(2, 1, 2): solid_tile(10), (2, 1, 3): solid_tile(20)}
+    width, height = 80, 97
+    result = mosaic_tiles(tiles, 2, (1, 1), (2, 3), KENYA_BBOX, (width, height))
+
+    assert result.shape == (height, width, 4)
+    lons = 33.9 + (np.arange(width) + 0.5) * (41.9 - 33.9) / width
+    expected = np.where(lons < 36.0, 10, 20)
+    np.testing.assert_array_equal(result[..., 0], np.broadcast_to(expected, (height, width)))
+
+
+def test_mosaic_leaves_missing_tiles_transparent():
+    tiles = {(2, 1, 2): solid_tile(10), (2, 1, 3): None}
+    result = mosaic_tiles(tiles, 2, (1, 1), (2, 3), KENYA_BBOX, (80, 97))
+    lons = 33.9 + (np.arange(80) + 0.5) * (41.9 - 33.9) / 80
+
+    assert (result[:, lons < 36.0, 3] == 255).all()
+    assert (result[:, lons >= 36.0, 3] == 0).all()
+
+
+@pytest.mark.asyncio
+async def test_tile_failures_are_logged_once_per_raster(monkeypatch, capsys):
+    calls = []
+
+    async def fake_fetch(key, url, params=None, session=None):
+        calls.append(url)
+        if len(calls) % 2:
+            raise CircuitOpenError(f"circuit open for {key}")
+        raise UpstreamError("HTTP 503", status=503)
+
+    monkeypatch.setattr(gibs_wmts.upstream_client, "fetch", fake_fetch)
+    client = GIBSWMTSClient(base_url="https://gibs.example")
+    layer = {"layer_name": "LAYER", "tile_matrix_set": "250m"}
+    bounds = {"south": KENYA_BBOX[0], "west": KENYA_BBOX[1], "north": KENYA_BBOX[2], "east": KENYA_BBOX[3]}
+
+    raster = await client.get_raster(layer, bounds, datetime.utcnow().date().isoformat(), size=(800, 970))
+
+    assert raster is None
+    assert len(calls) > 2
+    assert client.tiles_rejected + client.tiles_failed == len(calls)
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 1
+    assert f"{client.tiles_failed} of {len(calls)} tiles failed" in lines[0]
@@ -0,0 +1,60 @@
+"""
+Tests for the HTTP caching middleware
+Conditional GETs must answer 304 with the original response headers minus the body headers
+"""
+import time
+from email.utils import formatdate
+import pytest
+
+from app.utils.http_cache import HTTPCacheMiddleware, make_etag
+
+BODY = b'{"value":1}'
+
+
+async def cached_endpoint(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(BODY)).encode()),
+            (b"vary", b"Origin, Accept-Encoding"),
+            (b"access-control-allow-origin", b"https://uzima.example"),
+            (b"last-modified", formatdate(time.time() - 60, usegmt=True).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def request(headers):
+    middleware = HTTPCacheMiddleware(cached_endpoint, rules={r"^/cached$": 3600})
+    scope = {"type": "http", "method": "GET", "path": "/cached", "headers": headers}
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    return messages[0]["status"], {name.decode(): value.decode() for name, value in messages[0]["headers"]}, messages
+
+
+@pytest.mark.asyncio
+async def test_not_modified_keeps_vary_and_cors_headers():
+    status, headers, _ = await request([(b"if-none-match", make_etag(BODY).encode())])
+
+    assert status == 304
+    assert headers["vary"] == "Origin, Accept-Encoding"
+    assert headers["access-control-allow-origin"] == "https://uzima.example"
+    assert headers["etag"] == make_etag(BODY)
+    assert headers["cache-control"].startswith("public, max-age=")
+    assert "content-type" not in headers and "content-length" not in headers
+
+
+@pytest.mark.asyncio
+async def test_full_response_carries_validators():
+    status, headers, messages = await request([])
+
+    assert status == 200
+    assert headers["etag"] == make_etag(BODY)
+    assert headers["content-type"] == "application/json"
+    assert messages[1]["body"] == BODY
@@ -0,0 +1,53 @@
+"""
+Tests for the shared upstream HTTP session
+One pooled session per process, shared by every GIBS service and closed only on shutdown
+"""
+import pytest
+
+from app.services.enhanced_nasa_gibs import EnhancedNASAGIBSService
+from app.services.nasa_gibs_service import NASAGIBSService
+from app.services.production_nasa_gibs import ProductionNASAGIBSService
+from app.utils import http
+from app.utils.http import HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST, close_http_session, get_http_session
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_and_pooled():
+    try:
+        session = await get_http_session()
+        assert await get_http_session() is session
+        assert session.connector.limit == HTTP_POOL_LIMIT
+        assert session.connector.limit_per_host == HTTP_POOL_LIMIT_PER_HOST
+    finally:
+        await close_http_session()
+
+
+@pytest.mark.asyncio
+async def test_services_share_the_session_and_leave_it_open():
+    services = [NASAGIBSService(), EnhancedNASAGIBSService(), ProductionNASAGIBSService()]
+    try:
+        session = await get_http_session()
+        for service in services:
+            await service.initialize()
+            assert service.session is session
+
+        for service in services:
+            await service.close()
+        assert not session.closed
+    finally:
+        await close_http_session()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_the_session_and_a_new_one_is_created_after():
+    session = await get_http_session()
+    await close_http_session()
+
+    assert session.closed
+    assert http._session is None
+    replacement = await get_http_session()
+    try:
+        assert replacement is not session
+        assert not replacement.closed
+    finally:
+        await close_http_session()
@@ -0,0 +1,60 @@
+"""
+Tests for county rainfall totals from IMERG composites
+Unpublished dates must not lower the total or the drought rainfall anomaly
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+from app.services.enhanced_nasa_gibs import EnhancedNASAGIBSService
+from app.services.production_nasa_gibs import ProductionNASAGIBSService
+from app.services.temporal_compositor import COMPOSITE_MAX_DATES, composite_dates, reduce_stack
+
+
+def window(days: int):
+    end = datetime(2024, 3, 31)
+    return (end - timedelta(days=days)).isoformat() + "Z", end.isoformat() + "Z"
+
+
+def test_thirty_day_daily_window_is_not_truncated():
+    start, end = window(30)
+    assert len(composite_dates("precipitation", start, end)) == 31 <= COMPOSITE_MAX_DATES
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("service_class", [ProductionNASAGIBSService, EnhancedNASAGIBSService])
+async def test_rainfall_total_covers_the_whole_window(service_class, monkeypatch):
+    service = service_class()
+    start, end = window(30)
+    dates = composite_dates("precipitation", start, end)
+
+    def fake_composite(arrived: int):
+        async def composite(county_id, layer_config, layer_type, start_date, end_date):
+            # Every arrived date rained at 0.5 mm/hr; the composite averages the rates
+            return {
+                "success": True,
+                "stats": {"mean": 0.5, "std": 0.0, "min": 0.5, "max": 0.5, "count": 100},
+                "dates": dates[:arrived],
+                "reducer": "mean"
+            }
+        return composite
+
+    totals = []
+    for county_id, arrived in ((1, len(dates)), (2, 10)):
+        monkeypatch.setattr(service, "_get_composite", fake_composite(arrived))
+        result = await service.get_precipitation_data(county_id, start, end)
+        assert result["window_days"] == len(dates)
+        totals.append(result["rainfall_total"])
+
+    assert totals[0] == totals[1] == pytest.approx(0.5 * 24 * len(dates))
+
+
+def test_partly_covered_pixels_average_over_their_own_dates():
+    stack = np.array([
+        [[0.5, 0.5]],
+        [[0.5, np.nan]],
+        [[0.5, np.nan]],
+        [[np.nan, np.nan]]
+    ])
+    composite = reduce_stack(stack, "precipitation")
+    assert composite.tolist() == [[0.5, 0.5]]
@@ -0,0 +1,58 @@
+"""
+Tests for the raster executor
+Compute and I/O pools report their own queue and latency metrics
+"""
+import asyncio
+import threading
+import pytest
+
+from app.utils.raster_executor import RasterExecutor
+
+
+def wait_for(event: threading.Event) -> bool:
+    return event.wait(5)
+
+
+async def until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_compute_and_io_pools_report_separate_queues():
+    executor = RasterExecutor(kind="thread", workers=1)
+    release = threading.Event()
+    try:
+        jobs = [asyncio.ensure_future(executor.run(wait_for, release)) for _ in range(3)]
+        jobs += [asyncio.ensure_future(executor.run_io(wait_for, release)) for _ in range(2)]
+        await until(lambda: executor.compute.pending == 3 and executor.io.pending == 2)
+
+        stats = executor.stats()
+        assert stats["compute"]["queue_depth"] == 2
+        assert stats["io"]["queue_depth"] == 1
+
+        release.set()
+        assert all(await asyncio.gather(*jobs))
+    finally:
+        release.set()
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert (stats["compute"]["completed"], stats["io"]["completed"]) == (3, 2)
+    assert stats["compute"]["pending"] == stats["io"]["pending"] == 0
+    assert stats["compute"]["queue_wait_ms"]["max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_counted_on_the_failing_pool():
+    executor = RasterExecutor(kind="thread", workers=1)
+    try:
+        with pytest.raises(ZeroDivisionError):
+            await executor.run_io(divmod, 1, 0)
+    finally:
+        executor.shutdown()
+    assert executor.io.errors == 1
+    assert executor.compute.errors == 0
@@ -0,0 +1,126 @@
+"""
+Tests for GIBS raster operations
+Header validation, single decode through a colormap, and per-county statistics
+"""
+import io
+import numpy as np
+from PIL import Image
+
+from app.services.colormaps import parse_colormap
+from app.services.raster_ops import (
+    decode_image, labelled_statistics, read_png_header, summarize, to_physical, validate_image, zonal_summary
+)
+
+KELVIN_COLORMAP = """<ColorMaps><ColorMap units="K"><Entries>
+  <ColorMapEntry rgb="0,0,255" value="[270,280)"/>
+  <ColorMapEntry rgb="255,0,0" value="[290,+INF)"/>
+  <ColorMapEntry rgb="0,0,0" transparent="true" nodata="true"/>
+</Entries></ColorMap></ColorMaps>"""
+
+NDVI_COLORMAP = """<ColorMaps><ColorMap units=""><Entries>
+  <ColorMapEntry rgb="10,10,10" value="[0.2,0.4)"/>
+  <ColorMapEntry rgb="20,20,20" value="[0.9,+INF)"/>
+  <ColorMapEntry rgb="30,30,30" value="(-INF,-0.1)"/>
+</Entries></ColorMap></ColorMaps>"""
+
+
+def _palette_png(indices: np.ndarray, palette: list, transparent_index: int = None) -> bytes:
+    """Palettized PNG as GIBS serves it, optionally with one transparent palette entry"""
+    image = Image.fromarray(indices.astype(np.uint8), mode="P")
+    image.putpalette([channel for colour in palette for channel in colour])
+    buffer = io.BytesIO()
+    if transparent_index is None:
+        image.save(buffer, format="PNG")
+    else:
+        image.save(buffer, format="PNG", transparency=transparent_index)
+    return buffer.getvalue()
+
+
+def test_validate_image_reads_png_header_only():
+    # A single-colour palette is packed to 1 bit per pixel, which PIL unpacks on decode
+    png = _palette_png(np.zeros((12, 20)), [(0, 0, 0)])
+
+    assert read_png_header(png) == {"width": 20, "height": 12, "bit_depth": 1, "mode": "P"}
+    assert validate_image(png)
+    assert not validate_image(png, min_size=16)
+    assert not validate_image(b"<ServiceException>layer not found</ServiceException>")
+    # A truncated body keeps its header, so the header check alone must accept it
+    assert validate_image(png[:40])
+
+
+def test_validate_image_rejects_16_bit_png():
+    buffer = io.BytesIO()
+    Image.fromarray(np.zeros((16, 16), dtype=np.uint16)).save(buffer, format="PNG")
+    png = buffer.getvalue()
+
+    assert read_png_header(png)["bit_depth"] == 16
+    assert not validate_image(png)
+
+
+def test_palettized_png_decodes_through_colormap():
+    palette = [(0, 0, 255), (255, 0, 0), (0, 0, 0), (1, 2, 3)]
+    indices = np.array([[0, 1, 2, 3], [1, 1, 0, 2]])
+    png = _palette_png(indices, palette, transparent_index=2)
+
+    image = decode_image(png)
+    values = to_physical(image, "temperature", {}, parse_colormap(KELVIN_COLORMAP))
+
+    assert image.shape == (2, 4, 4)
+    cold, hot = 275.0 - 273.15, 290.0 - 273.15
+    np.testing.assert_allclose(values[0, :2], [cold, hot])
+    np.testing.assert_allclose(values[1, :3], [hot, hot, cold])
+    # Transparent palette entry and a colour missing from the colormap are no data
+    assert np.isnan(values[0, 2:]).all() and np.isnan(values[1, 3])
+    assert summarize(values)["count"] == 5
+    assert np.isclose(summarize(values)["mean"], (2 * cold + 3 * hot) / 5)
+
+
+def test_ndvi_colormap_values_are_clipped_to_vegetation_range():
+    image = np.array([[[10, 10, 10, 255], [20, 20, 20, 255], [30, 30, 30, 255]]], dtype=np.uint8)
+
+    values = to_physical(image, "ndvi", {}, parse_colormap(NDVI_COLORMAP))
+
+    # Unitless NDVI is not shifted from Kelvin; open intervals take their finite bound
+    np.testing.assert_allclose(values[0], [0.3, 0.9, 0.0])
+
+
+def test_linear_fallback_without_colormap_masks_no_data_pixels():
+    image = np.array([[[0, 0, 0, 255], [51, 0, 0, 255], [255, 0, 0, 255], [102, 0, 0, 0]]], dtype=np.uint8)
+
+    values = to_physical(image, "precipitation", {"data_range": [0, 100], "scale_factor": 1.0})
+
+    assert np.isnan(values[0, [0, 2, 3]]).all()
+    assert np.isclose(values[0, 1], 20.0)
+
+
+def test_labelled_statistics_matches_per_label_summary():
+    rng = np.random.default_rng(7)
+    values = rng.normal(20, 5, size=(60, 80))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    labels = rng.integers(0, 6, size=values.shape).astype(np.int16)
+
+    stats = labelled_statistics(values, labels)
+
+    assert set(stats) == {1, 2, 3, 4, 5}
+    for label, result in stats.items():
+        expected = zonal_summary(values, labels == label)
+        assert result["count"] == expected["count"]
+        for key in ("mean", "std", "min", "max"):
+            assert np.isclose(result[key], expected[key])
+
+
+def test_labelled_statistics_skips_background_and_empty_labels():
+    values = np.array([[1.0, 2.0, np.nan], [4.0, 5.0, 6.0]])
+    labels = np.array([[0, 3, 3], [0, 0, 7]], dtype=np.int16)
+
+    stats = labelled_statistics(values, labels)
+
+    assert set(stats) == {3, 7}
+    assert stats[3] == {"mean": 2.0, "std": 0.0, "min": 2.0, "max": 2.0, "count": 1}
+    assert stats[7]["mean"] == 6.0
+
+
+def test_labelled_statistics_without_valid_pixels_is_empty():
+    values = np.full((2, 2), np.nan)
+    labels = np.ones((2, 2), dtype=np.int16)
+    assert labelled_statistics(values, labels) == {}
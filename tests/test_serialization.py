@@ -0,0 +1,76 @@
+"""
+Tests for fast JSON serialization
+NumPy and datetime encoding, memoized cached payloads and responses that reuse their bytes
+"""
+from datetime import date, datetime
+import numpy as np
+import pytest
+
+from app.utils import serialization
+from app.utils.cache import TwoTierCache
+from app.utils.serialization import CachedPayload, FastJSONResponse, dumps, loads
+
+
+def test_round_trips_numpy_values_datetimes_and_non_string_keys():
+    value = {
+        "float": np.float64(1.5),
+        "int": np.int64(7),
+        "flag": np.bool_(True),
+        "array": np.arange(3, dtype=np.int32),
+        "grid": np.array([[0.5, 1.0], [1.5, 2.0]]),
+        "when": datetime(2024, 3, 1, 12, 30),
+        "day": date(2024, 3, 1),
+        "by_id": {1: "Nairobi", 47: "Nyamira"}
+    }
+    assert loads(dumps(value)) == {
+        "float": 1.5,
+        "int": 7,
+        "flag": True,
+        "array": [0, 1, 2],
+        "grid": [[0.5, 1.0], [1.5, 2.0]],
+        "when": "2024-03-01T12:30:00",
+        "day": "2024-03-01",
+        "by_id": {"1": "Nairobi", "47": "Nyamira"}
+    }
+
+
+def test_cached_payload_encodes_once(monkeypatch):
+    payload = CachedPayload({"county_id": 1, "values": np.array([1.0, 2.0])})
+    body, etag = payload.body, payload.etag
+
+    monkeypatch.setattr(serialization, "dumps", lambda value: pytest.fail("payload encoded twice"))
+    assert payload.body is body
+    assert payload.etag == etag
+    assert loads(body) == {"county_id": 1, "values": [1.0, 2.0]}
+
+
+@pytest.mark.asyncio
+async def test_cached_payload_is_stable_through_redis(fake_redis):
+    writer, reader = TwoTierCache(max_entries=16), TwoTierCache(max_entries=16)
+    writer.redis = reader.redis = fake_redis
+
+    stored = await writer.set("key", {"county_id": 1, "mean": np.float32(0.25)}, ttl=60)
+    restored = await reader.get("key")
+
+    assert isinstance(restored, CachedPayload)
+    assert restored is not stored
+    assert restored.body == stored.body
+    assert restored.etag == stored.etag
+    assert restored.last_modified == stored.last_modified
+
+
+def test_response_writes_cached_bytes_with_validators(monkeypatch):
+    payload = CachedPayload({"county_id": 1})
+    body = payload.body
+
+    monkeypatch.setattr(serialization, "dumps", lambda value: pytest.fail("response re-encoded the payload"))
+    response = FastJSONResponse(payload)
+    assert response.body is body
+    assert response.headers["etag"] == payload.etag
+    assert response.headers["last-modified"] == payload.last_modified
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_response_encodes_plain_content():
+    response = FastJSONResponse({"values": np.array([1, 2])})
+    assert loads(response.body) == {"values": [1, 2]}
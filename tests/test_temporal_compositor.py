@@ -0,0 +1,43 @@
+"""
+Tests for temporal compositing and the national window limit
+The running composite must match the stacked reduction without building a (T, H, W) array
+"""
+import numpy as np
+import pytest
+
+from app.services.national_mosaic import NATIONAL_MAX_DATES, NationalMosaicService
+from app.services.raster_ops import to_physical
+from app.services.temporal_compositor import composite_raster, reduce_stack
+
+LAYER_CONFIG = {"scale_factor": 1.0, "data_range": [0, 10]}
+
+
+def random_tiles(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    tiles = []
+    for _ in range(count):
+        tile = rng.integers(0, 256, size=(6, 5, 4), dtype=np.uint8)
+        tile[..., 3] = rng.choice([0, 255], size=(6, 5), p=[0.3, 0.7])
+        tiles.append(tile)
+    return tiles
+
+
+@pytest.mark.parametrize("layer_type", ["ndvi", "temperature", "precipitation"])
+def test_running_composite_matches_stacked_reduction(layer_type):
+    tiles = random_tiles(5)
+    stack = np.stack([to_physical(tile, layer_type, LAYER_CONFIG) for tile in tiles])
+    expected = reduce_stack(stack, layer_type)
+    np.testing.assert_allclose(composite_raster(tiles, layer_type, LAYER_CONFIG), expected, equal_nan=True)
+
+
+def test_national_window_rejects_too_many_dates():
+    service = NationalMosaicService()
+    start, end = service.window("precipitation", "2024-03-01", "2024-03-08")
+    assert (end - start).days + 1 == NATIONAL_MAX_DATES
+
+    with pytest.raises(ValueError):
+        service.window("precipitation", "2024-03-01", "2024-03-31")
+    with pytest.raises(ValueError):
+        service.window("precipitation", "2024-03-08", "2024-03-01")
+    with pytest.raises(ValueError):
+        service.window("precipitation", "March 1", None)
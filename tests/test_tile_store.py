@@ -0,0 +1,89 @@
+"""
+Tests for the on-disk tile store and when WMTS tiles are stored
+Immutability by product period, write failures and transparent tiles
+"""
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+
+from app.services import gibs_wmts
+from app.utils.tile_store import TILE_PUBLICATION_MARGIN_DAYS, TileStore
+
+
+def days_ago(days: int) -> str:
+    return (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+
+
+def test_daily_tiles_are_immutable_after_the_publication_margin():
+    assert TileStore.is_immutable(days_ago(TILE_PUBLICATION_MARGIN_DAYS + 1))
+    assert not TileStore.is_immutable(days_ago(TILE_PUBLICATION_MARGIN_DAYS))
+    assert not TileStore.is_immutable(days_ago(0))
+    assert not TileStore.is_immutable("not-a-date")
+
+
+def test_multi_day_period_in_progress_is_not_immutable():
+    assert not TileStore.is_immutable(days_ago(3), period_days=8)
+    assert TileStore.is_immutable(days_ago(8 + TILE_PUBLICATION_MARGIN_DAYS), period_days=8)
+
+
+def test_last_period_of_year_ends_on_new_year():
+    # The final MODIS 8-day period of a year starts on day 361 and ends on 1 January
+    assert TileStore.is_immutable("2023-12-27", period_days=8)
+
+
+def test_put_and_get_round_trip(tmp_path):
+    store = TileStore(root=str(tmp_path), max_bytes=10 * 1024 * 1024)
+    tile = np.arange(16 * 16 * 4, dtype=np.uint8).reshape(16, 16, 4)
+    key = TileStore.tile_key("layer", (0, 0, 1, 1), "2024-01-01", (16, 16))
+
+    store.put(key, tile)
+    np.testing.assert_array_equal(store.get(key), tile)
+    assert store.stats()["tiles"] == 1
+
+
+def test_unwritable_store_does_not_raise(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    store = TileStore(root=str(blocker / "tiles"))
+    key = TileStore.tile_key("layer", (0, 0, 1, 1), "2024-01-01", (16, 16))
+
+    store.put(key, np.zeros((16, 16, 4), dtype=np.uint8))
+    assert store.get(key) is None
+    assert store.writes == 0
+
+
+@pytest.mark.asyncio
+async def test_transparent_tiles_are_not_stored(tmp_path, monkeypatch):
+    store = TileStore(root=str(tmp_path))
+    monkeypatch.setattr(gibs_wmts, "tile_store", store)
+    tiles = {"blank": np.zeros((8, 8, 4), dtype=np.uint8), "data": np.full((8, 8, 4), 200, dtype=np.uint8)}
+
+    async def fake_fetch(key, url, params=None, session=None):
+        return b"blank" if "/blank/" in url else b"data"
+
+    monkeypatch.setattr(gibs_wmts.upstream_client, "fetch", fake_fetch)
+    monkeypatch.setattr(gibs_wmts, "decode_tile", lambda data: tiles[data.decode()])
+
+    client = gibs_wmts.GIBSWMTSClient(base_url="https://gibs.example")
+    day = days_ago(30)
+    for name in ("blank", "data"):
+        layer = {"layer_name": name, "tile_matrix_set": "2km"}
+        assert await client.get_tile(layer, day, 5, 80, 192) is not None
+
+    assert store.writes == 1
+    assert os.listdir(tmp_path)
+
+
+def test_budget_is_shared_by_stores_on_one_directory(tmp_path):
+    tile = np.zeros((16, 16, 4), dtype=np.uint8)
+    tile_bytes = 16 * 16 * 4 + 128  # .npy header
+    stores = [TileStore(root=str(tmp_path), max_bytes=5 * tile_bytes) for _ in range(2)]
+
+    for i in range(10):
+        key = TileStore.tile_key("layer", (0, 0, 1, 1), f"2024-01-{i + 1:02d}", (16, 16))
+        stores[i % 2].put(key, tile)
+
+    on_disk = sum(path.stat().st_size for path in tmp_path.rglob("*.npy"))
+    assert on_disk <= 5 * tile_bytes
+    assert sum(store.evictions for store in stores) == 5
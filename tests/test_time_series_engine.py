@@ -0,0 +1,74 @@
+"""
+Tests for the vectorized climate time-series engine
+The batched generator must match the original per-month loop for the same random draws
+"""
+from datetime import datetime
+import numpy as np
+import pytest
+
+from app.data.climate_profiles import METRICS, SEASONAL_PATTERNS
+from app.data.kenya_counties import KENYA_COUNTIES
+from app.services.time_series_engine import ClimateTimeSeriesEngine, month_labels
+
+SEED = 1234
+
+
+def original_base_zone(climate_zone: str) -> str:
+    """Zone mapping of the original per-month generator"""
+    if "Highland" in climate_zone:
+        if "Agricultural" in climate_zone:
+            return "Highland Agricultural"
+        if "Tropical" in climate_zone:
+            return "Highland Tropical"
+        return "Highland Agricultural"
+    for zone in ("Coastal", "Tropical", "Semi-Arid", "Arid"):
+        if zone in climate_zone:
+            return zone
+    return "Semi-Arid"
+
+
+def original_loop(county_ids, start_date: datetime, months: int, include_predictions: bool, draws: np.ndarray):
+    """The original per-county, per-month generator, fed the engine's uniform draws"""
+    series = np.empty((len(county_ids), len(METRICS), months))
+    for c, county_id in enumerate(county_ids):
+        county = KENYA_COUNTIES[county_id]
+        pattern = SEASONAL_PATTERNS[original_base_zone(county["climate_zone"])]
+        year, month = start_date.year, start_date.month
+        for i in range(months):
+            noise_factor = 0.1 if include_predictions and i > months // 2 else 0.05
+            temperature = pattern["temperature"][month - 1] - (county["elevation_m"] - 1000) / 1000.0 * 2.0
+            vary = [1 + draws[c, m, i] * noise_factor for m in range(len(METRICS))]
+
+            series[c, 0, i] = round(temperature * vary[0], 1)
+            series[c, 1, i] = round(max(0, pattern["rainfall"][month - 1] * vary[1]), 1)
+            series[c, 2, i] = round(max(20, min(95, pattern["humidity"][month - 1] * vary[2])), 1)
+            series[c, 3, i] = round(max(0, min(1, pattern["ndvi"][month - 1] * vary[3])), 3)
+
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return series
+
+
+@pytest.mark.parametrize("include_predictions", [False, True])
+def test_matches_the_original_per_month_loop(include_predictions):
+    county_ids = list(KENYA_COUNTIES)
+    start, months = datetime(2023, 11, 1), 14
+    draws = np.random.default_rng(SEED).uniform(-1.0, 1.0, size=(len(county_ids), len(METRICS), months))
+
+    values = ClimateTimeSeriesEngine(seed=SEED).generate(county_ids, start, months, include_predictions)
+    np.testing.assert_allclose(values, original_loop(county_ids, start, months, include_predictions, draws),
+                               rtol=0, atol=1e-9)
+
+
+def test_same_seed_gives_same_series():
+    first = ClimateTimeSeriesEngine(seed=SEED).generate([1, 24], datetime(2024, 1, 1), 6)
+    second = ClimateTimeSeriesEngine(seed=SEED).generate([1, 24], datetime(2024, 1, 1), 6)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_unknown_county_is_rejected():
+    with pytest.raises(KeyError):
+        ClimateTimeSeriesEngine(seed=SEED).generate([1, 99], datetime(2024, 1, 1), 6)
+
+
+def test_month_labels_cross_year_end():
+    assert month_labels(datetime(2023, 11, 15), 4) == ["2023-11", "2023-12", "2024-01", "2024-02"]
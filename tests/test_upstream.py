@@ -0,0 +1,111 @@
+"""
+Tests for the upstream circuit breaker and fetch deadline
+Walks the closed -> open -> half-open -> closed cycle on a controlled clock
+"""
+import asyncio
+import pytest
+
+from app.utils import upstream
+from app.utils.upstream import CircuitBreaker, UpstreamClient, UpstreamError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(upstream.time, "monotonic", fake)
+    return fake
+
+
+def test_breaker_cycle_closed_open_half_open_closed(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    assert breaker.state == "closed"
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    # Only one trial request goes through while half-open
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.state == "half_open"
+
+
+def test_unreported_trial_is_replaced_after_cool_down(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+
+
+class HangingSession:
+    """Session whose every request runs for its whole timeout and then times out"""
+
+    closed = False
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.timeouts = []
+
+    def get(self, url, params=None, timeout=None):
+        self.timeouts.append(timeout.total)
+        self.clock.now += timeout.total
+        raise asyncio.TimeoutError()
+
+
+@pytest.mark.asyncio
+async def test_fetch_gives_up_within_the_total_budget(clock, monkeypatch):
+    async def fake_sleep(delay):
+        clock.now += delay
+
+    monkeypatch.setattr(upstream.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(upstream, "UPSTREAM_ATTEMPT_TIMEOUT", 10.0)
+    monkeypatch.setattr(upstream, "UPSTREAM_TOTAL_TIMEOUT", 15.0)
+    monkeypatch.setattr(upstream, "UPSTREAM_MAX_RETRIES", 3)
+    client = UpstreamClient()
+    session = HangingSession(clock)
+    started = clock.now
+
+    with pytest.raises(UpstreamError):
+        await client.fetch("layer", "https://gibs.example/tile", session=session)
+
+    assert clock.now - started <= 15.0
+    assert session.timeouts[0] == 10.0
+    # The retry only gets what is left of the budget
+    assert len(session.timeouts) == 2 and session.timeouts[1] < 5.0
+    assert client.failures == 1